@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import auth, fields, crops, planting_plans, calendar, tasks, resources, chat
+from app.api.api_v1.endpoints import auth, fields, crops, planting_plans, calendar, tasks, resources, chat, sync, realtime, batch, dashboard
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["認証"])
@@ -11,3 +11,7 @@ api_router.include_router(calendar.router, prefix="/calendar", tags=["カレン
 api_router.include_router(tasks.router, prefix="/tasks", tags=["作業"])
 api_router.include_router(resources.router, prefix="/resources", tags=["資材・農機"])
 api_router.include_router(chat.router, prefix="/chat", tags=["AIチャット"])
+api_router.include_router(sync.router, prefix="/sync", tags=["差分同期"])
+api_router.include_router(realtime.router, prefix="/realtime", tags=["リアルタイム配信"])
+api_router.include_router(batch.router, prefix="/batch", tags=["バッチ"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["ダッシュボード"])
@@ -0,0 +1,116 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, HTTPException, Request, status
+
+from app.core.config import settings
+from app.db.session import shared_client
+from app.schemas.batch import BatchRequest, BatchRequestItem, BatchResponse, BatchResponseItem
+from app.utils.async_utils import run_in_thread
+from app.utils.json_utils import loads
+
+router = APIRouter()
+
+# 副リクエストに引き継ぐヘッダー（圧縮は外側のバッチのレスポンスでだけ行う）
+_FORWARDED_HEADERS = (b"authorization",)
+
+
+async def _dispatch(app, scope: Dict[str, Any]) -> Tuple[int, Dict[str, str], bytes]:
+    """
+    アプリケーションに副リクエストを渡し、ステータス・ヘッダー・本文を返します
+    """
+    status_code = 500
+    headers: Dict[str, str] = {}
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            headers.update((key.decode("latin-1").lower(), value.decode("latin-1")) for key, value in message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status_code, headers, bytes(body)
+
+
+def _sub_scope(request: Request, item: BatchRequestItem) -> Optional[Dict[str, Any]]:
+    parts = urlsplit(item.path)
+    if parts.scheme or parts.netloc or not parts.path.startswith("/") or parts.path.rstrip("/") == "/batch":
+        return None
+
+    headers: List[Tuple[bytes, bytes]] = [(b"accept", b"application/json")]
+    headers.extend((key, value) for key, value in request.scope["headers"] if key in _FORWARDED_HEADERS)
+    if item.if_none_match:
+        headers.append((b"if-none-match", item.if_none_match.encode("latin-1")))
+
+    path = settings.API_V1_STR + parts.path
+    return {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": parts.query.encode("utf-8"),
+        "headers": headers,
+    }
+
+
+async def _execute(request: Request, item: BatchRequestItem) -> BatchResponseItem:
+    scope = _sub_scope(request, item)
+    if scope is None:
+        return BatchResponseItem(
+            id=item.id, path=item.path, status=status.HTTP_400_BAD_REQUEST,
+            body={"detail": "パスは /api/v1 以降のAPIのパスを指定してください（/batch は指定できません）"},
+        )
+
+    # 副リクエストはSupabaseクライアントの同期I/Oを含むため、スレッドで並行に実行する
+    try:
+        status_code, headers, body = await run_in_thread(_dispatch, request.app, scope)
+    except Exception:
+        # 副リクエストの失敗はその項目のステータスで返す（エラーのログは副リクエスト側で出力される）
+        return BatchResponseItem(
+            id=item.id, path=item.path, status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            body={"detail": "リクエストの処理中にエラーが発生しました"},
+        )
+    content: Any = None
+    if body:
+        if headers.get("content-type", "").startswith("application/json"):
+            content = loads(body)
+        else:
+            content = body.decode("utf-8", errors="replace")
+    return BatchResponseItem(id=item.id, path=item.path, status=status_code, etag=headers.get("etag"), body=content)
+
+
+@router.post("", response_model=BatchResponse)
+async def execute_batch(batch_in: BatchRequest, request: Request):
+    """
+    複数のGETリクエスト（圃場・作業・資材・作付け計画・カレンダーなど）を1回のリクエストでまとめて実行します。
+    各副リクエストは並行に実行され、このリクエストの認証情報（Authorizationヘッダー）を引き継ぎます。
+    結果はリクエストと同じ順序で、副リクエストごとのステータスとともに返します。
+    """
+    if not batch_in.requests:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="requestsを1件以上指定してください"
+        )
+    if len(batch_in.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"1回のバッチで実行できるリクエストは{settings.BATCH_MAX_REQUESTS}件までです"
+        )
+
+    # 副リクエストの間で同じSupabaseクライアントを使う（スレッドにもコンテキストが引き継がれる）
+    with shared_client():
+        responses = await asyncio.gather(*(_execute(request, item) for item in batch_in.requests))
+    return {"responses": responses}
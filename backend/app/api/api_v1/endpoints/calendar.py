@@ -1,13 +1,21 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from datetime import date, datetime, timedelta
+from app.api.conditional import check_not_modified, compute_etag, latest_updated_at
 from app.api.deps import get_current_user, get_planting_plan_service
+from app.core import metrics
+from app.models.planting_plan import PlantingPlan
 from app.services.planting_plan_service import PlantingPlanService
 from app.exceptions.service_exceptions import DatabaseOperationException
+from app.utils.singleflight import SingleFlight
 from pydantic import BaseModel
 
 router = APIRouter()
 
+# 同じ組織・期間のカレンダーの同時取得をまとめる（作付け計画の取得とイベントの組み立て）
+calendar_flights = SingleFlight()
+metrics.register_cache("calendar_events_singleflight", calendar_flights)
+
 class CalendarEvent(BaseModel):
     """カレンダーイベントモデル"""
     id: str
@@ -24,8 +32,95 @@ class CalendarEvent(BaseModel):
     backgroundColor: Optional[str] = None
     borderColor: Optional[str] = None
 
+async def _load_calendar(
+    planting_plan_service: PlantingPlanService, organization_id: int, start_date: date, end_date: date
+) -> Tuple[str, Optional[datetime], List[CalendarEvent]]:
+    """
+    作付け計画を取得し、カレンダーのETag・最終更新日時・イベントを返します（呼び出し元の間で共有されます）
+    """
+    plans = await planting_plan_service.get_planting_plans(
+        organization_id=organization_id
+    )
+    
+    # イベントは作付け計画と作業インスタンスから作るため、それらの更新日時と期間からETagを求める
+    etag = compute_etag(plans, ("id", "updated_at", "workflow_instances"), extra=(start_date, end_date))
+    last_modified = latest_updated_at(
+        list(plans) + [instance for plan in plans for instance in (plan.workflow_instances or [])]
+    )
+    return etag, last_modified, _build_events(plans, start_date, end_date)
+
+
+def _build_events(plans: List[PlantingPlan], start_date: date, end_date: date) -> List[CalendarEvent]:
+    events = []
+
+    def get_event_color(type: str) -> str:
+        if type == 'planting':
+            return '#4caf50'  # 緑色
+        elif type == 'harvest':
+            return '#ff9800'  # オレンジ色
+        elif type == 'workflow':
+            return '#2196f3'  # 青色
+        else:
+            return '#9e9e9e'  # グレー
+
+    for plan in plans:
+        if plan.planting_date:
+            if start_date <= plan.planting_date <= end_date:
+                planting_color = get_event_color('planting')
+                events.append(CalendarEvent(
+                    id=f"planting-{plan.id}",
+                    title=f"定植: {plan.plan_name}",
+                    start=plan.planting_date.isoformat(),
+                    allDay=True,
+                    type='planting',
+                    planId=plan.id,
+                    cropName=plan.crop_name if hasattr(plan, 'crop_name') else None,
+                    status=plan.status,
+                    backgroundColor=planting_color,
+                    borderColor=planting_color
+                ))
+
+        if plan.harvest_date:
+            if start_date <= plan.harvest_date <= end_date:
+                harvest_color = get_event_color('harvest')
+                events.append(CalendarEvent(
+                    id=f"harvest-{plan.id}",
+                    title=f"収穫: {plan.plan_name}",
+                    start=plan.harvest_date.isoformat(),
+                    allDay=True,
+                    type='harvest',
+                    planId=plan.id,
+                    cropName=plan.crop_name if hasattr(plan, 'crop_name') else None,
+                    status=plan.status,
+                    backgroundColor=harvest_color,
+                    borderColor=harvest_color
+                ))
+
+        if plan.workflow_instances:
+            for instance in plan.workflow_instances:
+                if instance.planned_date:
+                    if start_date <= instance.planned_date <= end_date:
+                        workflow_color = get_event_color('workflow')
+                        events.append(CalendarEvent(
+                            id=f"workflow-{instance.id}",
+                            title=f"{instance.step_name}: {plan.plan_name}",
+                            start=instance.planned_date.isoformat(),
+                            allDay=True,
+                            type='workflow',
+                            planId=plan.id,
+                            instanceId=instance.id,
+                            cropName=plan.crop_name if hasattr(plan, 'crop_name') else None,
+                            status=instance.status,
+                            backgroundColor=workflow_color,
+                            borderColor=workflow_color
+                        ))
+
+    return events
+
 @router.get("/events", response_model=List[CalendarEvent])
 async def get_calendar_events(
+    request: Request,
+    response: Response,
     start_date: Optional[date] = Query(None, description="取得期間の開始日"),
     end_date: Optional[date] = Query(None, description="取得期間の終了日"),
     planting_plan_service: PlantingPlanService = Depends(get_planting_plan_service)
@@ -47,73 +142,14 @@ async def get_calendar_events(
             end_date = next_month - timedelta(days=1)
         
         organization_id = 1  # テスト用の組織ID
-        plans = await planting_plan_service.get_planting_plans(
-            organization_id=organization_id
+        # 同じ組織・期間のカレンダーの同時取得（朝の一斉表示など）は、計画の取得とイベントの組み立てを1回にまとめる
+        etag, last_modified, events = await calendar_flights.do(
+            (organization_id, start_date, end_date),
+            lambda: _load_calendar(planting_plan_service, organization_id, start_date, end_date),
         )
-        
-        events = []
-        
-        def get_event_color(type: str) -> str:
-            if type == 'planting':
-                return '#4caf50'  # 緑色
-            elif type == 'harvest':
-                return '#ff9800'  # オレンジ色
-            elif type == 'workflow':
-                return '#2196f3'  # 青色
-            else:
-                return '#9e9e9e'  # グレー
-        
-        for plan in plans:
-            if plan.planting_date:
-                if start_date <= plan.planting_date <= end_date:
-                    planting_color = get_event_color('planting')
-                    events.append(CalendarEvent(
-                        id=f"planting-{plan.id}",
-                        title=f"定植: {plan.plan_name}",
-                        start=plan.planting_date.isoformat(),
-                        allDay=True,
-                        type='planting',
-                        planId=plan.id,
-                        cropName=plan.crop_name if hasattr(plan, 'crop_name') else None,
-                        status=plan.status,
-                        backgroundColor=planting_color,
-                        borderColor=planting_color
-                    ))
-            
-            if plan.harvest_date:
-                if start_date <= plan.harvest_date <= end_date:
-                    harvest_color = get_event_color('harvest')
-                    events.append(CalendarEvent(
-                        id=f"harvest-{plan.id}",
-                        title=f"収穫: {plan.plan_name}",
-                        start=plan.harvest_date.isoformat(),
-                        allDay=True,
-                        type='harvest',
-                        planId=plan.id,
-                        cropName=plan.crop_name if hasattr(plan, 'crop_name') else None,
-                        status=plan.status,
-                        backgroundColor=harvest_color,
-                        borderColor=harvest_color
-                    ))
-            
-            if plan.workflow_instances:
-                for instance in plan.workflow_instances:
-                    if instance.planned_date:
-                        if start_date <= instance.planned_date <= end_date:
-                            workflow_color = get_event_color('workflow')
-                            events.append(CalendarEvent(
-                                id=f"workflow-{instance.id}",
-                                title=f"{instance.step_name}: {plan.plan_name}",
-                                start=instance.planned_date.isoformat(),
-                                allDay=True,
-                                type='workflow',
-                                planId=plan.id,
-                                instanceId=instance.id,
-                                cropName=plan.crop_name if hasattr(plan, 'crop_name') else None,
-                                status=instance.status,
-                                backgroundColor=workflow_color,
-                                borderColor=workflow_color
-                            ))
+        not_modified = check_not_modified(request, response, etag, last_modified)
+        if not_modified:
+            return not_modified
         
         return events
     
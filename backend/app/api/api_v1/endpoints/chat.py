@@ -1,7 +1,7 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.schemas.chat import ChatSessionCreate, ChatSessionUpdate, ChatSessionResponse, ChatMessageCreate, ChatMessageResponse
-from app.services.chat_service import ChatService
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from app.schemas.chat import ChatSessionCreate, ChatSessionUpdate, ChatSessionResponse, ChatMessageCreate, ChatMessageResponse, ChatMessagePage, ChatSearchResult, CacheStatsResponse
+from app.services.chat_service import ChatService, DEFAULT_MESSAGE_PAGE_SIZE
 from app.api.deps import get_current_user, get_chat_service
 from app.exceptions.service_exceptions import (
     DatabaseOperationException,
@@ -15,24 +15,62 @@ router = APIRouter()
 async def get_chat_sessions(
     skip: int = 0,
     limit: int = 100,
+    include_last_message: bool = Query(False, description="最新メッセージのプレビューを含める"),
     chat_service: ChatService = Depends(get_chat_service)
 ):
     """
     組織に属する全てのチャットセッションを取得します。
+    各セッションにはメッセージ件数が含まれ、include_last_message=true の場合は最新メッセージのプレビューも含まれます。
     """
     try:
         organization_id = 1  # テスト用の組織ID
         return await chat_service.get_chat_sessions(
             organization_id=organization_id,
             skip=skip,
+            limit=limit,
+            include_last_message=include_last_message
+        )
+    except DatabaseOperationException as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{e.message}"
+        )
+
+@router.get("/search", response_model=List[ChatSearchResult])
+async def search_messages(
+    q: str = Query(..., min_length=1, description="検索語（\"...\"で囲むとフレーズ検索）"),
+    limit: int = Query(20, ge=1, le=100),
+    chat_service: ChatService = Depends(get_chat_service)
+):
+    """
+    組織内の全てのチャットセッションからメッセージを全文検索します。
+    """
+    try:
+        organization_id = 1  # テスト用の組織ID
+        results = await chat_service.search_messages(
+            organization_id=organization_id,
+            query=q,
             limit=limit
         )
+        return [
+            ChatSearchResult(message=message, score=score, snippet=snippet)
+            for message, score, snippet in results
+        ]
     except DatabaseOperationException as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"{e.message}"
         )
 
+@router.get("/response-cache/stats", response_model=CacheStatsResponse)
+async def get_response_cache_stats(
+    chat_service: ChatService = Depends(get_chat_service)
+):
+    """
+    AI応答キャッシュの統計情報（ヒット率など）を取得します。
+    """
+    return chat_service.get_response_cache_stats()
+
 @router.post("/sessions", response_model=ChatSessionResponse, status_code=status.HTTP_201_CREATED)
 async def create_chat_session(
     session_in: ChatSessionCreate,
@@ -63,13 +101,16 @@ async def create_chat_session(
 @router.get("/sessions/{session_id}", response_model=ChatSessionResponse)
 async def get_chat_session(
     session_id: int,
+    message_limit: int = Query(DEFAULT_MESSAGE_PAGE_SIZE, ge=1, le=200, description="含めるメッセージの件数（最新から）"),
     chat_service: ChatService = Depends(get_chat_service)
 ):
     """
     特定のチャットセッションの詳細を取得します。
+    メッセージは最新のページのみ含まれます。それより古いメッセージは messages_next_cursor を使って
+    /sessions/{session_id}/messages から取得してください。
     """
     try:
-        session = await chat_service.get_chat_session(session_id=session_id)
+        session = await chat_service.get_chat_session(session_id=session_id, message_limit=message_limit)
         if not session:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -139,6 +180,36 @@ async def delete_chat_session(
             detail=f"{e.message}"
         )
 
+@router.get("/sessions/{session_id}/messages", response_model=ChatMessagePage)
+async def get_messages(
+    session_id: int,
+    before: Optional[int] = Query(None, description="このメッセージIDより古いメッセージを取得します"),
+    limit: int = Query(DEFAULT_MESSAGE_PAGE_SIZE, ge=1, le=200),
+    chat_service: ChatService = Depends(get_chat_service)
+):
+    """
+    チャットセッションのメッセージを新しい順に取得します。
+    続きがある場合は next_cursor を before に指定して次のページを取得します。
+    """
+    try:
+        session = await chat_service.get_chat_session(session_id=session_id, with_messages=False)
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chat session not found"
+            )
+        messages, next_cursor = await chat_service.get_messages(
+            session_id=session_id,
+            before=before,
+            limit=limit
+        )
+        return ChatMessagePage(messages=messages, next_cursor=next_cursor)
+    except DatabaseOperationException as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{e.message}"
+        )
+
 @router.post("/sessions/{session_id}/messages", response_model=ChatMessageResponse)
 async def add_message(
     session_id: int,
@@ -166,8 +237,9 @@ async def add_message(
                 for msg in session.messages
             ]
             
-            ai_response = await chat_service.get_ai_response(
+            ai_response = await chat_service.respond(
                 user_message=message_in.content,
+                organization_id=organization_id,
                 session_history=session_history
             )
             
@@ -1,7 +1,8 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from app.schemas.crop import CropCreate, CropUpdate, CropResponse
 from app.services.crop_service import CropService
+from app.api.conditional import check_not_modified, compute_etag
 from app.api.deps import get_current_user, get_crop_service
 from app.exceptions.service_exceptions import (
     DatabaseOperationException,
@@ -14,6 +15,8 @@ router = APIRouter()
 
 @router.get("/", response_model=List[CropResponse])
 async def get_crops(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     current_user=Depends(get_current_user),
@@ -23,7 +26,8 @@ async def get_crops(
     組織に属する全ての作物を取得します。
     """
     try:
-        return await crop_service.get_crops(organization_id=current_user.organization_id, skip=skip, limit=limit)
+        crops = await crop_service.get_crops(organization_id=current_user.organization_id, skip=skip, limit=limit)
+        return check_not_modified(request, response, compute_etag(crops)) or crops
     except DatabaseOperationException as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -57,6 +61,8 @@ async def create_crop(
 @router.get("/{crop_id}", response_model=CropResponse)
 async def get_crop(
     crop_id: int,
+    request: Request,
+    response: Response,
     current_user=Depends(get_current_user),
     crop_service: CropService = Depends(get_crop_service),
 ):
@@ -67,7 +73,7 @@ async def get_crop(
         crop = await crop_service.get_crop(crop_id=crop_id)
         if not crop or crop.organization_id != current_user.organization_id:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="作物が見つかりません")
-        return crop
+        return check_not_modified(request, response, compute_etag(crop)) or crop
     except ResourceNotFoundException as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.api.deps import get_current_user, get_dashboard_service
+from app.schemas.dashboard import DashboardSummary
+from app.services.dashboard_service import DashboardService
+from app.exceptions.service_exceptions import DatabaseOperationException
+
+router = APIRouter()
+
+
+@router.get("/summary", response_model=DashboardSummary)
+async def get_summary(
+    current_user=Depends(get_current_user),
+    dashboard_service: DashboardService = Depends(get_dashboard_service),
+):
+    """
+    ホーム画面の集計（今日が期限・期限切れの作業数、状態ごとの作業数・作付け計画数、在庫の少ない資材数、作付け面積など）を取得します。
+    """
+    try:
+        return await dashboard_service.get_summary(organization_id=current_user.organization_id)
+    except DatabaseOperationException as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{e.message}"
+        )
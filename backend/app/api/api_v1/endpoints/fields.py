@@ -1,7 +1,8 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from app.schemas.field import FieldCreate, FieldUpdate, FieldResponse
 from app.services.field_service import FieldService
+from app.api.conditional import check_not_modified, compute_etag
 from app.api.deps import get_current_user, get_field_service
 from app.exceptions.service_exceptions import (
     DatabaseOperationException,
@@ -13,6 +14,8 @@ router = APIRouter()
 
 @router.get("/", response_model=List[FieldResponse])
 async def get_fields(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     field_service: FieldService = Depends(get_field_service)
@@ -22,11 +25,12 @@ async def get_fields(
     """
     try:
         organization_id = 1  # テスト用の組織ID
-        return await field_service.get_fields(
+        fields = await field_service.get_fields(
             organization_id=organization_id,
             skip=skip,
             limit=limit
         )
+        return check_not_modified(request, response, compute_etag(fields)) or fields
     except DatabaseOperationException as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -63,6 +67,8 @@ async def create_field(
 @router.get("/{field_id}", response_model=FieldResponse)
 async def get_field(
     field_id: int,
+    request: Request,
+    response: Response,
     field_service: FieldService = Depends(get_field_service)
 ):
     """
@@ -76,7 +82,7 @@ async def get_field(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Field not found"
             )
-        return field
+        return check_not_modified(request, response, compute_etag(field)) or field
     except ResourceNotFoundException as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
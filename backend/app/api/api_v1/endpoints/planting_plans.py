@@ -1,6 +1,7 @@
 from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
+from app.api.conditional import check_not_modified, compute_etag
 from app.api.deps import get_current_user, get_planting_plan_service
 from app.models.user import User
 from app.services.planting_plan_service import PlantingPlanService
@@ -20,9 +21,14 @@ from app.exceptions.service_exceptions import (
 
 router = APIRouter()
 
+# ETagに含める属性（圃場・作業インスタンスはそれぞれのID・更新日時を含める）
+PLAN_VERSION_ATTRS = ("id", "updated_at", "fields", "workflow_instances")
+
 
 @router.get("/", response_model=List[PlantingPlanResponse])
 async def get_planting_plans(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     current_user=Depends(get_current_user),
@@ -31,11 +37,12 @@ async def get_planting_plans(
     """
     組織に属する全ての作付け計画を取得します。
     """
-    return await planting_plan_service.get_planting_plans(
+    plans = await planting_plan_service.get_planting_plans(
         organization_id=current_user.organization_id,
         skip=skip,
         limit=limit
     )
+    return check_not_modified(request, response, compute_etag(plans, PLAN_VERSION_ATTRS)) or plans
 
 
 @router.post("/", response_model=PlantingPlanResponse, status_code=status.HTTP_201_CREATED)
@@ -72,6 +79,8 @@ async def create_planting_plan(
 @router.get("/{plan_id}", response_model=PlantingPlanResponse)
 async def get_planting_plan(
     plan_id: int,
+    request: Request,
+    response: Response,
     current_user=Depends(get_current_user),
     planting_plan_service: PlantingPlanService = Depends(get_planting_plan_service),
 ):
@@ -82,7 +91,7 @@ async def get_planting_plan(
         plan = await planting_plan_service.get_planting_plan(plan_id=plan_id)
         if not plan or plan.organization_id != current_user.organization_id:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="作付け計画が見つかりません")
-        return plan
+        return check_not_modified(request, response, compute_etag(plan, PLAN_VERSION_ATTRS)) or plan
     except ResourceNotFoundException as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,90 @@
+import asyncio
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+
+from app.api.deps import get_user_from_token
+from app.core.config import settings
+from app.core.realtime import Subscription, broker
+from app.services.user_service import UserService
+from app.utils.json_utils import dumps, loads
+
+router = APIRouter()
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    if not value:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+async def _send_messages(websocket: WebSocket, subscription: Subscription) -> None:
+    while True:
+        message = await subscription.queue.get()
+        await websocket.send_text(dumps(message).decode("utf-8"))
+
+
+async def _receive_commands(websocket: WebSocket, subscription: Subscription) -> None:
+    while True:
+        try:
+            command = loads(await websocket.receive_text())
+        except ValueError:
+            continue
+        if not isinstance(command, dict):
+            continue
+        if command.get("type") == "subscribe":
+            # 購読条件の変更（entities・actionsを省略した場合は全て）
+            try:
+                subscription.set_filters(command.get("entities"), command.get("actions"))
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            await websocket.send_json({"type": "subscribed", "entities": command.get("entities"), "actions": command.get("actions")})
+        elif command.get("type") == "ping":
+            await websocket.send_json({"type": "pong"})
+
+
+@router.websocket("/ws")
+async def realtime_changes(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None, description="アクセストークン（WebSocketではヘッダーを使えないため）"),
+    entities: Optional[str] = Query(None, description="購読するエンティティ（カンマ区切り。例: tasks,workflow_instances,resources）"),
+    actions: Optional[str] = Query(None, description="購読する操作（カンマ区切り。例: created,updated,deleted）"),
+):
+    """
+    組織内のデータ変更（作業のステータス・作業インスタンスの完了・資材の数量など）をリアルタイムに受信します。
+    受信が追いつかずメッセージを破棄した場合は {"type": "overflow"} を送るため、一覧を取得し直してください。
+    接続後に {"type": "subscribe", "entities": [...], "actions": [...]} を送ると購読条件を変更できます。
+    複数ワーカー構成では、他のワーカーで発生した変更のメッセージにrecordが含まれないため、必要に応じて取得し直してください。
+    """
+    if not settings.REALTIME_ENABLED:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        if not token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="認証情報が必要です")
+        current_user = await get_user_from_token(token, UserService())
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await broker.start()
+    subscription = Subscription(current_user.organization_id, _split(entities), _split(actions))
+    broker.subscribe(subscription)
+
+    tasks = [
+        asyncio.create_task(_send_messages(websocket, subscription)),
+        asyncio.create_task(_receive_commands(websocket, subscription)),
+    ]
+    try:
+        # どちらかが終了（切断・送信エラー）したら接続を閉じる
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
+    finally:
+        broker.unsubscribe(subscription)
+        for task in tasks:
+            task.cancel()
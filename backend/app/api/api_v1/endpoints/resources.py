@@ -1,7 +1,8 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from app.schemas.resource import ResourceCreate, ResourceUpdate, ResourceResponse
 from app.services.resource_service import ResourceService
+from app.api.conditional import check_not_modified, compute_etag
 from app.api.deps import get_current_user, get_resource_service
 from app.exceptions.service_exceptions import (
     DatabaseOperationException,
@@ -13,6 +14,8 @@ router = APIRouter()
 
 @router.get("/", response_model=List[ResourceResponse])
 async def get_resources(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     resource_service: ResourceService = Depends(get_resource_service)
@@ -22,11 +25,12 @@ async def get_resources(
     """
     try:
         organization_id = 1  # テスト用の組織ID
-        return await resource_service.get_resources(
+        resources = await resource_service.get_resources(
             organization_id=organization_id,
             skip=skip,
             limit=limit
         )
+        return check_not_modified(request, response, compute_etag(resources)) or resources
     except DatabaseOperationException as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -61,6 +65,8 @@ async def create_resource(
 @router.get("/{resource_id}", response_model=ResourceResponse)
 async def get_resource(
     resource_id: int,
+    request: Request,
+    response: Response,
     resource_service: ResourceService = Depends(get_resource_service)
 ):
     """
@@ -73,7 +79,7 @@ async def get_resource(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Resource not found"
             )
-        return resource
+        return check_not_modified(request, response, compute_etag(resource)) or resource
     except ResourceNotFoundException as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
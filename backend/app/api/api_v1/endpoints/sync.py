@@ -0,0 +1,38 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.api.deps import get_current_user, get_sync_service
+from app.schemas.sync import SyncResponse
+from app.services.sync_service import SyncService
+from app.exceptions.service_exceptions import (
+    DatabaseOperationException,
+    ValidationException
+)
+
+router = APIRouter()
+
+
+@router.get("", response_model=SyncResponse)
+async def get_changes(
+    since: Optional[str] = Query(None, description="前回の同期で受け取ったnext_token（省略時は現在のトークンのみを返す）"),
+    current_user=Depends(get_current_user),
+    sync_service: SyncService = Depends(get_sync_service),
+):
+    """
+    前回の同期以降に作成・更新・削除された圃場・作業・作付け計画・作業インスタンス・資材を取得します。
+    has_moreがtrueの場合は、next_tokenをsinceに指定して続きを取得してください。
+    """
+    try:
+        return await sync_service.get_changes(
+            organization_id=current_user.organization_id,
+            since=since
+        )
+    except ValidationException as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{e.message}"
+        )
+    except DatabaseOperationException as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{e.message}"
+        )
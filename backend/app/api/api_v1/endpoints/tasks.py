@@ -1,7 +1,9 @@
+from datetime import date, datetime, time, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from app.schemas.task import TaskCreate, TaskFilter, TaskUpdate, TaskResponse
 from app.services.task_service import TaskService
+from app.api.conditional import check_not_modified, compute_etag
 from app.api.deps import get_current_user, get_task_service
 from app.exceptions.service_exceptions import (
     DatabaseOperationException,
@@ -11,21 +13,54 @@ from app.exceptions.service_exceptions import (
 
 router = APIRouter()
 
+# ETagに含める属性
+TASK_VERSION_ATTRS = ("id", "updated_at", "field_name")
+
 @router.get("/", response_model=List[TaskResponse])
 async def get_tasks(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    status_in: Optional[List[str]] = Query(None, alias="status", description="状態（複数指定可。いずれかに一致）"),
+    field_ids: Optional[List[int]] = Query(None, alias="field_id", description="圃場ID（複数指定可。いずれかに一致）"),
+    assigned_to: Optional[str] = Query(None, description="担当者"),
+    scheduled_from: Optional[date] = Query(None, description="予定日がこの日以降"),
+    scheduled_to: Optional[date] = Query(None, description="予定日がこの日以前"),
+    q: Optional[str] = Query(None, description="メモの部分一致"),
+    sort: str = Query("scheduled_date", description="並び替える列（scheduled_date, status, field_id, created_at, updated_at）"),
+    desc: bool = Query(False, description="降順にする場合はtrue"),
     task_service: TaskService = Depends(get_task_service)
 ):
     """
-    組織に属する全ての作業を取得します。
+    組織に属する作業を取得します。
+    状態・圃場・担当者・予定日の期間・メモで絞り込み、指定した列で並び替えられます。
     """
+    filters = TaskFilter(
+        statuses=status_in,
+        field_ids=field_ids,
+        assigned_to=assigned_to,
+        scheduled_from=datetime.combine(scheduled_from, time.min) if scheduled_from else None,
+        # 終了日を含めるため翌日の0時未満にする
+        scheduled_to=datetime.combine(scheduled_to + timedelta(days=1), time.min) if scheduled_to else None,
+        notes=q,
+    )
     try:
         organization_id = 1  # テスト用の組織ID
-        return await task_service.get_tasks(
+        tasks = await task_service.get_tasks(
             organization_id=organization_id,
             skip=skip,
-            limit=limit
+            limit=limit,
+            filters=filters,
+            sort_by=sort,
+            descending=desc
+        )
+        # 圃場名は圃場側の更新で変わるためETagに含める
+        return check_not_modified(request, response, compute_etag(tasks, TASK_VERSION_ATTRS)) or tasks
+    except ValidationException as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{e.message}"
         )
     except DatabaseOperationException as e:
         raise HTTPException(
@@ -61,6 +96,8 @@ async def create_task(
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
+    request: Request,
+    response: Response,
     task_service: TaskService = Depends(get_task_service)
 ):
     """
@@ -73,7 +110,7 @@ async def get_task(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Task not found"
             )
-        return task
+        return check_not_modified(request, response, compute_etag(task, TASK_VERSION_ATTRS)) or task
     except ResourceNotFoundException as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
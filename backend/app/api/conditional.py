@@ -0,0 +1,105 @@
+"""
+条件付きGET（ETag / If-None-Match / Last-Modified）の共通処理
+
+ETagはレスポンス本文をシリアライズせず、各レコードのIDと更新日時（と本文に含まれる関連データ）から求めます
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Iterable, Optional, Sequence
+
+from fastapi import Request, Response, status
+
+# レスポンスの形式を変更した場合に上げる（同じデータでも以前のETagと一致させないため）
+ETAG_VERSION = "1"
+
+# 既定でETagに含める属性
+DEFAULT_VERSION_ATTRS = ("id", "updated_at")
+
+
+def _version(item: Any, attrs: Sequence[str]) -> Any:
+    if item is None:
+        return None
+    values = []
+    for attr in attrs:
+        value = item.get(attr) if isinstance(item, dict) else getattr(item, attr, None)
+        if isinstance(value, list):
+            # 関連データ（作付け計画の圃場・作業インスタンスなど）はID・更新日時だけを使う
+            value = tuple(_version(child, DEFAULT_VERSION_ATTRS) for child in value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        values.append(value)
+    return tuple(values)
+
+
+def compute_etag(items: Any, attrs: Sequence[str] = DEFAULT_VERSION_ATTRS, extra: Sequence[Any] = ()) -> str:
+    """
+    レコード（またはレコードのリスト）のIDと更新日時から強いETagを求めます
+
+    Args:
+        items: モデル・辞書、またはそのリスト
+        attrs: ETagに含める属性（リストの属性は要素のID・更新日時を含める）
+        extra: 本文に影響するその他の値（期間の指定など）
+    """
+    if isinstance(items, (list, tuple)):
+        versions: Any = [_version(item, attrs) for item in items]
+    else:
+        versions = _version(items, attrs)
+    digest = hashlib.sha1(repr((ETAG_VERSION, versions, tuple(extra))).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    header = header.strip()
+    if header == "*":
+        return True
+    # If-None-Matchは弱い比較（W/を無視して比較する）
+    candidates = [value.strip() for value in header.split(",")]
+    return any((candidate[2:] if candidate.startswith("W/") else candidate) == etag for candidate in candidates)
+
+
+def latest_updated_at(items: Iterable[Any]) -> Optional[datetime]:
+    """
+    レコードの更新日時のうち最新のものを返します（文字列の更新日時にも対応）
+    """
+    latest = None
+    for item in items:
+        value = getattr(item, "updated_at", None)
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                continue
+        if not isinstance(value, datetime):
+            continue
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        if latest is None or value > latest:
+            latest = value
+    return latest
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """
+    ETag（とLast-Modified）をレスポンスに設定し、If-None-Matchに一致する場合は304のレスポンスを返します
+
+    If-Modified-Sinceは評価しません（削除されたレコードは最終更新日時に現れないため、ETagでのみ判定します）
+
+    Returns:
+        304のレスポンス（一致しない場合はNone。そのまま本文を返してください）
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
@@ -15,6 +15,8 @@ from app.services.planting_plan_service import PlantingPlanService
 from app.services.task_service import TaskService
 from app.services.resource_service import ResourceService
 from app.services.chat_service import ChatService
+from app.services.sync_service import SyncService
+from app.services.dashboard_service import DashboardService
 from app.db.session import get_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
@@ -26,6 +28,12 @@ async def get_current_user(
     """
     現在のユーザーを取得するための依存関係
     """
+    return await get_user_from_token(token, user_service)
+
+async def get_user_from_token(token: str, user_service: UserService) -> User:
+    """
+    アクセストークンからユーザーを取得します（WebSocketなどヘッダーを使えない接続でも使います）
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -81,3 +89,15 @@ def get_chat_service() -> ChatService:
     AIチャットサービスを取得するための依存関係
     """
     return ChatService()
+
+def get_sync_service() -> SyncService:
+    """
+    差分同期サービスを取得するための依存関係
+    """
+    return SyncService()
+
+def get_dashboard_service() -> DashboardService:
+    """
+    ダッシュボード集計サービスを取得するための依存関係
+    """
+    return DashboardService()
@@ -0,0 +1,20 @@
+"""
+APIレスポンスの共通クラス
+"""
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from app.utils.json_utils import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONの変換にjson_utils.dumps（orjsonがあればorjson、無ければ標準のjson）を使うレスポンス
+
+    response_modelのあるルートでは、FastAPIがpydanticでJSON互換の値に変換してから渡すため、
+    ここでは大きな一覧（作付け計画の作業インスタンスなど）をバイト列にする処理だけを高速化します
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
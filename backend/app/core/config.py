@@ -23,6 +23,8 @@ class Settings(BaseSettings):
     # Supabase設定
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
+    DATABASE_BACKEND: str = os.getenv("DATABASE_BACKEND", "supabase")  # supabase / local（インメモリの代替実装）
+    LOCAL_DB_LATENCY_MS: float = float(os.getenv("LOCAL_DB_LATENCY_MS", "0"))  # localで1クエリごとに挿入する遅延
     
     # JWT認証設定
     SECRET_KEY: str = os.getenv("SECRET_KEY", "")
@@ -34,6 +36,58 @@ class Settings(BaseSettings):
     
     # Google Maps設定
     GOOGLE_MAPS_API_KEY: str = os.getenv("GOOGLE_MAPS_API_KEY", "")
+    
+    # AIチャット設定
+    CHAT_CONTEXT_TOP_K: int = int(os.getenv("CHAT_CONTEXT_TOP_K", "5"))  # 応答生成時に参照する営農データの件数
+    CHAT_SEARCH_INDEX_DIR: str = os.getenv("CHAT_SEARCH_INDEX_DIR", "data/chat_search")  # 全文検索インデックスの保存先
+    CHAT_SEARCH_FLUSH_INTERVAL: int = int(os.getenv("CHAT_SEARCH_FLUSH_INTERVAL", "100"))  # 何件の更新ごとにディスクへ保存するか
+    CHAT_ARCHIVE_DIR: str = os.getenv("CHAT_ARCHIVE_DIR", "data/chat_archive")  # 古いメッセージのアーカイブ先
+    CHAT_RESPONSE_CACHE_SIZE: int = int(os.getenv("CHAT_RESPONSE_CACHE_SIZE", "1000"))  # AI応答キャッシュの最大件数
+    CHAT_RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("CHAT_RESPONSE_CACHE_TTL_SECONDS", "3600"))  # AI応答キャッシュの有効期限
+    CHAT_ARCHIVE_AFTER_DAYS: int = int(os.getenv("CHAT_ARCHIVE_AFTER_DAYS", "180"))  # この日数より古いメッセージをアーカイブする
+    CHAT_AGENT_ENABLED: bool = os.getenv("CHAT_AGENT_ENABLED", "true").lower() == "true"  # ツール呼び出しエージェントを使うか（モデルが設定されている場合のみ）
+    CHAT_AGENT_MODEL: str = os.getenv("CHAT_AGENT_MODEL", "")  # エージェントのOpenAIモデル名（空の場合はエージェントを使わない）
+    CHAT_AGENT_LOCAL_MODEL: bool = os.getenv("CHAT_AGENT_LOCAL_MODEL", "false").lower() == "true"  # モデル未設定時にキーワードベースのローカルモデルを使うか（ベンチマーク・動作確認用）
+    CHAT_AGENT_MAX_STEPS: int = int(os.getenv("CHAT_AGENT_MAX_STEPS", "4"))  # 1回の質問でモデルを呼び出す最大回数
+    CHAT_AGENT_HISTORY_LIMIT: int = int(os.getenv("CHAT_AGENT_HISTORY_LIMIT", "10"))  # モデルに渡す会話履歴の件数
+
+    # サービスの読み取りキャッシュ設定（作物・圃場・資材）
+    SERVICE_CACHE_ENABLED: bool = os.getenv("SERVICE_CACHE_ENABLED", "true").lower() == "true"  # 読み取り結果をキャッシュするか
+    SERVICE_CACHE_SIZE: int = int(os.getenv("SERVICE_CACHE_SIZE", "2000"))  # エンティティごとの最大件数
+    SERVICE_CACHE_TTL_SECONDS: float = float(os.getenv("SERVICE_CACHE_TTL_SECONDS", "60"))  # この秒数まではそのまま返す
+    SERVICE_CACHE_STALE_SECONDS: float = float(os.getenv("SERVICE_CACHE_STALE_SECONDS", "300"))  # この秒数までは古い値を返しつつ裏で再取得する
+
+    # 差分同期設定
+    CHANGE_LOG_ENABLED: bool = os.getenv("CHANGE_LOG_ENABLED", "true").lower() == "true"  # 書き込みをchange_logに記録するか
+    SYNC_BATCH_SIZE: int = int(os.getenv("SYNC_BATCH_SIZE", "1000"))  # 1回の同期で処理する変更履歴の件数
+    SYNC_SAFETY_LAG_SECONDS: int = int(os.getenv("SYNC_SAFETY_LAG_SECONDS", "10"))  # この秒数以内の変更履歴は次回の同期でも読み直す（遅れてコミットされた変更の取りこぼし防止）
+    CHANGE_LOG_RETENTION_DAYS: int = int(os.getenv("CHANGE_LOG_RETENTION_DAYS", "30"))  # 変更履歴の保持日数（これより古い同期トークンはresetを返す）
+
+    # リアルタイム配信設定（WebSocket）
+    REALTIME_ENABLED: bool = os.getenv("REALTIME_ENABLED", "true").lower() == "true"  # データ変更をWebSocketで配信するか
+    REALTIME_BROKER: str = os.getenv("REALTIME_BROKER", "memory")  # memory（単一ワーカー）/ unix（同一ホストの複数ワーカー）
+    REALTIME_BROKER_DIR: str = os.getenv("REALTIME_BROKER_DIR", "/tmp/smartfarm-realtime")  # unixブローカーのソケットの作成先
+    REALTIME_QUEUE_SIZE: int = int(os.getenv("REALTIME_QUEUE_SIZE", "100"))  # 接続ごとの未送信メッセージの上限
+
+    # ダッシュボード設定
+    DASHBOARD_LOW_STOCK_THRESHOLD: float = float(os.getenv("DASHBOARD_LOW_STOCK_THRESHOLD", "10"))  # 数量がこの値以下の資材を在庫が少ないとする
+
+    # バッチAPI設定
+    BATCH_MAX_REQUESTS: int = int(os.getenv("BATCH_MAX_REQUESTS", "20"))  # 1回のバッチで実行できる副リクエストの数
+
+    # レスポンス圧縮設定
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"  # レスポンスをgzip・brotliで圧縮するか
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # このバイト数未満の本文は圧縮しない
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))  # gzipの圧縮レベル（1〜9）
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))  # brotliの圧縮品質（0〜11。brotliがインストールされている場合）
+
+    # 計測設定
+    DB_INSTRUMENTATION_ENABLED: bool = os.getenv("DB_INSTRUMENTATION_ENABLED", "true").lower() == "true"  # リクエストごとのクエリ数・DB時間を計測するか
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"  # /metrics を公開するか
+    N_PLUS_ONE_THRESHOLD: int = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))  # 同じ形のクエリがこの回数以上発行されたら警告する
+    TRAFFIC_RECORDING_ENABLED: bool = os.getenv("TRAFFIC_RECORDING_ENABLED", "false").lower() == "true"  # リクエストを匿名化して記録するか（負荷の再現用）
+    TRAFFIC_RECORDING_PATH: str = os.getenv("TRAFFIC_RECORDING_PATH", "data/traffic/requests.jsonl")  # 記録の出力先
+    TRAFFIC_RECORDING_SAMPLE_RATE: float = float(os.getenv("TRAFFIC_RECORDING_SAMPLE_RATE", "1.0"))  # 記録するリクエストの割合（0〜1）
 
     class Config:
         case_sensitive = True
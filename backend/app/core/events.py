@@ -0,0 +1,69 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DataChangeEvent:
+    """サービス層の書き込みで発生したデータ変更"""
+    organization_id: Optional[int]
+    entity: str  # fields / crops / planting_plans / workflow_instances / tasks / resources
+    entity_id: Optional[int]
+    action: str  # created / updated / deleted
+    record: Optional[Dict[str, Any]] = None  # 変更後のデータ（削除時はNone）
+
+
+ChangeHandler = Callable[[DataChangeEvent], None]
+
+_handlers: List[ChangeHandler] = []
+_lock = threading.Lock()
+
+
+def subscribe(handler: ChangeHandler) -> None:
+    """
+    データ変更イベントのハンドラを登録します
+    """
+    with _lock:
+        if handler not in _handlers:
+            _handlers.append(handler)
+
+
+def unsubscribe(handler: ChangeHandler) -> None:
+    """
+    データ変更イベントのハンドラを登録解除します
+    """
+    with _lock:
+        if handler in _handlers:
+            _handlers.remove(handler)
+
+
+def publish_change(
+    organization_id: Optional[int],
+    entity: str,
+    entity_id: Optional[int],
+    action: str,
+    record: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    データ変更を登録済みのハンドラに通知します
+    ハンドラの失敗は書き込み処理自体を失敗させないようにログ出力のみ行います
+    """
+    event = DataChangeEvent(
+        organization_id=organization_id,
+        entity=entity,
+        entity_id=entity_id,
+        action=action,
+        record=record,
+    )
+
+    with _lock:
+        handlers = list(_handlers)
+
+    for handler in handlers:
+        try:
+            handler(event)
+        except Exception:
+            logger.exception("データ変更ハンドラの実行に失敗しました: %s", getattr(handler, "__name__", handler))
@@ -0,0 +1,259 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from app.db.instrumentation import add_query_listener
+
+# リクエスト・クエリ時間用の既定バケット（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """
+    メトリクスを保持し、Prometheusのテキスト形式で出力します
+    """
+
+    def __init__(self):
+        self._metrics: List["_Metric"] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def register_collector(self, collector: Callable[[], List[str]]) -> None:
+        """
+        出力時に呼び出され、出力行を返す関数を登録します（他モジュールの統計情報の公開用）
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        for collector in collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: MetricsRegistry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """単調増加するカウンター"""
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = self._header()
+        lines.extend(
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values
+        )
+        return lines
+
+
+class Gauge(_Metric):
+    """増減する値"""
+
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        """
+        ブロックの実行中だけ値を1増やします
+        """
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = self._header()
+        lines.extend(
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values
+        )
+        return lines
+
+
+class Histogram(_Metric):
+    """値の分布（累積バケット・合計・件数）"""
+
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}  # (バケットごとの件数, [合計])
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * len(self.buckets), [0.0])
+                self._values[key] = entry
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1][0] += value
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = self._header()
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# HTTPリクエスト（routeはパスパラメータを含まないルートテンプレート）
+http_requests_total = Counter(
+    "http_requests_total", "HTTPリクエスト数", ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTPリクエストの処理時間（秒）", ("method", "route")
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "処理中のHTTPリクエスト数", ("method",)
+)
+
+# データベース
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds", "データベースクエリの所要時間（秒）", ("table", "operation")
+)
+db_rows_returned_total = Counter(
+    "db_rows_returned_total", "データベースクエリで返された行数", ("table", "operation")
+)
+
+# AIチャット（応答生成はリクエスト内で行うため、生成中の件数をキューの深さとして扱う）
+chat_responses_in_progress = Gauge(
+    "chat_responses_in_progress", "生成中のAIチャット応答数"
+)
+
+
+def _observe_query(table: str, operation: str, shape: str, duration: float, rows: int) -> None:
+    db_query_duration_seconds.observe(duration, table=table, operation=operation)
+    db_rows_returned_total.inc(rows, table=table, operation=operation)
+
+
+add_query_listener(_observe_query)
+
+
+_caches: Dict[str, object] = {}
+
+
+def register_cache(name: str, cache) -> None:
+    """
+    stats()を持つキャッシュを登録し、ヒット率などをメトリクスとして公開します
+    """
+    _caches[name] = cache
+
+
+def _collect_caches() -> List[str]:
+    stats = [(name, cache.stats()) for name, cache in sorted(_caches.items())]
+    lines: List[str] = []
+    for metric, key, type_name, documentation in (
+        ("cache_hits_total", "hits", "counter", "キャッシュのヒット数"),
+        ("cache_misses_total", "misses", "counter", "キャッシュのミス数"),
+        ("cache_hit_ratio", "hit_rate", "gauge", "キャッシュのヒット率"),
+        ("cache_entries", "size", "gauge", "キャッシュのエントリ数"),
+    ):
+        lines.append(f"# HELP {metric} {documentation}")
+        lines.append(f"# TYPE {metric} {type_name}")
+        lines.extend(
+            f"{metric}{_format_labels(('cache',), (name,))} {_format_value(values.get(key, 0))}"
+            for name, values in stats
+        )
+    return lines
+
+
+REGISTRY.register_collector(_collect_caches)
+
+
+def render_metrics() -> str:
+    """
+    全てのメトリクスをPrometheusのテキスト形式で返します
+    """
+    return REGISTRY.render()
@@ -0,0 +1,249 @@
+"""
+データ変更イベントをWebSocket接続へ配信するブローカー
+
+サービス層の書き込みで発生したデータ変更イベントを組織単位でメッセージにし、
+購読条件（エンティティ・操作）に一致する接続の送信キューへ振り分けます
+
+- InProcessBroker: 同じプロセス内の接続にだけ配信します（ワーカーが1つの場合）
+- UnixSocketBroker: 同じホストの他のワーカーにもUnixドメインソケットで転送します（複数ワーカーの場合）
+  転送するメッセージにはrecordを含めません（受信したクライアントは必要に応じて取得し直します）
+"""
+import asyncio
+import glob
+import logging
+import os
+import socket
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.core import events, metrics
+from app.core.config import settings
+from app.utils.json_utils import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# 送信キューが溢れた接続に送るメッセージ（クライアントは一覧を取得し直す）
+OVERFLOW_MESSAGE = {"type": "overflow"}
+
+realtime_connections = metrics.Gauge("realtime_connections", "WebSocketの接続数")
+realtime_dropped_total = metrics.Counter("realtime_dropped_messages_total", "送信キューが溢れて破棄したメッセージ数")
+realtime_forward_dropped_total = metrics.Counter(
+    "realtime_forward_dropped_messages_total", "他のワーカーのソケットが詰まっていて転送を破棄したメッセージ数"
+)
+
+# 他のワーカーへ転送するメッセージの項目（recordはサイズが大きくなり得るため含めない）
+_FORWARDED_KEYS = ("type", "organization_id", "entity", "id", "action")
+
+
+class Subscription:
+    """
+    1つのWebSocket接続の購読条件と送信キュー
+
+    キューは上限付きで、溢れた場合（クライアントの受信が追いつかない場合）は未送信のメッセージを破棄し、
+    代わりにoverflowメッセージを1件だけ送ります
+    """
+
+    def __init__(
+        self,
+        organization_id: int,
+        entities: Optional[Iterable[str]] = None,
+        actions: Optional[Iterable[str]] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self.organization_id = organization_id
+        self.entities: Optional[Set[str]] = None
+        self.actions: Optional[Set[str]] = None
+        self.set_filters(entities, actions)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or settings.REALTIME_QUEUE_SIZE)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+    def set_filters(self, entities: Optional[Iterable[str]], actions: Optional[Iterable[str]]) -> None:
+        """
+        購読するエンティティ・操作を設定します（Noneの場合は全て）
+
+        Raises:
+            ValueError: 文字列のリストでない場合
+        """
+        entities = _to_filter(entities, "entities")
+        actions = _to_filter(actions, "actions")
+        self.entities, self.actions = entities, actions
+
+    def matches(self, message: Dict[str, Any]) -> bool:
+        if message.get("organization_id") != self.organization_id:
+            return False
+        if self.entities is not None and message.get("entity") not in self.entities:
+            return False
+        if self.actions is not None and message.get("action") not in self.actions:
+            return False
+        return True
+
+    def offer(self, message: Dict[str, Any]) -> None:
+        """
+        送信キューにメッセージを追加します（接続のイベントループ上で呼び出します）
+        """
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            dropped = self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.dropped += dropped + 1
+            realtime_dropped_total.inc(dropped + 1)
+            self.queue.put_nowait(OVERFLOW_MESSAGE)
+
+
+def _to_filter(values: Optional[Iterable[str]], name: str) -> Optional[Set[str]]:
+    if not values:
+        return None
+    # 文字列をそのまま渡すと1文字ずつの集合になるため、リスト（タプル）のみ受け付ける
+    if not isinstance(values, (list, tuple, set, frozenset)) or not all(isinstance(value, str) for value in values):
+        raise ValueError(f"{name}は文字列のリストで指定してください")
+    return set(values)
+
+
+class InProcessBroker:
+    """
+    同じプロセス内の購読にメッセージを配信します（スレッドセーフ）
+    """
+
+    def __init__(self):
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    async def start(self) -> None:
+        """購読の受け付け前に呼び出します"""
+
+    def subscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.append(subscription)
+        realtime_connections.inc()
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+                realtime_connections.dec()
+
+    def has_listeners(self) -> bool:
+        """
+        配信先があるかを返します（ない場合はメッセージの作成を省略します）
+        """
+        return bool(self._subscriptions)
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        """
+        メッセージを配信します（どのスレッドからでも呼び出せます）
+        """
+        self.deliver(message)
+
+    def deliver(self, message: Dict[str, Any]) -> None:
+        with self._lock:
+            targets = [subscription for subscription in self._subscriptions if subscription.matches(message)]
+        for subscription in targets:
+            # 接続ごとのイベントループで実行する（書き込みはワーカースレッドから通知されることがある）
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # イベントループが終了済み（接続の終了処理中）
+                self.unsubscribe(subscription)
+
+
+class UnixSocketBroker(InProcessBroker):
+    """
+    同じホストの複数ワーカー間でメッセージを転送するブローカー
+
+    ワーカーごとにディレクトリ内にUnixドメインソケット（データグラム）を作成し、
+    publishしたメッセージを自分の購読に配信したうえで、他のワーカーのソケットへ送信します
+    """
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self.path = os.path.join(directory, f"worker-{os.getpid()}.sock")
+        self._transport = None
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        # 受信側のワーカーが詰まっていても書き込み（イベントループ）を止めない
+        self._sender.setblocking(False)
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    async def start(self) -> None:
+        if self._transport is not None:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._transport is not None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            broker = self
+
+            class _Protocol(asyncio.DatagramProtocol):
+                def datagram_received(self, data, addr):
+                    try:
+                        broker.deliver(loads(data))
+                    except ValueError:
+                        logger.warning("不正なメッセージを受信しました")
+
+            self._transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                _Protocol, local_addr=self.path, family=socket.AF_UNIX
+            )
+
+    def has_listeners(self) -> bool:
+        # 他のワーカーの購読の有無は分からないため常に転送する
+        return True
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        self.deliver(message)
+        payload = dumps({key: message.get(key) for key in _FORWARDED_KEYS})
+        for path in glob.glob(os.path.join(self.directory, "worker-*.sock")):
+            if path == self.path:
+                continue
+            try:
+                self._sender.sendto(payload, path)
+            except BlockingIOError:
+                # 受信バッファが満杯のワーカーには転送しない（待つと書き込みが止まる）
+                realtime_forward_dropped_total.inc()
+                logger.warning("他のワーカーの受信が追いつかないため転送を破棄しました: %s", path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # 終了したワーカーのソケット
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError as e:
+                logger.warning("他のワーカーへの転送に失敗しました: %s", e)
+
+
+def _create_broker() -> InProcessBroker:
+    if settings.REALTIME_BROKER == "unix":
+        return UnixSocketBroker(settings.REALTIME_BROKER_DIR)
+    return InProcessBroker()
+
+
+broker = _create_broker()
+
+
+def to_message(event: events.DataChangeEvent) -> Dict[str, Any]:
+    """
+    データ変更イベントを配信用のメッセージに変換します（日時などは文字列にします）
+    """
+    return loads(dumps({
+        "type": "change",
+        "organization_id": event.organization_id,
+        "entity": event.entity,
+        "id": event.entity_id,
+        "action": event.action,
+        "record": event.record,
+    }))
+
+
+def _publish_change(event: events.DataChangeEvent) -> None:
+    if not settings.REALTIME_ENABLED or event.organization_id is None or not broker.has_listeners():
+        return
+    broker.publish(to_message(event))
+
+
+events.subscribe(_publish_change)
@@ -0,0 +1,163 @@
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 形（shape）にカラム名を含めるメソッド（値は含めない）
+_COLUMN_METHODS = {
+    "select", "eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is_", "in_",
+    "contains", "contained_by", "filter", "match", "order", "text_search", "fts",
+}
+_OPERATIONS = ("select", "insert", "update", "upsert", "delete", "rpc")
+
+
+@dataclass
+class QueryStats:
+    """1リクエスト中に発行したクエリの集計"""
+    count: int = 0
+    db_time: float = 0.0  # 秒
+    rows: int = 0
+    shapes: Counter = field(default_factory=Counter)  # クエリの形 -> 発行回数
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, shape: str, duration: float, rows: int) -> None:
+        # エージェントのツール実行などでスレッドから記録されることがあるためロックする
+        with self._lock:
+            self.count += 1
+            self.db_time += duration
+            self.rows += rows
+            self.shapes[shape] += 1
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        threshold回以上発行された同じ形のクエリ（N+1の疑い）を多い順に返します
+        """
+        with self._lock:
+            return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+QueryListener = Callable[[str, str, str, float, int], None]  # (table, operation, shape, duration, rows)
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_listeners: List[QueryListener] = []
+
+
+def start_query_stats() -> QueryStats:
+    """
+    現在のコンテキスト（リクエスト）でクエリの集計を開始します
+    """
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """
+    現在のコンテキストの集計を返します（集計していない場合はNone）
+    """
+    return _current_stats.get()
+
+
+def add_query_listener(listener: QueryListener) -> None:
+    """
+    クエリ実行ごとに呼び出されるリスナーを登録します（メトリクス収集用）
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def _record(table: str, operation: str, shape: str, duration: float, rows: int) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(shape, duration, rows)
+    for listener in _listeners:
+        listener(table, operation, shape, duration, rows)
+
+
+def _describe_step(name: str, args: Tuple[Any, ...]) -> str:
+    if name in _COLUMN_METHODS and args and isinstance(args[0], str):
+        return f"{name}({args[0]})"
+    return name
+
+
+def _row_count(response: Any) -> int:
+    data = getattr(response, "data", None)
+    if isinstance(data, list):
+        return len(data)
+    return 1 if data else 0
+
+
+class InstrumentedQuery:
+    """
+    PostgRESTのクエリビルダーをラップし、execute()の所要時間と件数を記録します
+    メソッドチェーンはそのまま委譲し、呼び出したメソッドとカラム名からクエリの形を組み立てます
+    """
+
+    def __init__(self, builder: Any, table: str, steps: Tuple[str, ...] = ()):
+        self._builder = builder
+        self._table = table
+        self._steps = steps
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if callable(attr):
+            def call(*args, **kwargs):
+                result = attr(*args, **kwargs)
+                if hasattr(result, "execute"):
+                    return InstrumentedQuery(result, self._table, self._steps + (_describe_step(name, args),))
+                return result
+            return call
+        # not_ のようにプロパティでビルダーを返すもの
+        if hasattr(attr, "execute"):
+            return InstrumentedQuery(attr, self._table, self._steps + (name,))
+        return attr
+
+    @property
+    def operation(self) -> str:
+        for step in self._steps:
+            name = step.split("(", 1)[0]
+            if name in _OPERATIONS:
+                return name
+        return "select"
+
+    @property
+    def shape(self) -> str:
+        return f"{self._table}:" + ".".join(self._steps)
+
+    def execute(self) -> Any:
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self._builder.execute()
+            return response
+        finally:
+            _record(
+                self._table,
+                self.operation,
+                self.shape,
+                time.perf_counter() - started,
+                _row_count(response) if response is not None else 0,
+            )
+
+
+class InstrumentedClient:
+    """
+    Supabaseクライアントをラップし、テーブル・RPCへのクエリを計測します
+    それ以外の属性（auth など）は元のクライアントに委譲します
+    """
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def table(self, table_name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.table(table_name), table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.rpc(fn, params or {}), f"rpc:{fn}", ("rpc",))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
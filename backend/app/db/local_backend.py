@@ -0,0 +1,689 @@
+import copy
+import glob
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.db.local_functions import LOCAL_FUNCTIONS
+
+# スキーマ定義を読み込むSQLファイル（backend/ からの相対パス、記載順に適用）
+SCHEMA_FILES = ("db/init_tables.sql", "migrations/*.sql")
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_CREATE_TABLE_PATTERN = re.compile(
+    r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\((.*?)\);", re.IGNORECASE | re.DOTALL
+)
+_ADD_COLUMN_PATTERN = re.compile(
+    r"ALTER\s+TABLE\s+(\w+)\s+ADD\s+COLUMN\s+(?:IF\s+NOT\s+EXISTS\s+)?(.*?);", re.IGNORECASE | re.DOTALL
+)
+_CREATE_INDEX_PATTERN = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?\w+\s+ON\s+(\w+)\s*\(\s*(\w+)", re.IGNORECASE
+)
+_DEFAULT_PATTERN = re.compile(r"\bDEFAULT\s+('(?:[^']|'')*'|[\w.()-]+)", re.IGNORECASE)
+_CONSTRAINT_KEYWORDS = ("PRIMARY", "FOREIGN", "UNIQUE", "CONSTRAINT", "CHECK")
+
+
+class LocalBackendError(Exception):
+    """ローカルバックエンドでのクエリエラー"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _strip_comments(sql: str) -> str:
+    return re.sub(r"--[^\n]*", "", sql)
+
+
+def _split_columns(body: str) -> List[str]:
+    # 括弧の外側のカンマで列定義を分割する
+    parts, depth, current = [], 0, []
+    for char in body:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _parse_default(definition: str) -> Optional[Callable[[], Any]]:
+    match = _DEFAULT_PATTERN.search(definition)
+    if not match:
+        return None
+    raw = match.group(1)
+    upper = raw.upper()
+    if upper in ("NOW()", "CURRENT_TIMESTAMP"):
+        return _now
+    if upper == "TRUE":
+        return lambda: True
+    if upper == "FALSE":
+        return lambda: False
+    if upper == "NULL":
+        return lambda: None
+    if raw.startswith("'"):
+        value = raw[1:-1].replace("''", "'")
+        return lambda: value
+    try:
+        number = int(raw)
+    except ValueError:
+        try:
+            number = float(raw)
+        except ValueError:
+            return None
+    return lambda: number
+
+
+def _to_integer(value: Any) -> Any:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float):
+        return round(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            raise LocalBackendError(f'invalid input syntax for type integer: "{value}"')
+    return value
+
+
+def _to_float(value: Any) -> Any:
+    if isinstance(value, (int, str)) and not isinstance(value, bool):
+        try:
+            return float(value)
+        except ValueError:
+            raise LocalBackendError(f'invalid input syntax for type double precision: "{value}"')
+    return value
+
+
+def _to_boolean(value: Any) -> Any:
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "t", "yes", "y", "on", "1"):
+            return True
+        if lowered in ("false", "f", "no", "n", "off", "0"):
+            return False
+        raise LocalBackendError(f'invalid input syntax for type boolean: "{value}"')
+    if isinstance(value, int):
+        return bool(value)
+    return value
+
+
+def _to_date(value: Any) -> Any:
+    # PostgRESTは日付をISO形式の文字列で返す（日時の文字列は日付の部分だけにする）
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str) and len(value) > 10 and value[10] in ("T", " "):
+        return value[:10]
+    return value
+
+
+def _to_timestamp(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time()).isoformat()
+    return value
+
+
+# 列の型（先頭の単語） -> 値の変換（PostgreSQLが書き込み時に行う型変換の代替）
+_TYPE_COERCIONS: Dict[str, Callable[[Any], Any]] = {
+    "SMALLINT": _to_integer,
+    "INTEGER": _to_integer,
+    "INT": _to_integer,
+    "BIGINT": _to_integer,
+    "SERIAL": _to_integer,
+    "BIGSERIAL": _to_integer,
+    "FLOAT": _to_float,
+    "REAL": _to_float,
+    "DOUBLE": _to_float,
+    "NUMERIC": _to_float,
+    "DECIMAL": _to_float,
+    "BOOLEAN": _to_boolean,
+    "BOOL": _to_boolean,
+    "DATE": _to_date,
+    "TIMESTAMP": _to_timestamp,
+    "TIMESTAMPTZ": _to_timestamp,
+}
+
+
+def _parse_coercion(definition: str) -> Optional[Callable[[Any], Any]]:
+    parts = definition.split()
+    if len(parts) < 2:
+        return None
+    return _TYPE_COERCIONS.get(parts[1].split("(")[0].upper())
+
+
+@dataclass
+class LocalResponse:
+    """execute()の結果（postgrestのAPIResponseと同じ属性を持つ）"""
+    data: List[Dict[str, Any]]
+    count: Optional[int] = None
+
+
+class LocalTable:
+    """
+    1テーブル分の行データ
+    列は固定せず（スキーマ定義にない列も保存する）、定義済みの列には既定値を補完し、
+    数値・真偽値・日付・日時の列の値は列の型に変換して保存します（PostgreSQLと同じく '12.5' は12.5になる）
+    eq/in_で絞り込まれた列には初回利用時にハッシュインデックスを作成し、以降は書き込みごとに更新します
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows: Dict[int, Dict[str, Any]] = {}
+        self.columns: Dict[str, Optional[Callable[[], Any]]] = {}  # 列名 -> 既定値
+        self.coercions: Dict[str, Callable[[Any], Any]] = {}  # 列名 -> 型の変換
+        self.indexes: Dict[str, Dict[Any, Set[int]]] = {}
+        self._next_id = 1
+
+    def add_column(
+        self, name: str, default: Optional[Callable[[], Any]] = None,
+        coercion: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        # 複数のファイルで定義されている場合は先に読み込んだ定義を優先する
+        if name in self.columns:
+            return
+        self.columns[name] = default
+        if coercion is not None:
+            self.coercions[name] = coercion
+        for row in self.rows.values():
+            row.setdefault(name, default() if default else None)
+
+    def ensure_index(self, column: str) -> Dict[Any, Set[int]]:
+        index = self.indexes.get(column)
+        if index is None:
+            index = {}
+            for row_id, row in self.rows.items():
+                index.setdefault(_index_key(row.get(column)), set()).add(row_id)
+            self.indexes[column] = index
+        return index
+
+    def insert(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        row = {
+            column: default() if default else None
+            for column, default in self.columns.items()
+            if column not in values
+        }
+        row.update(self._coerce_values(values))
+        if row.get("id") is None:
+            row["id"] = self._next_id
+        row_id = row["id"]
+        if row_id in self.rows:
+            raise LocalBackendError(f'duplicate key value violates unique constraint "{self.name}_pkey"')
+        self._next_id = max(self._next_id, int(row_id) + 1)
+        self.rows[row_id] = row
+        self._index_row(row_id, row)
+        return row
+
+    def update(self, row_id: int, values: Dict[str, Any]) -> Dict[str, Any]:
+        row = self.rows[row_id]
+        values = self._coerce_values(values)
+        self._unindex_row(row_id, row)
+        row.update(values)
+        self._index_row(row_id, row)
+        return row
+
+    def _coerce_values(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        # 変換が必要な値がある場合だけ辞書をコピーする（呼び出し元の辞書は変更しない）
+        coerced: Optional[Dict[str, Any]] = None
+        for column, coercion in self.coercions.items():
+            value = values.get(column)
+            if value is None:
+                continue
+            converted = coercion(value)
+            if converted is not value:
+                if coerced is None:
+                    coerced = dict(values)
+                coerced[column] = converted
+        return values if coerced is None else coerced
+
+    def delete(self, row_id: int) -> Dict[str, Any]:
+        row = self.rows.pop(row_id)
+        self._unindex_row(row_id, row)
+        return row
+
+    def _index_row(self, row_id: int, row: Dict[str, Any]) -> None:
+        for column, index in self.indexes.items():
+            index.setdefault(_index_key(row.get(column)), set()).add(row_id)
+
+    def _unindex_row(self, row_id: int, row: Dict[str, Any]) -> None:
+        for column, index in self.indexes.items():
+            ids = index.get(_index_key(row.get(column)))
+            if ids is not None:
+                ids.discard(row_id)
+
+
+def _index_key(value: Any) -> Any:
+    # eq("id", "5") のように文字列で渡された値とも一致させる
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return str(int(value)) if float(value).is_integer() else str(value)
+    return str(value)
+
+
+def _coerce(value: Any, like: Any) -> Any:
+    if isinstance(like, bool) and isinstance(value, str):
+        return value.lower() == "true"
+    if isinstance(like, (int, float)) and not isinstance(like, bool) and isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    if isinstance(like, str) and not isinstance(value, str) and value is not None:
+        return str(value)
+    return value
+
+
+def _like_to_regex(pattern: str, ignore_case: bool) -> "re.Pattern":
+    # PostgreSQLと同じく「\」の次の文字はワイルドカードとして扱わない
+    parts = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            parts.append(re.escape(char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        else:
+            parts.append(".*" if char == "%" else "." if char == "_" else re.escape(char))
+    regex = "".join(parts)
+    return re.compile(f"^{regex}$", re.IGNORECASE | re.DOTALL if ignore_case else re.DOTALL)
+
+
+def _compare(row_value: Any, operator: str, value: Any) -> bool:
+    if operator == "is":
+        if value is None or (isinstance(value, str) and value.lower() == "null"):
+            return row_value is None
+        return row_value is _coerce(value, True)
+    if row_value is None:
+        return False
+    if operator == "in":
+        keys = {_index_key(item) for item in value}
+        return _index_key(row_value) in keys
+    if operator in ("like", "ilike"):
+        return bool(_like_to_regex(str(value), operator == "ilike").match(str(row_value)))
+
+    value = _coerce(value, row_value)
+    try:
+        if operator == "eq":
+            return _index_key(row_value) == _index_key(value)
+        if operator == "neq":
+            return _index_key(row_value) != _index_key(value)
+        if operator == "gt":
+            return row_value > value
+        if operator == "gte":
+            return row_value >= value
+        if operator == "lt":
+            return row_value < value
+        if operator == "lte":
+            return row_value <= value
+    except TypeError:
+        return False
+    raise LocalBackendError(f"未対応の演算子です: {operator}")
+
+
+class LocalQuery:
+    """
+    PostgRESTのクエリビルダーのうち、サービス層が使用する部分を実装します
+    """
+
+    def __init__(self, backend: "LocalBackend", table: str):
+        self._backend = backend
+        self._table = table
+        self._operation = "select"
+        self._columns: Optional[List[str]] = None
+        self._count: Optional[str] = None
+        self._payload: Any = None
+        self._filters: List[Tuple[str, str, Any, bool]] = []  # (列, 演算子, 値, 否定)
+        self._orders: List[Tuple[str, bool, Optional[bool]]] = []  # (列, 降順, NULLを先頭にするか)
+        self._offset = 0
+        self._limit: Optional[int] = None
+        self._negate_next = False
+        self._single = False
+
+    # 操作
+    def select(self, *columns: str, count: Optional[str] = None) -> "LocalQuery":
+        names = [name.strip() for column in columns for name in column.split(",") if name.strip()]
+        self._columns = None if not names or "*" in names else names
+        self._count = count
+        return self
+
+    def insert(self, data: Any, **kwargs) -> "LocalQuery":
+        self._operation = "insert"
+        self._payload = data
+        return self
+
+    def upsert(self, data: Any, on_conflict: str = "id", ignore_duplicates: bool = False, **kwargs) -> "LocalQuery":
+        self._operation = "upsert"
+        self._payload = (data, on_conflict or "id", ignore_duplicates)
+        return self
+
+    def update(self, data: Dict[str, Any], **kwargs) -> "LocalQuery":
+        self._operation = "update"
+        self._payload = data
+        return self
+
+    def delete(self, **kwargs) -> "LocalQuery":
+        self._operation = "delete"
+        return self
+
+    # フィルター
+    def _filter(self, column: str, operator: str, value: Any) -> "LocalQuery":
+        self._filters.append((column, operator, value, self._negate_next))
+        self._negate_next = False
+        return self
+
+    @property
+    def not_(self) -> "LocalQuery":
+        self._negate_next = True
+        return self
+
+    def eq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "lte", value)
+
+    def like(self, column: str, pattern: str) -> "LocalQuery":
+        return self._filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> "LocalQuery":
+        return self._filter(column, "ilike", pattern)
+
+    def is_(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "is", value)
+
+    def in_(self, column: str, values: Iterable[Any]) -> "LocalQuery":
+        return self._filter(column, "in", list(values))
+
+    # 並び順・件数
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None, **kwargs) -> "LocalQuery":
+        self._orders.append((column, desc, nullsfirst))
+        return self
+
+    def range(self, start: int, end: int) -> "LocalQuery":
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def limit(self, size: int, **kwargs) -> "LocalQuery":
+        self._limit = size
+        return self
+
+    def single(self) -> "LocalQuery":
+        self._single = True
+        return self.limit(1)
+
+    def maybe_single(self) -> "LocalQuery":
+        return self.single()
+
+    def execute(self) -> LocalResponse:
+        return self._backend.execute(self)
+
+    # 実行（LocalBackendのロック内で呼び出される）
+    def _run(self, table: LocalTable) -> LocalResponse:
+        if self._operation == "insert":
+            rows = [table.insert(copy.deepcopy(values)) for values in self._payload_rows(self._payload)]
+            return LocalResponse(data=[dict(row) for row in rows])
+
+        if self._operation == "upsert":
+            payload, conflict_column, ignore_duplicates = self._payload
+            rows = []
+            for values in self._payload_rows(payload):
+                key = values.get(conflict_column)
+                existing = table.ensure_index(conflict_column).get(_index_key(key)) if key is not None else None
+                if existing and ignore_duplicates:
+                    # ON CONFLICT DO NOTHING と同じく、既存の行は変更せず結果にも含めない
+                    continue
+                if existing:
+                    rows.append(table.update(next(iter(existing)), copy.deepcopy(values)))
+                else:
+                    rows.append(table.insert(copy.deepcopy(values)))
+            return LocalResponse(data=[dict(row) for row in rows])
+
+        row_ids = self._matching_ids(table)
+
+        if self._operation == "update":
+            rows = [table.update(row_id, copy.deepcopy(self._payload)) for row_id in row_ids]
+            return LocalResponse(data=[dict(row) for row in rows])
+
+        if self._operation == "delete":
+            rows = [table.delete(row_id) for row_id in row_ids]
+            return LocalResponse(data=rows)
+
+        rows = [table.rows[row_id] for row_id in row_ids]
+        for column, desc, nullsfirst in reversed(self._orders):
+            # PostgreSQLの既定: 昇順はNULLを末尾、降順はNULLを先頭
+            nulls_first = desc if nullsfirst is None else nullsfirst
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row: row[column], reverse=desc)
+            rows = missing + present if nulls_first else present + missing
+
+        total = len(rows)
+        end = None if self._limit is None else self._offset + self._limit
+        rows = rows[self._offset:end]
+        data = [
+            copy.deepcopy(row) if self._columns is None else {column: copy.deepcopy(row.get(column)) for column in self._columns}
+            for row in rows
+        ]
+        if self._single:
+            if not data:
+                raise LocalBackendError("JSON object requested, multiple (or no) rows returned")
+            return LocalResponse(data=data[0], count=total if self._count else None)
+        return LocalResponse(data=data, count=total if self._count else None)
+
+    @staticmethod
+    def _payload_rows(payload: Any) -> List[Dict[str, Any]]:
+        return payload if isinstance(payload, list) else [payload]
+
+    def _matching_ids(self, table: LocalTable) -> List[int]:
+        candidates: Optional[Set[int]] = None
+        remaining = []
+        for column, operator, value, negate in self._filters:
+            # 否定でない一致条件はハッシュインデックスで候補を絞り込む
+            if not negate and operator in ("eq", "in"):
+                index = table.ensure_index(column)
+                values = [value] if operator == "eq" else value
+                ids: Set[int] = set()
+                for item in values:
+                    ids |= index.get(_index_key(item), set())
+                candidates = ids if candidates is None else candidates & ids
+            else:
+                remaining.append((column, operator, value, negate))
+
+        row_ids = list(table.rows) if candidates is None else sorted(candidates, key=_sort_key)
+        return [
+            row_id for row_id in row_ids
+            if all(
+                _compare(table.rows[row_id].get(column), operator, value) != negate
+                for column, operator, value, negate in remaining
+            )
+        ]
+
+
+def _sort_key(row_id: Any) -> Tuple[int, Any]:
+    # 挿入順（通常はid順）で返す
+    return (0, row_id) if isinstance(row_id, (int, float)) else (1, str(row_id))
+
+
+@dataclass
+class _AuthUser:
+    id: Any
+    email: str
+
+
+@dataclass
+class _AuthResponse:
+    user: Optional[_AuthUser]
+    session: Optional[Dict[str, Any]] = None
+
+
+class LocalAuth:
+    """
+    Supabase Authの最小限の代替（usersテーブルにメールアドレスがあればサインイン成功とみなす）
+    ローカルでのベンチマーク・動作確認専用で、パスワードは検証しません
+    """
+
+    def __init__(self, backend: "LocalBackend"):
+        self._backend = backend
+
+    def sign_in_with_password(self, credentials: Dict[str, Any]) -> _AuthResponse:
+        response = self._backend.table("users").select("*").eq("email", credentials.get("email")).limit(1).execute()
+        if not response.data:
+            return _AuthResponse(user=None)
+        user = response.data[0]
+        return _AuthResponse(user=_AuthUser(id=user.get("auth_id") or user["id"], email=user["email"]))
+
+
+class _LocalRpc:
+    def __init__(self, backend: "LocalBackend", fn: str, params: Dict[str, Any]):
+        self._backend = backend
+        self._fn = fn
+        self._params = params
+
+    def execute(self) -> LocalResponse:
+        handler = self._backend.rpc_functions.get(self._fn)
+        if handler is None:
+            raise LocalBackendError(f"Could not find the function public.{self._fn}")
+        self._backend.simulate_latency()
+        # データベース関数と同じく、実行中に他の書き込みが割り込まないようにする
+        with self._backend._lock:
+            return LocalResponse(data=handler(self._backend, self._params))
+
+
+class LocalBackend:
+    """
+    Supabaseクライアントの代わりに使うインメモリのデータベース
+    テーブル定義はSQLファイル（db/init_tables.sql とマイグレーション）から列と既定値を読み込み、
+    定義のないテーブルは初回アクセス時に作成します
+    """
+
+    def __init__(self, latency_ms: Optional[float] = None, schema_files: Iterable[str] = SCHEMA_FILES):
+        self.latency_ms = settings.LOCAL_DB_LATENCY_MS if latency_ms is None else latency_ms
+        self.tables: Dict[str, LocalTable] = {}
+        self.rpc_functions: Dict[str, Callable[["LocalBackend", Dict[str, Any]], Any]] = dict(LOCAL_FUNCTIONS)
+        self.auth = LocalAuth(self)
+        self._lock = threading.RLock()
+        self.load_schema(schema_files)
+
+    def load_schema(self, schema_files: Iterable[str] = SCHEMA_FILES) -> None:
+        """
+        SQLファイルからテーブル・列・既定値・インデックスを読み込みます
+        """
+        paths: List[str] = []
+        for pattern in schema_files:
+            paths.extend(sorted(glob.glob(os.path.join(_BACKEND_DIR, pattern))))
+
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                sql = _strip_comments(f.read())
+            for name, body in _CREATE_TABLE_PATTERN.findall(sql):
+                table = self.get_table(name)
+                for definition in _split_columns(body):
+                    column = definition.split()[0].strip('"')
+                    if column.upper() in _CONSTRAINT_KEYWORDS:
+                        continue
+                    if column != "id":
+                        table.add_column(column, _parse_default(definition), _parse_coercion(definition))
+            for name, definition in _ADD_COLUMN_PATTERN.findall(sql):
+                column = definition.split()[0].strip('"')
+                self.get_table(name).add_column(column, _parse_default(definition), _parse_coercion(definition))
+            for name, column in _CREATE_INDEX_PATTERN.findall(sql):
+                self.get_table(name).ensure_index(column)
+
+    def get_table(self, name: str) -> LocalTable:
+        with self._lock:
+            table = self.tables.get(name)
+            if table is None:
+                table = LocalTable(name)
+                self.tables[name] = table
+            return table
+
+    def table(self, table_name: str) -> LocalQuery:
+        return LocalQuery(self, table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> _LocalRpc:
+        return _LocalRpc(self, fn, params or {})
+
+    def register_rpc(self, name: str, handler: Callable[["LocalBackend", Dict[str, Any]], Any]) -> None:
+        """
+        rpc()で呼び出せる関数を登録します（データベース関数の代替）
+        """
+        self.rpc_functions[name] = handler
+
+    def select_rows(self, table_name: str, column: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        列の値が一致する行を返します（遅延は挿入しません。データベース関数の代替実装から使います）
+        返した行は変更しないでください
+        """
+        table = self.get_table(table_name)
+        with self._lock:
+            row_ids = table.ensure_index(column).get(_index_key(value), ())
+            return [table.rows[row_id] for row_id in row_ids]
+
+    def execute(self, query: LocalQuery) -> LocalResponse:
+        self.simulate_latency()
+        table = self.get_table(query._table)
+        with self._lock:
+            return query._run(table)
+
+    def simulate_latency(self) -> None:
+        """
+        設定された遅延を挿入します（ネットワーク越しのラウンドトリップの模擬）
+        """
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+    def reset(self) -> None:
+        """
+        全てのデータを削除し、スキーマを読み込み直します
+        """
+        with self._lock:
+            self.tables.clear()
+            self.load_schema()
+
+
+_backend: Optional[LocalBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_local_backend() -> LocalBackend:
+    """
+    プロセス内で共有するローカルバックエンドを取得します
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = LocalBackend()
+    return _backend
@@ -0,0 +1,123 @@
+"""
+ローカルバックエンドのrpc()で呼び出すデータベース関数の代替実装
+
+migrations/ に定義した関数と同じ引数・戻り値にしてください
+"""
+from collections import Counter
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict
+
+if TYPE_CHECKING:
+    from app.db.local_backend import LocalBackend
+
+
+def _number(value: Any) -> float:
+    # SQLのSUMと同じくNULLは0として数える（スキーマ定義のないテーブルでは文字列のこともある）
+    if value is None or value == "":
+        return 0.0
+    return float(value)
+
+
+def _date_part(value: Any) -> str:
+    # 日時は文字列（ISO形式）またはdatetimeで保存されている
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+def dashboard_summary(backend: "LocalBackend", params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    migrations/create_dashboard_summary_function.sql の dashboard_summary
+    """
+    organization_id = params["p_organization_id"]
+    today = _date_part(params["p_today"])
+    completed = params["p_completed_task_status"]
+
+    tasks = backend.select_rows("tasks", "organization_id", organization_id)
+    tasks_by_status = Counter(row.get("status") for row in tasks)
+    due_today = overdue = 0
+    for row in tasks:
+        if row.get("status") == completed or row.get("scheduled_date") is None:
+            continue
+        scheduled = _date_part(row["scheduled_date"])
+        if scheduled == today:
+            due_today += 1
+        elif scheduled < today:
+            overdue += 1
+
+    plans = backend.select_rows("planting_plans", "organization_id", organization_id)
+    active_plan_ids = [row["id"] for row in plans if row.get("status") == params["p_active_plan_status"]]
+    cultivated_area = 0.0
+    for plan_id in active_plan_ids:
+        cultivated_area += sum(
+            _number(row.get("area")) for row in backend.select_rows("planting_plan_fields", "planting_plan_id", plan_id)
+        )
+
+    low_stock = sum(
+        1 for row in backend.select_rows("resources", "organization_id", organization_id)
+        if row.get("resource_type") == params["p_consumable_resource_type"]
+        and row.get("quantity") is not None
+        and _number(row["quantity"]) <= params["p_low_stock_threshold"]
+    )
+
+    fields = backend.select_rows("fields", "organization_id", organization_id)
+    return {
+        "tasks_due_today": due_today,
+        "tasks_overdue": overdue,
+        "tasks_by_status": dict(tasks_by_status),
+        "plans_by_status": dict(Counter(row.get("status") for row in plans)),
+        "low_stock_resources": low_stock,
+        "cultivated_area": cultivated_area,
+        "field_count": len(fields),
+        "total_field_area": sum(_number(row.get("area")) for row in fields),
+    }
+
+
+# 関数名 -> 代替実装
+def _timestamp(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def record_chat_message(backend: "LocalBackend", params: Dict[str, Any]) -> None:
+    """
+    migrations/create_record_chat_message_function.sql の record_chat_message
+    """
+    table = backend.get_table("chat_sessions")
+    row = table.rows.get(params["p_session_id"])
+    if row is None:
+        return None
+
+    created_at = params["p_created_at"]
+    values: Dict[str, Any] = {"message_count": (row.get("message_count") or 0) + 1}
+    if row.get("updated_at") is None or _timestamp(row["updated_at"]) < _timestamp(created_at):
+        values["updated_at"] = created_at
+    if row.get("last_message_id") is None or row["last_message_id"] < params["p_message_id"]:
+        values.update({
+            "last_message_id": params["p_message_id"],
+            "last_message_preview": params["p_preview"],
+            "last_message_is_from_ai": params["p_is_from_ai"],
+            "last_message_at": created_at,
+        })
+    table.update(row["id"], values)
+    return None
+
+
+def sync_id_sequence(backend: "LocalBackend", params: Dict[str, Any]) -> int:
+    """
+    migrations/create_sync_id_sequence_function.sql の sync_id_sequence
+    """
+    table = backend.get_table(params["p_table"])
+    value = max((int(row_id) for row_id in table.rows), default=1)
+    table._next_id = max(table._next_id, value + 1)
+    return value
+
+
+LOCAL_FUNCTIONS: Dict[str, Callable[["LocalBackend", Dict[str, Any]], Any]] = {
+    "dashboard_summary": dashboard_summary,
+    "record_chat_message": record_chat_message,
+    "sync_id_sequence": sync_id_sequence,
+}
@@ -1,13 +1,45 @@
-from typing import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Generator, Iterator, Optional
 from supabase import create_client, Client
 
 from app.core.config import settings
+from app.db.instrumentation import InstrumentedClient
+from app.db.local_backend import get_local_backend
+
+# shared_client()の中で共有するクライアント
+_shared_client: ContextVar[Optional[Client]] = ContextVar("shared_supabase_client", default=None)
 
 def get_supabase_client() -> Client:
     """
     Supabaseクライアントを取得します
+    DATABASE_BACKENDが"local"の場合はインメモリの代替実装を返し、
+    DB_INSTRUMENTATION_ENABLEDが有効な場合はクエリを計測するラッパーを返します
+    shared_client()の中では共有のクライアントを返します
+    """
+    shared = _shared_client.get()
+    if shared is not None:
+        return shared
+    if settings.DATABASE_BACKEND == "local":
+        client = get_local_backend()
+    else:
+        client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    if settings.DB_INSTRUMENTATION_ENABLED:
+        return InstrumentedClient(client)
+    return client
+
+@contextmanager
+def shared_client() -> Iterator[Client]:
     """
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    このコンテキスト（とそこから起動したスレッド）でget_supabase_client()が同じクライアントを返すようにします
+    バッチAPIの副リクエストで、リクエストごとにクライアントを作成しないために使います
+    """
+    client = get_supabase_client()
+    token = _shared_client.set(client)
+    try:
+        yield client
+    finally:
+        _shared_client.reset(token)
 
 def get_db() -> Generator:
     """
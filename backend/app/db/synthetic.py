@@ -0,0 +1,567 @@
+import csv
+import io
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields as dataclass_fields
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+_SOIL_TYPES = ["黒ボク土", "褐色森林土", "灰色低地土", "グライ土", "砂質土"]
+_CROPS = [
+    ("トマト", "ナス科"), ("ナス", "ナス科"), ("ピーマン", "ナス科"), ("キャベツ", "アブラナ科"),
+    ("ブロッコリー", "アブラナ科"), ("ハクサイ", "アブラナ科"), ("キュウリ", "ウリ科"), ("カボチャ", "ウリ科"),
+    ("タマネギ", "ヒガンバナ科"), ("ニンジン", "セリ科"), ("ジャガイモ", "ナス科"), ("ダイズ", "マメ科"),
+]
+# 作物の作業フロー（WorkflowStepのツリー: 名前, 定植日からの日数, 子フロー）
+_WORKFLOW_TREE = [
+    ("育苗", -40, [("播種", -40, []), ("鉢上げ", -25, []), ("順化", -5, [])]),
+    ("圃場づくり", -14, [("堆肥散布", -14, []), ("ディスクハロー", -12, []), ("肥料散布", -10, []),
+                          ("ロータリー", -9, []), ("畝立て", -7, []), ("マルチ張り", -6, [])]),
+    ("定植", 0, []),
+    ("栽培管理", 7, [("追肥", 30, []), ("誘引", 35, []), ("除草", 40, [])]),
+    ("収穫", 90, [("収穫", 90, []), ("出荷調製", 91, [])]),
+]
+# 作業工程を作物のフローより多く生成する場合に、栽培管理の下に繰り返し追加する作業
+_RECURRING_STEPS = ["見回り", "潅水", "防除"]
+_TASK_TYPES = ["耕起", "施肥", "防除", "除草", "潅水", "収穫", "見回り"]
+_TASK_STATUSES = ["pending", "in_progress", "completed"]
+_PLAN_STATUSES = ["計画中", "進行中", "完了"]
+_SEASONS = ["春夏", "秋冬"]
+_RESOURCES = [
+    ("化成肥料", "資材", "袋"), ("有機肥料", "資材", "袋"), ("殺虫剤", "資材", "本"), ("マルチフィルム", "資材", "巻"),
+    ("トラクター", "農機", "台"), ("管理機", "農機", "台"), ("動力噴霧器", "農機", "台"),
+]
+_CHAT_QUESTIONS = [
+    "{crop}の定植日はいつ？", "今週の作業を教えて", "{crop}の病害虫対策は？", "{resource}の在庫は？",
+    "{crop}の収穫時期は？", "肥料の量はどのくらい？", "{crop}の葉が黄色くなってきたけど原因は？",
+    "明日の防除は雨でも大丈夫？", "{crop}の追肥のタイミングを教えて",
+]
+_CHAT_ANSWERS = [
+    "「{question}」について、登録されている作付け計画を確認しました。予定日の前後で天候を確認して作業してください。",
+    "「{question}」ですね。土壌の状態と生育ステージによって変わるため、圃場ごとの記録を参考にしてください。",
+    "病害虫の早期発見と対策が重要です。「{question}」については、まず被害株の位置と症状を記録しましょう。",
+]
+# 組織ごとに割り当てるidの範囲（既定では組織ID × この値をidのオフセットにする）
+ID_BLOCK_SIZE = 10_000_000
+# 既存の行があれば投入しない（ON CONFLICT DO NOTHING）テーブル
+_INSERT_IF_ABSENT_TABLES = ("organizations", "users")
+# chat_sessions.last_message_previewの長さ（VARCHAR(200)。ChatServiceと同じ）
+_LAST_MESSAGE_PREVIEW_LENGTH = 200
+
+
+def _random_polygon(rng: random.Random, center_lat: float, center_lng: float, radius_m: float) -> List[Dict[str, float]]:
+    """
+    中心点の周りに頂点数5〜8の不規則な凸多角形（緯度経度）を生成します
+    """
+    vertices = rng.randint(5, 8)
+    angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(vertices))
+    meters_per_lat = 111_320.0
+    meters_per_lng = 111_320.0 * math.cos(math.radians(center_lat))
+    coordinates = []
+    for angle in angles:
+        distance = radius_m * rng.uniform(0.8, 1.2)
+        coordinates.append({
+            "lat": round(center_lat + distance * math.sin(angle) / meters_per_lat, 7),
+            "lng": round(center_lng + distance * math.cos(angle) / meters_per_lng, 7),
+        })
+    return coordinates
+
+
+def polygon_area_ha(coordinates: List[Dict[str, float]]) -> float:
+    """
+    緯度経度の多角形の面積（ヘクタール）を求めます（圃場程度の大きさを想定した平面近似）
+    """
+    if len(coordinates) < 3:
+        return 0.0
+    lat0 = math.radians(sum(point["lat"] for point in coordinates) / len(coordinates))
+    points = [
+        (point["lng"] * 111_320.0 * math.cos(lat0), point["lat"] * 111_320.0)
+        for point in coordinates
+    ]
+    area = 0.0
+    for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+        area += x1 * y2 - x2 * y1
+    return abs(area) / 2 / 10_000
+
+
+def _workflow_steps(tree: List[Tuple[str, int, list]], day_offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    作業フローのツリーをWorkflowStepと同じ形の辞書に変換します
+    """
+    return [
+        {"name": name, "days": days + day_offset, "sub_steps": _workflow_steps(children, day_offset)}
+        for name, days, children in tree
+    ]
+
+
+@dataclass
+class SyntheticScale:
+    """生成する1組織分のデータ量"""
+    fields: int = 5000
+    crops: int = 50
+    planting_plans: int = 2000
+    workflow_instances: int = 100000
+    tasks: int = 200000
+    resources: int = 500
+    chat_sessions: int = 200
+    chat_messages: int = 10000
+
+    def scaled(self, factor: float) -> "SyntheticScale":
+        """
+        各件数にfactorを掛けた規模を返します（最低1件）
+        """
+        return SyntheticScale(**{
+            item.name: max(1, int(getattr(self, item.name) * factor)) for item in dataclass_fields(self)
+        })
+
+
+class SyntheticDataGenerator:
+    """
+    決定的な（同じseedなら同じ結果になる）合成営農データを生成します
+    行はテーブルごとにid順で生成し、idは id_offset + 1 から採番します
+    （既存データや他の組織の合成データと衝突しないよう、投入先に応じてid_offsetを指定します）
+    組織の行は organization_id をidとし、既に存在する場合は投入しません
+    """
+
+    def __init__(
+        self,
+        scale: SyntheticScale,
+        organization_id: int = 1,
+        seed: int = 42,
+        base_date: Optional[date] = None,
+        id_offset: int = 0,
+    ):
+        self.scale = scale
+        self.organization_id = organization_id
+        self.id_offset = id_offset
+        self.seed = seed
+        self.base_date = base_date or date(2024, 1, 1)
+        self.timestamp = datetime.combine(self.base_date, datetime.min.time()).isoformat()
+
+    @staticmethod
+    def default_id_offset(organization_id: int) -> int:
+        """
+        組織ごとに重ならないidのオフセットを返します（1組織あたりID_BLOCK_SIZE件まで）
+        """
+        return organization_id * ID_BLOCK_SIZE
+
+    def _id(self, local_id: int) -> int:
+        return self.id_offset + local_id
+
+    def tables(self) -> List[Tuple[str, Callable[[random.Random], Iterator[Dict[str, Any]]]]]:
+        """
+        (テーブル名, 行の生成関数) を投入順（参照先が先）に返します
+        """
+        return [
+            ("organizations", self._organizations),
+            ("users", self._users),
+            ("fields", self._fields),
+            ("crops", self._crops),
+            ("planting_plans", self._planting_plans),
+            ("planting_plan_fields", self._planting_plan_fields),
+            ("workflow_instances", self._workflow_instances),
+            ("tasks", self._tasks),
+            ("resources", self._resources),
+            ("chat_sessions", self._chat_sessions),
+            ("chat_messages", self._chat_messages),
+        ]
+
+    def rows(self, table: str) -> Iterator[Dict[str, Any]]:
+        """
+        指定テーブルの行を生成します（テーブルごとに独立した乱数列を使うため、件数を変えても他のテーブルは変わりません）
+        """
+        for name, generate in self.tables():
+            if name == table:
+                return generate(random.Random(f"{self.seed}:{table}"))
+        raise ValueError(f"未対応のテーブルです: {table}")
+
+    def _organizations(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        yield {"id": self.organization_id, "name": f"合成農場{self.organization_id}", "created_at": self.timestamp, "updated_at": self.timestamp}
+
+    def _users(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        # Userモデルのidは文字列のため、文字列で保存する
+        yield {
+            "id": str(self._id(1)),
+            "organization_id": self.organization_id,
+            "name": "管理者",
+            "email": f"admin{self.organization_id}@example.com",
+            "role": "admin",
+            "created_at": self.timestamp,
+            "updated_at": self.timestamp,
+        }
+
+    def _fields(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        # 圃場を格子状に並べ、格子ごとに不規則な凸多角形を生成する（約100m間隔）
+        columns = max(1, int(math.sqrt(self.scale.fields)))
+        for field_id in range(1, self.scale.fields + 1):
+            row, column = divmod(field_id - 1, columns)
+            center_lat = 43.0 + row * 0.0009
+            center_lng = 141.0 + column * 0.0012
+            coordinates = _random_polygon(rng, center_lat, center_lng, radius_m=rng.uniform(25, 45))
+            tags = rng.sample(["水田転換", "排水不良", "ハウス", "有機", "獣害注意"], k=rng.randint(0, 2))
+            yield {
+                "id": self._id(field_id),
+                "organization_id": self.organization_id,
+                "name": f"圃場{field_id:05d}",
+                "coordinates": json.dumps(coordinates),
+                "area": round(polygon_area_ha(coordinates), 3),
+                "soil_type": rng.choice(_SOIL_TYPES),
+                "crop_type": rng.choice(_CROPS)[0],
+                "tags": json.dumps(tags, ensure_ascii=False),
+                "notes": None,
+                "created_at": self.timestamp,
+                "updated_at": self.timestamp,
+            }
+
+    def _crops(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for crop_id in range(1, self.scale.crops + 1):
+            name, category = _CROPS[(crop_id - 1) % len(_CROPS)]
+            if crop_id > len(_CROPS):
+                name = f"{name}{(crop_id - 1) // len(_CROPS) + 1}号"
+            workflow = _workflow_steps(_WORKFLOW_TREE, day_offset=rng.randint(-5, 5))
+            yield {
+                "id": self._id(crop_id),
+                "organization_id": self.organization_id,
+                "name": name,
+                "category": category,
+                "workflow": json.dumps(workflow, ensure_ascii=False),
+                "notes": None,
+                "created_at": self.timestamp,
+                "updated_at": self.timestamp,
+            }
+
+    def _plan_dates(self, plan_id: int) -> Tuple[date, date]:
+        # 春夏作（3〜6月定植）と秋冬作（8〜10月定植）を2年分に振り分ける
+        year = self.base_date.year + (plan_id - 1) // 2 % 2
+        if plan_id % 2:
+            planting_date = date(year, 3, 1) + timedelta(days=plan_id * 13 % 120)
+        else:
+            planting_date = date(year, 8, 1) + timedelta(days=plan_id * 13 % 90)
+        return planting_date, planting_date + timedelta(days=90)
+
+    def _planting_plans(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for plan_id in range(1, self.scale.planting_plans + 1):
+            planting_date, harvest_date = self._plan_dates(plan_id)
+            yield {
+                "id": self._id(plan_id),
+                "organization_id": self.organization_id,
+                "plan_name": f"作付け{plan_id:05d}",
+                "crop_id": self._id(rng.randint(1, self.scale.crops)),
+                "season": _SEASONS[planting_date.month >= 7],
+                "planting_date": planting_date.isoformat(),
+                "harvest_date": harvest_date.isoformat(),
+                "status": rng.choice(_PLAN_STATUSES),
+                "notes": None,
+                "created_at": self.timestamp,
+                "updated_at": self.timestamp,
+            }
+
+    def _planting_plan_fields(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        row_id = 0
+        for plan_id in range(1, self.scale.planting_plans + 1):
+            for sequence in range(1, rng.randint(1, 3) + 1):
+                row_id += 1
+                yield {
+                    "id": self._id(row_id),
+                    "planting_plan_id": self._id(plan_id),
+                    "field_id": self._id(rng.randint(1, self.scale.fields)),
+                    "sequence": sequence,
+                    "area": round(rng.uniform(500, 5000), 1),
+                    "notes": None,
+                    "created_at": self.timestamp,
+                    "updated_at": self.timestamp,
+                }
+
+    def _workflow_instances(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        # 作物フローのツリーを計画ごとに展開し（子はparent_instance_idで親を参照）、
+        # 1計画あたりの件数に満たない分は栽培管理の下に定期作業として追加する
+        plans = self.scale.planting_plans
+        per_plan, remainder = divmod(self.scale.workflow_instances, plans)
+        instance_id = 0
+        for plan_id in range(1, plans + 1):
+            planting_date, _ = self._plan_dates(plan_id)
+            budget = per_plan + (1 if plan_id <= remainder else 0)
+            created = 0
+            management_id: Optional[int] = None
+
+            def instance(step_name: str, days: int, parent_id: Optional[int]) -> Dict[str, Any]:
+                planned_date = planting_date + timedelta(days=days)
+                status = "完了" if planned_date < self.base_date + timedelta(days=365) else rng.choice(["未着手", "進行中"])
+                return {
+                    "id": self._id(instance_id),
+                    "planting_plan_id": self._id(plan_id),
+                    "step_name": step_name,
+                    "planned_date": planned_date.isoformat(),
+                    "actual_date": planned_date.isoformat() if status == "完了" else None,
+                    "days_from_planting": days,
+                    "parent_instance_id": self._id(parent_id) if parent_id is not None else None,
+                    "status": status,
+                    "notes": None,
+                    "created_at": self.timestamp,
+                    "updated_at": self.timestamp,
+                }
+
+            for name, days, children in _WORKFLOW_TREE:
+                if created >= budget:
+                    break
+                instance_id += 1
+                created += 1
+                parent_id = instance_id
+                if name == "栽培管理":
+                    management_id = parent_id
+                yield instance(name, days, None)
+                for child_name, child_days, _ in children:
+                    if created >= budget:
+                        break
+                    instance_id += 1
+                    created += 1
+                    yield instance(child_name, child_days, parent_id)
+
+            interval = 0
+            while created < budget:
+                interval += 1
+                instance_id += 1
+                created += 1
+                step_name = _RECURRING_STEPS[interval % len(_RECURRING_STEPS)]
+                yield instance(step_name, 7 + interval * 3 % 80, management_id)
+
+    def _tasks(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for task_id in range(1, self.scale.tasks + 1):
+            scheduled = datetime.combine(self.base_date, datetime.min.time()) + timedelta(
+                days=rng.randint(0, 730), hours=rng.choice([6, 8, 10, 13, 15])
+            )
+            status = rng.choice(_TASK_STATUSES)
+            yield {
+                "id": self._id(task_id),
+                "organization_id": self.organization_id,
+                "field_id": self._id(rng.randint(1, self.scale.fields)),
+                "task_type": rng.choice(_TASK_TYPES),
+                "status": status,
+                "scheduled_date": scheduled.isoformat(),
+                "completed_date": scheduled.isoformat() if status == "completed" else None,
+                "assigned_to": rng.choice([None, "田中", "佐藤", "鈴木"]),
+                "notes": None,
+                "created_at": self.timestamp,
+                "updated_at": self.timestamp,
+            }
+
+    def _resources(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for resource_id in range(1, self.scale.resources + 1):
+            name, resource_type, unit = _RESOURCES[(resource_id - 1) % len(_RESOURCES)]
+            yield {
+                "id": self._id(resource_id),
+                "organization_id": self.organization_id,
+                "name": f"{name}{resource_id:04d}",
+                "resource_type": resource_type,
+                "quantity": float(rng.randint(0, 200)) if resource_type == "資材" else 1.0,
+                "unit": unit,
+                "status": "利用可能",
+                "location": rng.choice(["第1倉庫", "第2倉庫", "作業小屋"]),
+                "notes": None,
+                "created_at": self.timestamp,
+                "updated_at": self.timestamp,
+            }
+
+    def _chat_sessions(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        sessions = self.scale.chat_sessions
+        # 最新メッセージの列はchat_messagesと同じ乱数列で生成したメッセージから埋める（セッションはメッセージより先に投入するため）
+        last_messages: Dict[int, Dict[str, Any]] = {}
+        for message in self.rows("chat_messages"):
+            last_messages[message["session_id"]] = message
+
+        for session_id in range(1, sessions + 1):
+            message_ids = range(session_id, self.scale.chat_messages + 1, sessions)
+            last_message = last_messages.get(self._id(session_id))
+            yield {
+                "id": self._id(session_id),
+                "organization_id": self.organization_id,
+                "user_id": None,
+                "title": f"相談{session_id:04d}",
+                "message_count": len(message_ids),
+                "last_message_id": last_message["id"] if last_message else None,
+                "last_message_preview": last_message["content"][:_LAST_MESSAGE_PREVIEW_LENGTH] if last_message else None,
+                "last_message_is_from_ai": last_message["is_from_ai"] if last_message else None,
+                "last_message_at": last_message["created_at"] if last_message else None,
+                "created_at": self.timestamp,
+                "updated_at": self.timestamp,
+            }
+
+    def _message_time(self, message_id: int) -> str:
+        started = datetime.combine(self.base_date, datetime.min.time())
+        return (started + timedelta(minutes=message_id * 7)).isoformat()
+
+    def _chat_messages(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        # セッションごとにユーザーの質問とAIの回答が交互に並ぶ（idが奇数なら質問、偶数なら回答）
+        sessions = self.scale.chat_sessions
+        question = ""
+        for message_id in range(1, self.scale.chat_messages + 1):
+            is_from_ai = message_id % 2 == 0
+            if is_from_ai:
+                content = rng.choice(_CHAT_ANSWERS).format(question=question)
+            else:
+                question = rng.choice(_CHAT_QUESTIONS).format(
+                    crop=rng.choice(_CROPS)[0], resource=rng.choice(_RESOURCES)[0]
+                )
+                content = question
+            yield {
+                "id": self._id(message_id),
+                "session_id": self._id((message_id - 1) % sessions + 1),
+                "organization_id": self.organization_id,
+                "user_id": None,
+                "content": content,
+                "is_from_ai": is_from_ai,
+                "created_at": self._message_time(message_id),
+            }
+
+
+@dataclass
+class LoadResult:
+    """投入結果"""
+    counts: Dict[str, int]
+    seconds: float
+
+    @property
+    def rows_per_minute(self) -> float:
+        return sum(self.counts.values()) / self.seconds * 60 if self.seconds else 0.0
+
+
+def _batches(rows: Iterator[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_dataset(
+    client,
+    generator: SyntheticDataGenerator,
+    batch_size: int = 5000,
+    concurrency: int = 1,
+    tables: Optional[List[str]] = None,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> LoadResult:
+    """
+    生成したデータをクライアント（Supabaseまたはローカルバックエンド）に一括insertで投入します
+    concurrencyが2以上の場合、同じテーブルのバッチを複数スレッドから並行して送信します
+    （テーブル間の参照順を守るため、次のテーブルは前のテーブルの完了後に投入します）
+    idを明示して投入するため、テーブルごとに投入後にidのシーケンスを進めます（sync_id_sequence）
+
+    Returns:
+        テーブルごとの投入件数と所要時間
+    """
+    started = time.perf_counter()
+    counts: Dict[str, int] = {}
+
+    def insert(table: str, batch: List[Dict[str, Any]]) -> int:
+        if table in _INSERT_IF_ABSENT_TABLES:
+            client.table(table).upsert(batch, ignore_duplicates=True).execute()
+        else:
+            client.table(table).insert(batch).execute()
+        return len(batch)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for table, _ in generator.tables():
+            if tables and table not in tables:
+                continue
+            total = 0
+            pending = []
+            for batch in _batches(generator.rows(table), batch_size):
+                pending.append(executor.submit(insert, table, batch))
+                # 生成済みのバッチを溜め込みすぎないよう、同時実行数の2倍で待つ
+                if len(pending) >= concurrency * 2:
+                    total += pending.pop(0).result()
+                    if progress:
+                        progress(table, total)
+            for future in pending:
+                total += future.result()
+                if progress:
+                    progress(table, total)
+            counts[table] = total
+            client.rpc("sync_id_sequence", {"p_table": table}).execute()
+
+    return LoadResult(counts=counts, seconds=time.perf_counter() - started)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return value
+
+
+def write_copy_files(
+    generator: SyntheticDataGenerator,
+    output_dir: str,
+    tables: Optional[List[str]] = None,
+) -> LoadResult:
+    """
+    PostgreSQLのCOPYで読み込めるCSVファイルと、読み込み用のSQL（psqlの\\copy）を書き出します
+    insertによるAPI経由の投入より大幅に速く、数十万行規模の投入に使います
+
+    出力:
+        {output_dir}/{table}.csv ... ヘッダー付きCSV（NULLは \\N）
+        {output_dir}/load.sql    ... 出力先ディレクトリで psql -f load.sql を実行して読み込む
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    counts: Dict[str, int] = {}
+    statements = ["BEGIN;"]
+
+    for table, _ in generator.tables():
+        if tables and table not in tables:
+            continue
+        rows = generator.rows(table)
+        first = next(rows, None)
+        if first is None:
+            counts[table] = 0
+            continue
+        columns = list(first.keys())
+        path = os.path.join(output_dir, f"{table}.csv")
+        total = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            buffer = io.StringIO()
+            buffer_writer = csv.writer(buffer)
+            for row in itertools.chain([first], rows):
+                buffer_writer.writerow([_csv_value(row.get(column)) for column in columns])
+                total += 1
+                if total % 10000 == 0:
+                    f.write(buffer.getvalue())
+                    buffer.seek(0)
+                    buffer.truncate()
+            f.write(buffer.getvalue())
+        counts[table] = total
+        column_list = ", ".join(columns)
+        if table in _INSERT_IF_ABSENT_TABLES:
+            # 既存の行（投入先の組織など）はそのまま残すため、一時テーブル経由で投入する
+            statements.extend([
+                f"CREATE TEMP TABLE _synthetic_{table} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP;",
+                f"\\copy _synthetic_{table} ({column_list}) FROM '{table}.csv' WITH (FORMAT csv, HEADER true, NULL '\\N')",
+                f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM _synthetic_{table} ON CONFLICT (id) DO NOTHING;",
+            ])
+        else:
+            statements.append(
+                f"\\copy {table} ({column_list}) FROM '{table}.csv' WITH (FORMAT csv, HEADER true, NULL '\\N')"
+            )
+        if first.get("id") is not None:
+            # idを明示して投入したため、シーケンスを進めておく
+            statements.append(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}));"
+            )
+
+    statements.append("COMMIT;")
+    with open(os.path.join(output_dir, "load.sql"), "w", encoding="utf-8") as f:
+        f.write("\n".join(statements) + "\n")
+
+    return LoadResult(counts=counts, seconds=time.perf_counter() - started)
@@ -1,12 +1,20 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api_v1.api import api_router
+from app.api.responses import FastJSONResponse
 from app.core.config import settings
+from app.core.metrics import render_metrics
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.middleware.traffic_recorder import TrafficRecorderMiddleware
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="AI農場管理アプリのバックエンドAPI",
     version="0.1.0",
+    default_response_class=FastJSONResponse,
 )
 
 # CORS設定
@@ -18,6 +26,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# レスポンスの圧縮（小さい本文はそのまま返す）
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# リクエストごとのクエリ数・DB時間の計測（クエリを計測するクライアントを使う場合のみ）
+if settings.DB_INSTRUMENTATION_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# ルート単位のリクエスト数・処理時間の計測
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# リクエストの記録（benchmarks.replay_traffic で再生する）
+if settings.TRAFFIC_RECORDING_ENABLED:
+    app.add_middleware(
+        TrafficRecorderMiddleware,
+        path=settings.TRAFFIC_RECORDING_PATH,
+        sample_rate=settings.TRAFFIC_RECORDING_SAMPLE_RATE,
+        path_prefix=settings.API_V1_STR,
+    )
+
 # APIルーターの登録
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -25,6 +59,11 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 async def root():
     return {"message": "SmartFarm Agent API"}
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8005, reload=True)
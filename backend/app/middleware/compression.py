@@ -0,0 +1,213 @@
+import hashlib
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core import metrics
+from app.utils.cache_utils import TTLCache
+
+try:
+    import brotli
+except ImportError:  # brotliが無い環境ではgzipだけを使う
+    brotli = None
+
+# 圧縮するContent-Type（画像・圧縮済みのファイルなどは圧縮しない）
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+# 圧縮済みの本文を保持しない大きさ（メモリを圧迫しないため）
+_MAX_CACHED_BODY = 8 * 1024 * 1024
+
+# 圧縮済みの本文（エンコーディング, 元の本文のハッシュ） -> 圧縮後の本文
+# 本文の内容をキーにするため古い内容を返すことはなく、有効期限は容量の管理のためだけに使う
+compressed_body_cache = TTLCache(maxsize=256, ttl=600)
+metrics.register_cache("compressed_responses", compressed_body_cache)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Accept-Encodingから使うエンコーディングを選びます
+    q値の最も高いものを選び、同じ場合はbrotliが使えればbrを優先します
+    """
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    candidates = ("br", "gzip") if brotli is not None else ("gzip",)
+    best: Optional[str] = None
+    best_quality = 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _StreamCompressor:
+    """チャンクごとにフラッシュしながら圧縮します（ストリーミングレスポンス用）"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # クライアントが途中まで読めるよう、チャンクごとにフラッシュする
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    """
+    本文を圧縮します（同じ本文の圧縮結果はキャッシュから返します）
+    """
+    key = None
+    if len(body) <= _MAX_CACHED_BODY:
+        key = (encoding, hashlib.sha1(body).digest())
+        cached = compressed_body_cache.get(key, None)
+        if cached is not None:
+            return cached
+
+    if encoding == "br":
+        compressed = brotli.compress(body, quality=brotli_quality)
+    else:
+        compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+        compressed = compressor.compress(body) + compressor.flush()
+
+    if key is not None:
+        compressed_body_cache.set(key, compressed)
+    return compressed
+
+
+class CompressionMiddleware:
+    """
+    レスポンスをgzip・brotliで圧縮するASGIミドルウェア
+
+    - minimum_size未満の本文・圧縮済みの本文・圧縮の効かないContent-Typeはそのまま返します
+    - 本文が1回で送られるレスポンスは全体を圧縮し、圧縮結果を本文のハッシュでキャッシュします
+      （変更の無い一覧を繰り返し取得した場合に、毎回圧縮し直さないため）
+    - ストリーミングレスポンスはチャンクごとに圧縮・フラッシュして送ります
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """1つのレスポンスの圧縮処理（開始メッセージを最初の本文まで保留して圧縮するかを決める）"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start_message = None
+        self._passthrough = False
+        self._stream: Optional[_StreamCompressor] = None
+
+    def _should_compress(self, message) -> bool:
+        status_code = message["status"]
+        if status_code < 200 or status_code in (204, 206, 304):
+            return False
+        headers = Headers(raw=message.get("headers", []))
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        content_length = headers.get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) < self.middleware.minimum_size:
+            return False
+        return True
+
+    def _set_headers(self, message, content_length: Optional[int]) -> None:
+        headers = MutableHeaders(scope=message)
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        # 圧縮した表現は元の表現とバイト列が異なるため弱いETagにする（If-None-Matchは弱い比較のため一致する）
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    async def send(self, message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            if self._should_compress(message):
+                self._start_message = message
+            else:
+                self._passthrough = True
+                await self._send(message)
+            return
+
+        if message_type != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        middleware = self.middleware
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._stream is None and self._start_message is not None:
+            start, self._start_message = self._start_message, None
+            if not more_body:
+                if len(body) < middleware.minimum_size:
+                    self._passthrough = True
+                    await self._send(start)
+                    await self._send(message)
+                    return
+                compressed = compress_body(body, self.encoding, middleware.gzip_level, middleware.brotli_quality)
+                self._set_headers(start, len(compressed))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            # ストリーミングレスポンス（全体の大きさが分からないため圧縮する）
+            self._stream = _StreamCompressor(self.encoding, middleware.gzip_level, middleware.brotli_quality)
+            self._set_headers(start, None)
+            await self._send(start)
+
+        chunk = self._stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self._stream.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
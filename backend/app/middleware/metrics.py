@@ -0,0 +1,43 @@
+import time
+
+from app.core import metrics
+
+# ルーティングに一致しなかったリクエストのroute（生のパスはカーディナリティが無制限になるため使わない）
+_UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    ルートテンプレート単位でリクエスト数・処理時間・処理中の件数を記録するASGIミドルウェア
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "")
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.http_requests_in_progress.inc(method=method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.http_requests_in_progress.dec(method=method)
+            # ルーターが一致したルートをscopeに設定する
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or getattr(route, "path", None) or _UNMATCHED_ROUTE
+            metrics.http_requests_total.inc(method=method, route=template, status=str(status_code))
+            metrics.http_request_duration_seconds.observe(
+                time.perf_counter() - started, method=method, route=template
+            )
@@ -0,0 +1,64 @@
+import json
+import logging
+import time
+
+from app.core.config import settings
+from app.db.instrumentation import start_query_stats
+
+logger = logging.getLogger("app.request_stats")
+
+
+class QueryStatsMiddleware:
+    """
+    リクエストごとにクエリ数・DB時間・取得行数を集計するASGIミドルウェア
+
+    集計結果はServer-Timingヘッダーと構造化ログ（JSON）に出力し、
+    同じ形のクエリがN_PLUS_ONE_THRESHOLD回以上発行されたリクエストは警告ログを出します
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = start_query_stats()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = time.perf_counter() - started
+                server_timing = (
+                    f'db;dur={stats.db_time * 1000:.1f};desc="{stats.count} queries, {stats.rows} rows", '
+                    f"app;dur={elapsed * 1000:.1f}"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration = time.perf_counter() - started
+            log = {
+                "event": "request_stats",
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 1),
+                "db_queries": stats.count,
+                "db_time_ms": round(stats.db_time * 1000, 1),
+                "db_rows": stats.rows,
+            }
+            repeated = stats.repeated_shapes(settings.N_PLUS_ONE_THRESHOLD)
+            if repeated:
+                log["repeated_queries"] = [{"shape": shape, "count": count} for shape, count in repeated]
+                logger.warning(json.dumps(log, ensure_ascii=False))
+            else:
+                logger.info(json.dumps(log, ensure_ascii=False))
@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+logger = logging.getLogger(__name__)
+
+# 値を記録しないキー（部分一致・小文字で比較）
+SENSITIVE_KEYS = ("password", "token", "secret", "authorization", "email", "username", "api_key", "phone", "mobile", "fax")
+# 値を記録しないキー（「_」区切りの語と完全一致で比較。部分一致では他の語に含まれるもの）
+SENSITIVE_KEY_WORDS = ("tel",)
+# 値をそのまま記録するキー（小文字で完全一致）。並び順・状態・種別など、値が固定の選択肢のもの
+PUBLIC_KEYS = (
+    "sort", "desc", "order", "status", "task_type", "resource_type", "type", "season", "category",
+    "unit", "entity", "entities", "action", "actions", "role", "is_from_ai",
+)
+# PUBLIC_KEYSの値でも、これより長い文字列は長さだけ記録する（自由記述の混入対策）
+MAX_PUBLIC_VALUE_LENGTH = 64
+# 文字列のうち、そのまま記録する形式（日付・日時・ID程度の桁数の数値）
+# 先頭が0の数字列や10桁以上の数字列は電話番号などの可能性があるため残さない
+_KEEP_STRING = re.compile(
+    r"^(\d{4}-\d{2}-\d{2}([T ][\d:.]+(Z|[+-]\d{2}:?\d{2})?)?|-?(0|[1-9]\d{0,8})(\.\d+)?|true|false)$"
+)
+# 本文を解析する最大サイズ（これを超える本文は大きさだけ記録する）
+MAX_BODY_BYTES = 64 * 1024
+
+REDACTED = "$redacted"
+STRING_KEY = "$str"  # 文字列の値の代わりに長さを記録する {"$str": 長さ}
+
+
+def _is_sensitive(key: str) -> bool:
+    key = key.lower()
+    if any(word in key for word in SENSITIVE_KEYS):
+        return True
+    return any(word in SENSITIVE_KEY_WORDS for word in re.split(r"[^a-z0-9]+", key))
+
+
+def sanitize(value: Any, key: str = "") -> Any:
+    """
+    記録用に値を匿名化します
+
+    数値・真偽値・日付と、並び順・状態などの選択肢の値（PUBLIC_KEYS）はそのまま残し
+    （ID・数量・期間・絞り込み条件は負荷の再現に必要なため）、
+    それ以外の文字列は長さだけを、認証情報や連絡先は種類だけを記録します
+    """
+    if key and _is_sensitive(key):
+        return REDACTED
+    if isinstance(value, dict):
+        return {k: sanitize(v, str(k)) for k, v in value.items()}
+    if isinstance(value, list):
+        # リストの要素は親のキーで判定する（status=pending&status=completed など）
+        return [sanitize(item, key) for item in value]
+    if isinstance(value, str) and not _KEEP_STRING.match(value):
+        if key.lower() in PUBLIC_KEYS and len(value) <= MAX_PUBLIC_VALUE_LENGTH:
+            return value
+        return {STRING_KEY: len(value)}
+    return value
+
+
+def _parse_body(body: bytes, size: int, content_type: str) -> Tuple[str, Any]:
+    if not size:
+        return "none", None
+    if size > MAX_BODY_BYTES:
+        return "raw", {"bytes": size}
+    try:
+        if content_type.startswith("application/json"):
+            return "json", sanitize(json.loads(body))
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            return "form", sanitize(dict(parse_qsl(body.decode("utf-8"), keep_blank_values=True)))
+    except (ValueError, UnicodeDecodeError):
+        pass
+    return "raw", {"bytes": size}
+
+
+class TrafficRecorder:
+    """
+    リクエストの記録をJSON Lines形式でファイルに追記します（スレッドセーフ）
+
+    ファイルへの書き込みはバックグラウンドのスレッドで行い、リクエストの処理（イベントループ）を待たせません
+    書き込みが追いつかずキューが溢れた場合、その記録は破棄します（droppedで件数を確認できます）
+    """
+
+    def __init__(self, path: str, max_pending: int = 10000):
+        self.path = path
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="traffic-recorder", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                while True:
+                    line = self._queue.get()
+                    if line is None:
+                        break
+                    f.write(line + "\n")
+                    # 続けて届いている記録はまとめて書き込み、キューが空になった時点でフラッシュする
+                    if self._queue.empty():
+                        f.flush()
+        except OSError as e:
+            logger.warning("リクエストの記録を書き込めません: %s", e)
+
+    def close(self) -> None:
+        """
+        キューに残っている記録を書き込んでから、書き込みスレッドを終了します
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+class TrafficRecorderMiddleware:
+    """
+    APIへのリクエストを匿名化して記録するASGIミドルウェア（負荷の再現用）
+
+    ルート・パス・クエリパラメータ・本文の形・開始時刻・処理時間・ステータスを記録します
+    記録したファイルは benchmarks.replay_traffic で再生できます
+    """
+
+    def __init__(self, app, path: str, sample_rate: float = 1.0, path_prefix: str = "/api/"):
+        self.app = app
+        self.recorder = TrafficRecorder(path)
+        self.sample_rate = sample_rate
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not scope.get("path", "").startswith(self.path_prefix)
+            or random.random() >= self.sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        chunks: List[bytes] = []
+        size = 0
+        status_code = 500
+
+        async def receive_with_capture():
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                size += len(body)
+                # 上限を超えた分は保持しない（大きさだけ記録する）
+                if size <= MAX_BODY_BYTES:
+                    chunks.append(body)
+            return message
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_with_capture, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            try:
+                self.recorder.write(self._build_record(scope, chunks, size, started_at, duration, status_code))
+            except Exception as e:
+                # 記録の失敗でリクエストを失敗させない
+                logger.warning("リクエストの記録に失敗しました: %s", e)
+
+    def _build_record(self, scope, chunks: List[bytes], size: int, started_at: float, duration: float,
+                      status_code: int) -> Dict[str, Any]:
+        headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        route = scope.get("route")
+        body_type, body = _parse_body(b"".join(chunks), size, headers.get("content-type", ""))
+        query = [
+            [key, sanitize(value, key)]
+            for key, value in parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+        ]
+        return {
+            "started_at": round(started_at, 6),
+            "method": scope.get("method"),
+            "route": getattr(route, "path_format", None) or getattr(route, "path", None),
+            "path": scope.get("path"),
+            "path_params": scope.get("path_params") or {},
+            "query": query,
+            "body_type": body_type,
+            "body": body,
+            "auth": "authorization" in headers,
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 3),
+        }
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    """
+    記録したリクエストを開始時刻順に読み込みます
+    """
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    records.sort(key=lambda record: record["started_at"])
+    return records
+
+
+def restore(value: Any, key: str = "", sequence: Optional[int] = None) -> Any:
+    """
+    sanitize() で匿名化した値を、再生用のダミーの値に戻します
+    """
+    if value == REDACTED:
+        if "email" in key.lower() or "username" in key.lower():
+            return f"replay{sequence or 0}@example.com"
+        if any(word in key.lower() for word in ("phone", "mobile", "fax", "tel")):
+            return "000-0000-0000"
+        return "password"
+    if isinstance(value, dict):
+        if set(value) == {STRING_KEY}:
+            length = max(1, min(int(value[STRING_KEY]), 1000))
+            return ("replay" * (length // 6 + 1))[:length]
+        return {k: restore(v, str(k), sequence) for k, v in value.items()}
+    if isinstance(value, list):
+        return [restore(item, key, sequence) for item in value]
+    return value
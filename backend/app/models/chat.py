@@ -5,6 +5,7 @@ from pydantic import BaseModel
 
 class ChatMessage(BaseModel):
     id: int
+    session_id: Optional[int] = None
     organization_id: int
     user_id: Optional[int] = None
     content: str
@@ -15,6 +16,14 @@ class ChatMessage(BaseModel):
         from_attributes = True  # Pydantic v2 equivalent of orm_mode
 
 
+class ChatMessagePreview(BaseModel):
+    """セッション一覧に表示する最新メッセージのプレビュー"""
+    id: int
+    content: str  # 先頭のみ（chat_sessions.last_message_previewに保持）
+    is_from_ai: bool
+    created_at: datetime
+
+
 class ChatSession(BaseModel):
     id: int
     organization_id: int
@@ -22,7 +31,10 @@ class ChatSession(BaseModel):
     title: str
     created_at: datetime
     updated_at: datetime
+    message_count: int = 0
+    last_message: Optional[ChatMessagePreview] = None
     messages: List[ChatMessage] = []
+    messages_next_cursor: Optional[int] = None  # より古いメッセージを取得するためのカーソル
 
     class Config:
         from_attributes = True  # Pydantic v2 equivalent of orm_mode
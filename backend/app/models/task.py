@@ -13,6 +13,7 @@ class Task(BaseModel):
     completed_date: Optional[datetime] = None
     assigned_to: Optional[str] = None
     notes: Optional[str] = None
+    field_name: str = ""  # 圃場名（fieldsテーブルから付与）
     created_at: datetime
     updated_at: datetime
 
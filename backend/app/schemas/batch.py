@@ -0,0 +1,24 @@
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field
+
+
+class BatchRequestItem(BaseModel):
+    id: Optional[str] = None  # 結果との対応付けに使う任意の識別子
+    path: str = Field(..., description="APIのパス（/api/v1 以降。クエリ文字列を含められる。例: /fields/?limit=50）")
+    if_none_match: Optional[str] = None  # 前回のETag（一致する場合はstatus 304・bodyなしを返す）
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem]
+
+
+class BatchResponseItem(BaseModel):
+    id: Optional[str] = None
+    path: str
+    status: int  # 副リクエストのHTTPステータス
+    etag: Optional[str] = None
+    body: Any = None  # 副リクエストのレスポンス本文（JSON以外は文字列）
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchResponseItem]  # リクエストと同じ順序
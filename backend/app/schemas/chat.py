@@ -14,6 +14,7 @@ class ChatMessageCreate(ChatMessageBase):
 
 class ChatMessageInDBBase(ChatMessageBase):
     id: int
+    session_id: Optional[int] = None
     organization_id: int
     user_id: Optional[int] = None
     created_at: datetime
@@ -26,6 +27,16 @@ class ChatMessageResponse(ChatMessageInDBBase):
     pass
 
 
+class ChatMessagePreviewResponse(BaseModel):
+    id: int
+    content: str  # 最新メッセージの先頭部分
+    is_from_ai: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True  # Pydantic v2 equivalent of orm_mode
+
+
 class ChatSessionBase(BaseModel):
     title: str
 
@@ -50,4 +61,29 @@ class ChatSessionInDBBase(ChatSessionBase):
 
 
 class ChatSessionResponse(ChatSessionInDBBase):
+    message_count: int = 0
+    last_message: Optional[ChatMessagePreviewResponse] = None
     messages: List[ChatMessageResponse] = []
+    messages_next_cursor: Optional[int] = None  # より古いメッセージを取得するためのカーソル
+
+
+class ChatSearchResult(BaseModel):
+    message: ChatMessageResponse
+    score: float
+    snippet: str  # 一致箇所周辺の抜粋
+
+
+class CacheStatsResponse(BaseModel):
+    size: int
+    maxsize: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    expirations: int
+
+
+class ChatMessagePage(BaseModel):
+    messages: List[ChatMessageResponse]  # 新しい順
+    next_cursor: Optional[int] = None  # 次のページを取得する際のbefore（続きがない場合はNone）
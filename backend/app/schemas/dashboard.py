@@ -0,0 +1,16 @@
+from datetime import date
+from typing import Dict
+from pydantic import BaseModel, Field
+
+
+class DashboardSummary(BaseModel):
+    date: date  # 期限の判定に使った日付
+    tasks_due_today: int = Field(..., description="今日が予定日の未完了の作業数")
+    tasks_overdue: int = Field(..., description="予定日を過ぎた未完了の作業数")
+    tasks_by_status: Dict[str, int]  # 状態 -> 作業数
+    plans_by_status: Dict[str, int]  # 状態 -> 作付け計画数
+    low_stock_resources: int = Field(..., description="数量がlow_stock_threshold以下の資材数")
+    low_stock_threshold: float
+    cultivated_area: float = Field(..., description="進行中の作付け計画の作付け面積 (m²)")
+    field_count: int
+    total_field_area: float = Field(..., description="圃場の総面積 (ha)")
@@ -0,0 +1,14 @@
+from typing import Any, Dict, List
+from pydantic import BaseModel
+
+
+class EntityChanges(BaseModel):
+    upserted: List[Dict[str, Any]] = []  # 作成・更新されたレコードの最新の状態
+    deleted: List[int] = []  # 削除されたレコードのID
+
+
+class SyncResponse(BaseModel):
+    next_token: str  # 次回の同期でsinceに指定するトークン
+    has_more: bool  # 続きの差分がある場合はTrue（next_tokenで続けて取得する）
+    reset: bool  # Trueの場合は一覧APIで全件を取得し直す
+    changes: Dict[str, EntityChanges]
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -27,6 +27,16 @@ class TaskUpdate(BaseModel):
     notes: Optional[str] = None
 
 
+class TaskFilter(BaseModel):
+    """作業一覧の絞り込み条件（指定した条件は全て満たすものを返す）"""
+    statuses: Optional[List[str]] = None  # いずれかの状態に一致
+    field_ids: Optional[List[int]] = None  # いずれかの圃場に一致
+    assigned_to: Optional[str] = None
+    scheduled_from: Optional[datetime] = None  # 予定日時がこの日時以上
+    scheduled_to: Optional[datetime] = None  # 予定日時がこの日時未満
+    notes: Optional[str] = None  # メモの部分一致（大文字・小文字を区別しない）
+
+
 class TaskInDBBase(TaskBase):
     id: int
     organization_id: int
@@ -0,0 +1,576 @@
+import asyncio
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.session import get_supabase_client
+from app.exceptions.service_exceptions import ResourceNotFoundException, ServiceException, ValidationException
+from app.schemas.resource import ResourceUpdate
+from app.schemas.task import TaskFilter, TaskUpdate
+from app.services.field_service import FieldService
+from app.services.planting_plan_service import PlantingPlanService
+from app.services.resource_service import ResourceService
+from app.services.task_service import TASK_STATUSES, TaskService
+from app.utils.async_utils import run_in_thread
+from app.utils.json_utils import parse_json_string
+from app.utils.text_utils import normalize_text
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = (
+    "あなたはSmartFarmの営農アシスタントです。"
+    "圃場・作付け計画・作業・資材のデータはツールで取得・更新し、取得した内容に基づいて日本語で簡潔に回答してください。"
+    "互いに依存しないツール呼び出しは1回の応答でまとめて指示してください。"
+)
+
+
+@dataclass
+class ToolCall:
+    """モデルが指示したツール呼び出し"""
+    id: str
+    name: str
+    arguments: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ModelReply:
+    """モデルの応答（回答本文またはツール呼び出しのいずれか）"""
+    content: Optional[str] = None
+    tool_calls: List[ToolCall] = field(default_factory=list)
+
+
+@dataclass
+class AgentTool:
+    """エージェントが利用できるツール"""
+    name: str
+    description: str
+    parameters: Dict[str, Any]
+    handler: Callable[..., Awaitable[Any]]
+    writes: bool = False  # データを更新するツールか（更新系は並行実行しない）
+
+    def to_openai(self) -> Dict[str, Any]:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters,
+            },
+        }
+
+
+@dataclass
+class AgentResult:
+    """エージェントの実行結果"""
+    content: Optional[str]
+    tool_calls: List[ToolCall] = field(default_factory=list)
+    wrote_data: bool = False
+
+
+def _dump(model: Any, exclude: Optional[set] = None) -> Dict[str, Any]:
+    # 日付型などをJSONで扱える値にそろえる
+    return json.loads(json.dumps(model.dict(exclude=exclude), ensure_ascii=False, default=str))
+
+
+def _schema(properties: Dict[str, Any], required: Optional[List[str]] = None) -> Dict[str, Any]:
+    return {"type": "object", "properties": properties, "required": required or []}
+
+
+_JSON_TYPES: Dict[str, Tuple[type, ...]] = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list,),
+}
+
+
+def _validate_arguments(schema: Dict[str, Any], arguments: Any) -> Optional[str]:
+    """
+    ツールの引数をパラメーターのスキーマ（_schemaで作成した範囲）で検証し、不正な場合は理由を返します
+    """
+    if not isinstance(arguments, dict):
+        return "引数はオブジェクトで指定してください"
+    properties = schema.get("properties", {})
+    unknown = sorted(set(arguments) - set(properties))
+    if unknown:
+        return f"未知の引数です: {', '.join(unknown)}"
+    missing = [name for name in schema.get("required", []) if arguments.get(name) is None]
+    if missing:
+        return f"必須の引数がありません: {', '.join(missing)}"
+    for name, value in arguments.items():
+        if value is None:
+            continue
+        spec = properties[name]
+        expected = _JSON_TYPES.get(spec.get("type", ""))
+        # boolはintのサブクラスのため、数値には含めない
+        if expected and (not isinstance(value, expected) or (isinstance(value, bool) and bool not in expected)):
+            return f"{name}は{spec['type']}で指定してください"
+        if "enum" in spec and value not in spec["enum"]:
+            return f"{name}は {'/'.join(map(str, spec['enum']))} のいずれかを指定してください"
+        if "minimum" in spec and value < spec["minimum"]:
+            return f"{name}は{spec['minimum']}以上を指定してください"
+        if "maximum" in spec and value > spec["maximum"]:
+            return f"{name}は{spec['maximum']}以下を指定してください"
+    return None
+
+
+class LocalAgentModel:
+    """
+    キーワードに基づいてツール呼び出しと回答を決める決定的なモデル
+    ベンチマークやエージェントの動作確認に使用します（CHAT_AGENT_LOCAL_MODELが有効な場合のみ。本番の応答には使いません）
+    """
+
+    _TASK_COMPLETE_PATTERN = re.compile(r"(?:作業|タスク)(?:id)?\s*#?(\d+)\s*(?:を|は)?\s*完了")
+    _RESOURCE_QUANTITY_PATTERN = re.compile(
+        r"(?:資材|農機)(?:id)?\s*#?(\d+)\s*の?(?:在庫|数量)を\s*(\d+(?:\.\d+)?)\s*に"
+    )
+    _READ_KEYWORDS: List[Tuple[str, Tuple[str, ...]]] = [
+        ("list_tasks", ("作業", "タスク", "予定")),
+        ("list_planting_plans", ("作付け", "作付", "計画", "定植", "収穫")),
+        ("list_fields", ("圃場", "畑", "ほ場")),
+        ("list_resources", ("資材", "農機", "在庫")),
+    ]
+    _LABELS = {
+        "list_tasks": "作業",
+        "list_planting_plans": "作付け計画",
+        "list_fields": "圃場",
+        "list_resources": "資材・農機",
+        "update_task_status": "作業の更新",
+        "update_resource_quantity": "数量の更新",
+    }
+
+    async def complete(self, messages: List[Dict[str, Any]], tools: List[AgentTool]) -> ModelReply:
+        last_user = max(i for i, message in enumerate(messages) if message["role"] == "user")
+        tool_messages = [message for message in messages[last_user + 1:] if message["role"] == "tool"]
+        if tool_messages:
+            return ModelReply(content=self._summarize(messages[last_user + 1:]))
+
+        available = {tool.name for tool in tools}
+        calls = [
+            call for call in self._plan(normalize_text(messages[last_user]["content"]))
+            if call.name in available
+        ]
+        return ModelReply(tool_calls=calls)
+
+    def _plan(self, text: str) -> List[ToolCall]:
+        calls: List[ToolCall] = []
+        for match in self._TASK_COMPLETE_PATTERN.finditer(text):
+            calls.append(ToolCall(
+                id=f"call_{len(calls)}",
+                name="update_task_status",
+                arguments={"task_id": int(match.group(1)), "status": "completed"},
+            ))
+        for match in self._RESOURCE_QUANTITY_PATTERN.finditer(text):
+            calls.append(ToolCall(
+                id=f"call_{len(calls)}",
+                name="update_resource_quantity",
+                arguments={"resource_id": int(match.group(1)), "quantity": float(match.group(2))},
+            ))
+        if calls:
+            return calls
+
+        for name, keywords in self._READ_KEYWORDS:
+            if any(keyword in text for keyword in keywords):
+                calls.append(ToolCall(id=f"call_{len(calls)}", name=name, arguments={}))
+        return calls
+
+    def _summarize(self, messages: List[Dict[str, Any]]) -> str:
+        names: Dict[str, str] = {}
+        for message in messages:
+            for call in message.get("tool_calls") or []:
+                names[call["id"]] = call["function"]["name"]
+
+        sections = []
+        for message in messages:
+            if message["role"] != "tool":
+                continue
+            name = names.get(message["tool_call_id"], "")
+            result = parse_json_string(message["content"]) or {}
+            label = self._LABELS.get(name, name)
+            if "error" in result:
+                sections.append(f"{label}に失敗しました: {result['error']}")
+            else:
+                sections.append(self._format(name, label, result))
+        return "\n\n".join(sections)
+
+    def _format(self, name: str, label: str, result: Dict[str, Any]) -> str:
+        if name == "update_task_status":
+            task = result["task"]
+            return f"作業「{task['task_type']}」（ID {task['id']}）の状態を「{task['status']}」に更新しました。"
+        if name == "update_resource_quantity":
+            resource = result["resource"]
+            return f"「{resource['name']}」の数量を{resource['quantity']:g}{resource.get('unit') or ''}に更新しました。"
+
+        items = result.get("items") or []
+        if not items:
+            return f"【{label}】\n該当するデータはありません。"
+
+        lines = [f"【{label}】"]
+        for item in items:
+            if name == "list_tasks":
+                lines.append(
+                    f"・{str(item['scheduled_date'])[:10]} {item['task_type']}"
+                    f"（{item.get('field_name') or '圃場未設定'}）［{item['status']}］"
+                )
+            elif name == "list_planting_plans":
+                lines.append(
+                    f"・{item['plan_name']}: 定植 {item.get('planting_date') or '未定'}"
+                    f" / 収穫 {item.get('harvest_date') or '未定'}［{item['status']}］"
+                )
+            elif name == "list_fields":
+                lines.append(f"・{item['name']}: {item['area']}ha {item.get('crop_type') or ''}".rstrip())
+            elif name == "list_resources":
+                quantity = item.get("quantity")
+                amount = f"{quantity:g}{item.get('unit') or ''}" if quantity is not None else "数量未登録"
+                lines.append(f"・{item['name']}: {amount}［{item['status']}］")
+            else:
+                lines.append(f"・{json.dumps(item, ensure_ascii=False)}")
+        return "\n".join(lines)
+
+
+class OpenAIAgentModel:
+    """
+    OpenAIのChat Completions API（function calling）を使うモデル
+    """
+
+    def __init__(self, api_key: str, model: str):
+        from openai import AsyncOpenAI
+
+        self.client = AsyncOpenAI(api_key=api_key)
+        self.model = model
+
+    async def complete(self, messages: List[Dict[str, Any]], tools: List[AgentTool]) -> ModelReply:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            tools=[tool.to_openai() for tool in tools],
+        )
+        message = response.choices[0].message
+        calls = [
+            ToolCall(
+                id=call.id,
+                name=call.function.name,
+                arguments=parse_json_string(call.function.arguments) or {},
+            )
+            for call in message.tool_calls or []
+        ]
+        return ModelReply(content=message.content, tool_calls=calls)
+
+
+class ChatAgentService:
+    """
+    ツール呼び出しで営農データを参照・更新しながら回答するチャットエージェント
+
+    モデルが1回の応答で指示した参照系ツールは並行して実行し（サービス層の同期I/Oはスレッドに逃がす）、
+    同じ引数の呼び出し結果は1回の質問の間キャッシュします。更新系ツールは指示された順に逐次実行し、
+    実行後はキャッシュを破棄します
+    """
+
+    def __init__(
+        self,
+        supabase=None,
+        model=None,
+        task_service: Optional[TaskService] = None,
+        planting_plan_service: Optional[PlantingPlanService] = None,
+        field_service: Optional[FieldService] = None,
+        resource_service: Optional[ResourceService] = None,
+        max_steps: Optional[int] = None,
+    ):
+        self.supabase = supabase or get_supabase_client()
+        self.model = model or self._default_model()
+        self.task_service = task_service or TaskService(supabase=self.supabase)
+        self.planting_plan_service = planting_plan_service or PlantingPlanService(supabase=self.supabase)
+        self.field_service = field_service or FieldService(supabase=self.supabase)
+        self.resource_service = resource_service or ResourceService(supabase=self.supabase)
+        self.max_steps = max_steps or settings.CHAT_AGENT_MAX_STEPS
+        self.tools = self._build_tools()
+        self._tools_by_name = {tool.name: tool for tool in self.tools}
+
+    @property
+    def enabled(self) -> bool:
+        """
+        エージェントで応答できるか（モデルが設定されているか）
+        """
+        return self.model is not None
+
+    @staticmethod
+    def _default_model():
+        if settings.CHAT_AGENT_MODEL and settings.OPENAI_API_KEY:
+            try:
+                return OpenAIAgentModel(api_key=settings.OPENAI_API_KEY, model=settings.CHAT_AGENT_MODEL)
+            except ImportError:
+                logger.warning("openaiパッケージが無いためエージェントを使用しません")
+        if settings.CHAT_AGENT_LOCAL_MODEL:
+            return LocalAgentModel()
+        return None
+
+    async def run(
+        self, user_message: str, organization_id: int, session_history: List[Dict[str, Any]]
+    ) -> AgentResult:
+        """
+        ユーザーのメッセージに対してエージェントを実行します
+        ツールを1つも使わずに回答がない場合・モデルが設定されていない場合はcontentがNoneになります
+        """
+        if self.model is None:
+            return AgentResult(content=None)
+
+        messages = self._build_messages(user_message, session_history)
+        cache: Dict[Tuple[str, str], "asyncio.Future"] = {}
+        executed: List[ToolCall] = []
+        wrote_data = False
+
+        for _ in range(self.max_steps):
+            reply = await self.model.complete(messages, self.tools)
+            if not reply.tool_calls:
+                return AgentResult(content=reply.content, tool_calls=executed, wrote_data=wrote_data)
+
+            messages.append({
+                "role": "assistant",
+                "content": reply.content,
+                "tool_calls": [
+                    {
+                        "id": call.id,
+                        "type": "function",
+                        "function": {
+                            "name": call.name,
+                            "arguments": json.dumps(call.arguments, ensure_ascii=False),
+                        },
+                    }
+                    for call in reply.tool_calls
+                ],
+            })
+
+            results = await self.execute_tool_calls(reply.tool_calls, organization_id, cache)
+            for call in reply.tool_calls:
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": call.id,
+                    "content": json.dumps(results[call.id], ensure_ascii=False, default=str),
+                })
+
+            executed.extend(reply.tool_calls)
+            wrote_data = wrote_data or any(
+                self._tools_by_name[call.name].writes
+                for call in reply.tool_calls
+                if call.name in self._tools_by_name
+            )
+
+        logger.warning("エージェントのステップ数が上限（%d）に達しました", self.max_steps)
+        return AgentResult(content=None, tool_calls=executed, wrote_data=wrote_data)
+
+    async def execute_tool_calls(
+        self,
+        calls: List[ToolCall],
+        organization_id: int,
+        cache: Optional[Dict[Tuple[str, str], "asyncio.Future"]] = None,
+    ) -> Dict[str, Any]:
+        """
+        1回の応答で指示されたツール呼び出しを実行し、呼び出しIDごとの結果を返します
+        参照系はasyncio.gatherで並行実行し、更新系はその後に逐次実行します
+        """
+        cache = {} if cache is None else cache
+        reads = [call for call in calls if not self._is_write(call)]
+        writes = [call for call in calls if self._is_write(call)]
+
+        read_results = await asyncio.gather(
+            *(self._cached_invoke(call, organization_id, cache) for call in reads)
+        )
+        results = {call.id: result for call, result in zip(reads, read_results)}
+
+        for call in writes:
+            results[call.id] = await self._invoke(call, organization_id)
+            cache.clear()
+        return results
+
+    def _is_write(self, call: ToolCall) -> bool:
+        tool = self._tools_by_name.get(call.name)
+        return tool is not None and tool.writes
+
+    async def _cached_invoke(
+        self, call: ToolCall, organization_id: int, cache: Dict[Tuple[str, str], "asyncio.Future"]
+    ) -> Any:
+        # 実行中の同じ呼び出しも共有できるよう、結果ではなくタスクを保持する
+        key = (call.name, json.dumps(call.arguments, sort_keys=True, default=str))
+        future = cache.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._invoke(call, organization_id))
+            cache[key] = future
+        return await future
+
+    async def _invoke(self, call: ToolCall, organization_id: int) -> Any:
+        tool = self._tools_by_name.get(call.name)
+        if tool is None:
+            return {"error": f"ツール {call.name} は存在しません"}
+        # 引数の誤りはモデルに返して直させる（ツール内部のTypeErrorなどと区別するため、呼び出し前に検証する）
+        error = _validate_arguments(tool.parameters, call.arguments)
+        if error is not None:
+            return {"error": f"引数が不正です: {error}"}
+        try:
+            return await run_in_thread(tool.handler, organization_id, **call.arguments)
+        except ServiceException as e:
+            logger.warning("ツール %s の実行に失敗しました: %s", call.name, e)
+            return {"error": str(e)}
+        except Exception as e:
+            # 想定外の例外（実装の不具合）はスタックトレースとともに記録する
+            logger.exception("ツール %s の実行中に想定外のエラーが発生しました", call.name)
+            return {"error": str(e)}
+
+    def _build_messages(self, user_message: str, session_history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        messages: List[Dict[str, Any]] = [{"role": "system", "content": SYSTEM_PROMPT}]
+        for item in session_history[-settings.CHAT_AGENT_HISTORY_LIMIT:]:
+            messages.append({
+                "role": "assistant" if item.get("is_from_ai") else "user",
+                "content": item.get("content", ""),
+            })
+        # 履歴の末尾が今回のメッセージであれば重複して追加しない
+        if len(messages) == 1 or messages[-1] != {"role": "user", "content": user_message}:
+            messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def _build_tools(self) -> List[AgentTool]:
+        limit_property = {"type": "integer", "description": "取得する最大件数", "minimum": 1, "maximum": 100}
+        return [
+            AgentTool(
+                name="list_tasks",
+                description="作業の一覧を予定日順に取得します。days_aheadを指定すると今日からその日数先までに絞り込みます",
+                parameters=_schema({
+                    "status": {"type": "string", "description": "作業の状態（pending/in_progress/completed）"},
+                    "days_ahead": {"type": "integer", "description": "今日から何日先までの作業を取得するか"},
+                    "limit": limit_property,
+                }),
+                handler=self._list_tasks,
+            ),
+            AgentTool(
+                name="update_task_status",
+                description="作業の状態を更新します",
+                parameters=_schema({
+                    "task_id": {"type": "integer"},
+                    "status": {"type": "string", "enum": list(TASK_STATUSES), "description": "新しい状態"},
+                }, required=["task_id", "status"]),
+                handler=self._update_task_status,
+                writes=True,
+            ),
+            AgentTool(
+                name="list_planting_plans",
+                description="作付け計画の一覧を取得します。crop_nameを指定すると作物名で絞り込みます",
+                parameters=_schema({
+                    "crop_name": {"type": "string", "description": "作物名（部分一致）"},
+                    "limit": limit_property,
+                }),
+                handler=self._list_planting_plans,
+            ),
+            AgentTool(
+                name="get_planting_plan",
+                description="作付け計画の詳細（圃場と作業工程を含む）を取得します",
+                parameters=_schema({"plan_id": {"type": "integer"}}, required=["plan_id"]),
+                handler=self._get_planting_plan,
+            ),
+            AgentTool(
+                name="list_fields",
+                description="圃場の一覧を取得します",
+                parameters=_schema({"limit": limit_property}),
+                handler=self._list_fields,
+            ),
+            AgentTool(
+                name="get_field",
+                description="圃場の詳細を取得します",
+                parameters=_schema({"field_id": {"type": "integer"}}, required=["field_id"]),
+                handler=self._get_field,
+            ),
+            AgentTool(
+                name="list_resources",
+                description="資材・農機の一覧と在庫数量を取得します。keywordを指定すると名前で絞り込みます",
+                parameters=_schema({
+                    "keyword": {"type": "string", "description": "資材・農機名（部分一致）"},
+                    "limit": limit_property,
+                }),
+                handler=self._list_resources,
+            ),
+            AgentTool(
+                name="update_resource_quantity",
+                description="資材・農機の数量を更新します",
+                parameters=_schema({
+                    "resource_id": {"type": "integer"},
+                    "quantity": {"type": "number"},
+                }, required=["resource_id", "quantity"]),
+                handler=self._update_resource_quantity,
+                writes=True,
+            ),
+        ]
+
+    async def _list_tasks(
+        self, organization_id: int, status: Optional[str] = None,
+        days_ahead: Optional[int] = None, limit: int = 20
+    ) -> Dict[str, Any]:
+        # 状態・期間はクエリで絞り込む（取得後に絞り込むとlimit件より少なくなる）
+        start = datetime.combine(datetime.now().date(), datetime.min.time()) if days_ahead is not None else None
+        filters = TaskFilter(
+            statuses=[status] if status else None,
+            scheduled_from=start,
+            scheduled_to=start + timedelta(days=days_ahead + 1) if start else None,
+        )
+        tasks = await self.task_service.get_tasks(organization_id, limit=limit, filters=filters)
+        return {"items": [_dump(task) for task in tasks]}
+
+    async def _update_task_status(self, organization_id: int, task_id: int, status: str) -> Dict[str, Any]:
+        if status not in TASK_STATUSES:
+            raise ValidationException(f"作業の状態は {'/'.join(TASK_STATUSES)} のいずれかを指定してください")
+        task = await self.task_service.get_task(task_id)
+        if task is None or task.organization_id != organization_id:
+            raise ResourceNotFoundException(f"作業ID {task_id} は存在しません")
+        updated = await self.task_service.update_task(task_id, TaskUpdate(status=status))
+        return {"task": _dump(updated)}
+
+    async def _list_planting_plans(
+        self, organization_id: int, crop_name: Optional[str] = None, limit: int = 20
+    ) -> Dict[str, Any]:
+        if crop_name:
+            plans = [
+                plan for _, plan in await self.planting_plan_service.find_planting_plans_by_crop_name(
+                    organization_id, crop_name, limit=limit
+                )
+            ]
+        else:
+            plans = await self.planting_plan_service.get_planting_plans(organization_id, limit=limit)
+        return {"items": [_dump(plan, exclude={"fields", "workflow_instances"}) for plan in plans]}
+
+    async def _get_planting_plan(self, organization_id: int, plan_id: int) -> Dict[str, Any]:
+        plan = await self.planting_plan_service.get_planting_plan(plan_id)
+        if plan is None or plan.organization_id != organization_id:
+            raise ResourceNotFoundException(f"作付け計画ID {plan_id} は存在しません")
+        return {"item": _dump(plan)}
+
+    async def _list_fields(self, organization_id: int, limit: int = 50) -> Dict[str, Any]:
+        fields = await self.field_service.get_fields(organization_id, limit=limit)
+        # 座標は回答に不要で大きいため除外する
+        return {"items": [_dump(item, exclude={"coordinates"}) for item in fields]}
+
+    async def _get_field(self, organization_id: int, field_id: int) -> Dict[str, Any]:
+        item = await self.field_service.get_field(field_id)
+        if item is None or item.organization_id != organization_id:
+            raise ResourceNotFoundException(f"圃場ID {field_id} は存在しません")
+        return {"item": _dump(item, exclude={"coordinates"})}
+
+    async def _list_resources(
+        self, organization_id: int, keyword: Optional[str] = None, limit: int = 50
+    ) -> Dict[str, Any]:
+        if keyword:
+            resources = await self.resource_service.find_resources_by_name(organization_id, keyword, limit=limit)
+        else:
+            resources = await self.resource_service.get_resources(organization_id, limit=limit)
+        return {"items": [_dump(resource) for resource in resources]}
+
+    async def _update_resource_quantity(
+        self, organization_id: int, resource_id: int, quantity: float
+    ) -> Dict[str, Any]:
+        resource = await self.resource_service.get_resource(resource_id)
+        if resource is None or resource.organization_id != organization_id:
+            raise ResourceNotFoundException(f"資材・農機ID {resource_id} は存在しません")
+        updated = await self.resource_service.update_resource(resource_id, ResourceUpdate(quantity=quantity))
+        return {"resource": _dump(updated)}
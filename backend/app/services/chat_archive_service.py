@@ -0,0 +1,286 @@
+import gzip
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.core.config import settings
+from app.db.session import get_supabase_client
+
+try:
+    import zstandard
+except ImportError:  # zstandardが無い環境ではgzipで圧縮する
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_INDEX_FILE = "index.json"
+
+
+@dataclass
+class ArchiveResult:
+    """アーカイブ処理の結果"""
+    archived: int = 0
+    deleted: int = 0
+    sessions: List[int] = field(default_factory=list)
+
+
+@dataclass
+class AppendResult:
+    """セッションのアーカイブへの追記結果"""
+    written: List[int] = field(default_factory=list)  # 今回書き込んだメッセージID
+    present: List[int] = field(default_factory=list)  # 既にアーカイブにあることを確認したメッセージID
+
+    @property
+    def ids(self) -> List[int]:
+        """アーカイブにあることが確定し、データベースから削除してよいメッセージID"""
+        return self.written + self.present
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class ChatArchiveService:
+    """
+    古いチャットメッセージをセッション単位の圧縮JSONLセグメントとしてローカルに退避します
+
+    ディレクトリ構成:
+        {CHAT_ARCHIVE_DIR}/session_{session_id}/
+            index.json                         … セグメントとブロックのオフセット索引
+            segment_{first_id}_{last_id}.jsonl.{zst|gz}
+    セグメントは独立して展開できる圧縮ブロックを連結したもので、
+    index.jsonに各ブロックのバイトオフセットとメッセージIDの範囲を保持するため、
+    必要なブロックだけを読み出せます
+    """
+
+    def __init__(self, supabase=None, archive_dir: Optional[str] = None, block_size: int = 200):
+        self._supabase = supabase
+        self.archive_dir = archive_dir or settings.CHAT_ARCHIVE_DIR
+        self.block_size = block_size
+        self.codec = "zstd" if zstandard is not None else "gzip"
+        self.messages_table = "chat_messages"
+
+    @property
+    def supabase(self):
+        if self._supabase is None:
+            self._supabase = get_supabase_client()
+        return self._supabase
+
+    def archive_messages_older_than(self, days: Optional[int] = None, batch_size: int = 1000) -> ArchiveResult:
+        """
+        指定日数より古いメッセージをアーカイブに移動し、データベースから削除します
+        アーカイブ済みのIDはスキップするため、途中で失敗しても再実行できます
+        データベースから削除するのは、アーカイブへの書き込みまたはアーカイブ内の存在を確認できたメッセージだけです
+        """
+        days = settings.CHAT_ARCHIVE_AFTER_DAYS if days is None else days
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        result = ArchiveResult()
+        sessions = set()
+
+        while True:
+            response = self.supabase.table(self.messages_table).select(
+                "*"
+            ).lt(
+                "created_at", cutoff.isoformat()
+            ).order("id").limit(batch_size).execute()
+
+            rows = response.data or []
+            if not rows:
+                break
+
+            by_session: Dict[int, List[Dict[str, Any]]] = {}
+            for row in rows:
+                by_session.setdefault(row["session_id"], []).append(row)
+
+            ids: List[int] = []
+            for session_id, session_rows in by_session.items():
+                appended = self.append(session_id, session_rows)
+                result.archived += len(appended.written)
+                ids.extend(appended.ids)
+                sessions.add(session_id)
+
+            if not ids:
+                # 削除できる行が無いと同じ行を取得し続けるため中断する
+                logger.warning("アーカイブに書き込めたメッセージが無いため処理を中断します")
+                break
+
+            # アーカイブへの書き込みが完了してから削除する
+            self.supabase.table(self.messages_table).delete().in_("id", ids).execute()
+            result.deleted += len(ids)
+
+            if len(rows) < batch_size:
+                break
+
+        result.sessions = sorted(sessions)
+        return result
+
+    def append(self, session_id: int, rows: List[Dict[str, Any]]) -> AppendResult:
+        """
+        メッセージをセッションのアーカイブに新しいセグメントとして追記します
+        作成日時の順とIDの順が一致しない場合があるため、アーカイブ済みの最大ID以下のメッセージも
+        セグメントに存在するかを確認し、存在しないものは書き込みます
+
+        Returns:
+            書き込んだメッセージIDと、既にアーカイブにあったメッセージID
+        """
+        index = self._read_index(session_id)
+        result = AppendResult()
+        older_ids = [row["id"] for row in rows if row["id"] <= index["last_id"]]
+        if older_ids:
+            result.present = sorted(row["id"] for row in self.get_messages_by_ids(session_id, older_ids))
+        present = set(result.present)
+        rows = sorted((row for row in rows if row["id"] not in present), key=lambda row: row["id"])
+        if not rows:
+            return result
+
+        session_dir = self._session_dir(session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        extension = "zst" if self.codec == "zstd" else "gz"
+        file_name = f"segment_{rows[0]['id']:012d}_{rows[-1]['id']:012d}.jsonl.{extension}"
+
+        blocks = []
+        offset = 0
+        with open(os.path.join(session_dir, file_name), "wb") as f:
+            for start in range(0, len(rows), self.block_size):
+                block_rows = rows[start:start + self.block_size]
+                payload = "".join(
+                    json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in block_rows
+                ).encode("utf-8")
+                compressed = _compress(payload, self.codec)
+                f.write(compressed)
+                blocks.append({
+                    "offset": offset,
+                    "length": len(compressed),
+                    "first_id": block_rows[0]["id"],
+                    "last_id": block_rows[-1]["id"],
+                    "count": len(block_rows),
+                })
+                offset += len(compressed)
+            f.flush()
+            os.fsync(f.fileno())
+
+        index["segments"].append({
+            "file": file_name,
+            "codec": self.codec,
+            "first_id": rows[0]["id"],
+            "last_id": rows[-1]["id"],
+            "count": len(rows),
+            "blocks": blocks,
+        })
+        index["last_id"] = max(index["last_id"], rows[-1]["id"])
+        index["count"] += len(rows)
+        self._write_index(session_id, index)
+        result.written = [row["id"] for row in rows]
+        return result
+
+    def has_archive(self, session_id: int) -> bool:
+        """
+        セッションにアーカイブ済みのメッセージがあるかを返します
+        """
+        return os.path.exists(os.path.join(self._session_dir(session_id), _INDEX_FILE))
+
+    def get_messages(
+        self, session_id: int, before: Optional[int] = None, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        アーカイブからbeforeより古いメッセージを新しい順に最大limit件取得します
+        後から追記したセグメントにより古いIDが含まれることがあるため、ブロックを最大IDの降順に読み、
+        残りのブロックに上位limit件に入るメッセージが無くなった時点で打ち切ります
+        """
+        if limit <= 0 or not self.has_archive(session_id):
+            return []
+
+        index = self._read_index(session_id)
+        blocks = sorted(
+            (
+                (segment, block)
+                for segment in index["segments"]
+                for block in segment["blocks"]
+                if before is None or block["first_id"] < before
+            ),
+            key=lambda item: item[1]["last_id"],
+            reverse=True,
+        )
+        results: List[Dict[str, Any]] = []
+        for segment, block in blocks:
+            if len(results) >= limit and block["last_id"] < results[limit - 1]["id"]:
+                break
+            results.extend(
+                row for row in self._read_block(session_id, segment, block)
+                if before is None or row["id"] < before
+            )
+            results.sort(key=lambda row: row["id"], reverse=True)
+        return results[:limit]
+
+    def get_messages_by_ids(self, session_id: int, message_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """
+        アーカイブから指定IDのメッセージを取得します（該当ブロックのみ展開します）
+        """
+        wanted = set(message_ids)
+        if not wanted or not self.has_archive(session_id):
+            return []
+
+        index = self._read_index(session_id)
+        results = []
+        for segment in index["segments"]:
+            for block in segment["blocks"]:
+                if not any(block["first_id"] <= message_id <= block["last_id"] for message_id in wanted):
+                    continue
+                results.extend(
+                    row for row in self._read_block(session_id, segment, block) if row["id"] in wanted
+                )
+        return results
+
+    def iter_messages(self, session_id: int) -> Iterator[Dict[str, Any]]:
+        """
+        セッションのアーカイブ済みメッセージを全て返します（検索インデックスの再構築用。ブロック単位で展開します）
+        """
+        if not self.has_archive(session_id):
+            return
+        index = self._read_index(session_id)
+        for segment in index["segments"]:
+            for block in segment["blocks"]:
+                yield from self._read_block(session_id, segment, block)
+
+    def delete_session(self, session_id: int) -> None:
+        """
+        セッションのアーカイブを削除します
+        """
+        shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+
+    def _session_dir(self, session_id: int) -> str:
+        return os.path.join(self.archive_dir, f"session_{session_id}")
+
+    def _read_index(self, session_id: int) -> Dict[str, Any]:
+        path = os.path.join(self._session_dir(session_id), _INDEX_FILE)
+        if not os.path.exists(path):
+            return {"session_id": session_id, "last_id": 0, "count": 0, "segments": []}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_index(self, session_id: int, index: Dict[str, Any]) -> None:
+        path = os.path.join(self._session_dir(session_id), _INDEX_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _read_block(self, session_id: int, segment: Dict[str, Any], block: Dict[str, Any]) -> List[Dict[str, Any]]:
+        path = os.path.join(self._session_dir(session_id), segment["file"])
+        with open(path, "rb") as f:
+            f.seek(block["offset"])
+            data = f.read(block["length"])
+        lines = _decompress(data, segment["codec"]).decode("utf-8").splitlines()
+        return [json.loads(line) for line in lines if line]
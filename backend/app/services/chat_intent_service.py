@@ -0,0 +1,194 @@
+import re
+from typing import Awaitable, Callable, List, Optional, Pattern, Tuple
+from datetime import date, datetime, timedelta
+
+from app.db.session import get_supabase_client
+from app.models.task import Task
+from app.services.task_service import TaskService
+from app.services.planting_plan_service import PlantingPlanService
+from app.services.resource_service import ResourceService
+
+
+# 名詞として取り出す部分（「の」や句読点・空白を含まない連続文字列）
+_NOUN = r"(?P<name>[^\s　のは、。？?！!「」]+)"
+
+# 質問の末尾（「は？」「はいつですか？」「を教えて」など）。文末まで一致した場合のみ定型質問とみなす
+_QUESTION_TAIL = (
+    r"(?:は|って)?"
+    r"(?:いつ|どれくらい|どのくらい|いくつ|何[個本袋台件]?|ある|あります|ありますか)?"
+    r"(?:を)?(?:教えて|おしえて)?(?:ください)?(?:ですか|でしょうか|か)?"
+    r"[？?]?$"
+)
+
+_TASK_DAY_PATTERN = re.compile(r"(?P<day>今日|本日|明日|昨日|今週|来週)の?(作業|タスク|予定|仕事)" + _QUESTION_TAIL)
+_PLANTING_DATE_PATTERN = re.compile(_NOUN + r"の(定植|植え付け|植付け|植付)(日|予定|時期)?" + _QUESTION_TAIL)
+_HARVEST_DATE_PATTERN = re.compile(_NOUN + r"の収穫(日|予定|時期)?" + _QUESTION_TAIL)
+_RESOURCE_STOCK_PATTERN = re.compile(_NOUN + r"の(在庫|残り|残量|数量|ストック)" + _QUESTION_TAIL)
+
+# 作業の質問に一覧で回答する最大件数
+_TASK_LIST_LIMIT = 50
+
+
+class ChatIntentService:
+    """
+    定型的な質問（今日の作業、定植日、在庫など）を認識し、
+    AIモデルを使わずにサービス層から直接回答を組み立てます
+    """
+
+    def __init__(
+        self,
+        supabase=None,
+        task_service: Optional[TaskService] = None,
+        planting_plan_service: Optional[PlantingPlanService] = None,
+        resource_service: Optional[ResourceService] = None,
+    ):
+        self.supabase = supabase or get_supabase_client()
+        self.task_service = task_service or TaskService(supabase=self.supabase)
+        self.planting_plan_service = planting_plan_service or PlantingPlanService(supabase=self.supabase)
+        self.resource_service = resource_service or ResourceService(supabase=self.supabase)
+        self._handlers: List[Tuple[Pattern, Callable[[re.Match, str, int], Awaitable[Optional[str]]]]] = [
+            (_PLANTING_DATE_PATTERN, self._answer_planting_date),
+            (_HARVEST_DATE_PATTERN, self._answer_harvest_date),
+            (_RESOURCE_STOCK_PATTERN, self._answer_resource_stock),
+            (_TASK_DAY_PATTERN, self._answer_tasks),
+        ]
+
+    async def answer(self, user_message: str, organization_id: int) -> Optional[str]:
+        """
+        定型的な質問であれば回答を返します。該当しない場合はNoneを返します
+        """
+        message = user_message.strip()
+        if not message:
+            return None
+
+        for pattern, handler in self._handlers:
+            match = pattern.search(message)
+            if not match:
+                continue
+
+            response = await handler(match, message, organization_id)
+            if response is not None:
+                return response
+
+        return None
+
+    async def _answer_tasks(self, match: re.Match, message: str, organization_id: int) -> Optional[str]:
+        """
+        「今日の作業は？」などの質問に回答します
+        """
+        label = match.group("day")
+        start_date, end_date = self._resolve_day_range(label)
+        tasks = await self.task_service.get_tasks_scheduled_between(
+            organization_id=organization_id,
+            start=datetime.combine(start_date, datetime.min.time()),
+            end=datetime.combine(end_date, datetime.min.time()),
+            limit=_TASK_LIST_LIMIT + 1,
+        )
+
+        if not tasks:
+            # 該当データがない場合は定型回答せず、AIモデルに任せる
+            return None
+
+        # 上限を超えた場合は件数を断定せず、先頭の上限件数だけを表示する
+        if len(tasks) > _TASK_LIST_LIMIT:
+            tasks = tasks[:_TASK_LIST_LIMIT]
+            lines = [f"{label}の作業は{_TASK_LIST_LIMIT}件以上あります（先頭の{_TASK_LIST_LIMIT}件を表示します）。"]
+        else:
+            lines = [f"{label}の作業は{len(tasks)}件です。"]
+        lines.extend(self._format_task(task, include_date=(end_date - start_date).days > 1) for task in tasks)
+        return "\n".join(lines)
+
+    async def _answer_planting_date(self, match: re.Match, message: str, organization_id: int) -> Optional[str]:
+        """
+        「トマトの定植日はいつ？」などの質問に回答します
+        """
+        crop_name = match.group("name")
+        plans = await self.planting_plan_service.find_planting_plans_by_crop_name(
+            organization_id=organization_id,
+            crop_name=crop_name
+        )
+
+        if not plans:
+            # 該当データがない場合は定型回答せず、AIモデルに任せる
+            return None
+
+        lines = [f"「{crop_name}」の定植日:"]
+        for name, plan in plans:
+            planting_date = plan.planting_date.isoformat() if plan.planting_date else "未定"
+            lines.append(f"・{plan.plan_name}（{name}）: {planting_date}［{plan.status}］")
+        return "\n".join(lines)
+
+    async def _answer_harvest_date(self, match: re.Match, message: str, organization_id: int) -> Optional[str]:
+        """
+        「キャベツの収穫予定は？」などの質問に回答します
+        """
+        crop_name = match.group("name")
+        plans = await self.planting_plan_service.find_planting_plans_by_crop_name(
+            organization_id=organization_id,
+            crop_name=crop_name
+        )
+
+        if not plans:
+            # 該当データがない場合は定型回答せず、AIモデルに任せる
+            return None
+
+        lines = [f"「{crop_name}」の収穫予定日:"]
+        for name, plan in plans:
+            harvest_date = plan.harvest_date.isoformat() if plan.harvest_date else "未定"
+            lines.append(f"・{plan.plan_name}（{name}）: {harvest_date}［{plan.status}］")
+        return "\n".join(lines)
+
+    async def _answer_resource_stock(self, match: re.Match, message: str, organization_id: int) -> Optional[str]:
+        """
+        「堆肥の在庫は？」などの質問に回答します
+        """
+        keyword = match.group("name")
+        resources = await self.resource_service.find_resources_by_name(
+            organization_id=organization_id,
+            keyword=keyword
+        )
+
+        if not resources:
+            # 該当データがない場合は定型回答せず、AIモデルに任せる
+            return None
+
+        lines = [f"「{keyword}」の在庫状況:"]
+        for resource in resources:
+            if resource.quantity is not None:
+                quantity = f"{resource.quantity:g}{resource.unit or ''}"
+            else:
+                quantity = "数量未登録"
+            location = f"（保管場所: {resource.location}）" if resource.location else ""
+            lines.append(f"・{resource.name}: {quantity}［{resource.status}］{location}")
+        return "\n".join(lines)
+
+    def _resolve_day_range(self, label: str) -> Tuple[date, date]:
+        """
+        「今日」「今週」などの表現を[開始日, 終了日)の範囲に変換します
+        """
+        today = date.today()
+        if label == "明日":
+            return today + timedelta(days=1), today + timedelta(days=2)
+        if label == "昨日":
+            return today - timedelta(days=1), today
+        if label == "今週":
+            week_start = today - timedelta(days=today.weekday())
+            return week_start, week_start + timedelta(days=7)
+        if label == "来週":
+            week_start = today - timedelta(days=today.weekday()) + timedelta(days=7)
+            return week_start, week_start + timedelta(days=7)
+        return today, today + timedelta(days=1)
+
+    def _format_task(self, task: Task, include_date: bool) -> str:
+        """
+        作業を1行の文字列に整形します
+        """
+        parts = []
+        if include_date:
+            parts.append(task.scheduled_date.strftime("%m/%d"))
+        parts.append(task.task_type)
+        if task.field_name:
+            parts.append(f"@{task.field_name}")
+        if task.assigned_to:
+            parts.append(f"担当: {task.assigned_to}")
+        return f"・{' '.join(parts)}［{task.status}］"
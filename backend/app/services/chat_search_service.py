@@ -0,0 +1,528 @@
+import asyncio
+import heapq
+import logging
+import math
+import os
+import pickle
+import shlex
+import threading
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.db.session import get_supabase_client
+from app.services.chat_archive_service import ChatArchiveService
+from app.utils.async_utils import run_in_thread
+from app.utils.text_utils import char_ngrams, normalize_text, normalize_text_with_offsets
+
+logger = logging.getLogger(__name__)
+
+_INDEX_FORMAT_VERSION = 1
+
+
+@dataclass
+class ChatSearchQuery:
+    """解析済みの検索クエリ"""
+    phrases: List[str]  # 完全一致で含まれている必要がある語句（正規化済み）
+    grams: List[str]  # 候補抽出とスコアリングに使うn-gram
+    chars: List[str] = field(default_factory=list)  # 1文字の語（その文字を含むn-gramで候補を抽出する）
+
+
+@dataclass
+class ChatSearchCandidate:
+    """n-gramインデックスで絞り込んだ検索候補"""
+    message_id: int
+    session_id: int
+    score: float
+
+
+def parse_search_query(query: str) -> ChatSearchQuery:
+    """
+    検索クエリを解析します
+    ダブルクォートで囲んだ部分はフレーズとして扱い、それ以外は空白区切りの語として扱います
+    いずれも本文に部分文字列として含まれることを条件とします（AND検索）
+    """
+    normalized = normalize_text(query)
+    try:
+        terms = shlex.split(normalized)
+    except ValueError:
+        # 閉じられていない引用符は無視する
+        terms = normalized.replace('"', " ").split()
+
+    phrases: List[str] = []
+    grams: List[str] = []
+    chars: List[str] = []
+    for term in terms:
+        term = term.strip()
+        if not term:
+            continue
+        phrases.append(term)
+        if len(term) == 1:
+            # 「苗」「畑」のような1文字の語はn-gramを作れないため、その文字を含むn-gramで探す
+            chars.append(term)
+        else:
+            grams.extend(_query_grams(term))
+
+    return ChatSearchQuery(phrases=phrases, grams=grams, chars=chars)
+
+
+def _document_grams(text: str) -> Counter:
+    return Counter(char_ngrams(text, 2) + char_ngrams(text, 3))
+
+
+def _query_grams(term: str) -> List[str]:
+    # 3文字以上の語はより絞り込みの効くtrigramで検索する
+    grams = [gram for gram in char_ngrams(term, 3) if len(gram) == 3]
+    if grams:
+        return grams
+    return [gram for gram in char_ngrams(term, 2) if len(gram) == 2]
+
+
+class ChatSearchIndex:
+    """
+    1組織分のチャットメッセージに対する文字bigram/trigramの転置インデックス
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.message_ids = array("Q")  # slot -> メッセージID
+        self.session_ids = array("Q")  # slot -> セッションID
+        self.lengths = array("I")  # slot -> n-gram数
+        self.alive = bytearray()  # slot -> 有効フラグ
+        self.slots: Dict[int, int] = {}  # メッセージID -> slot
+        self.postings: Dict[str, Tuple[array, array]] = {}  # n-gram -> (slot配列, 出現回数配列)
+        self.char_grams: Dict[str, Set[str]] = {}  # 文字 -> その文字を含む2文字以下のn-gram（1文字の語の検索用）
+        self.total_length = 0
+        self.last_message_id = 0  # インデックス済みの最大メッセージID
+        self.dirty = 0  # 前回の保存以降の更新件数
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def add(self, message_id: int, session_id: int, content: str) -> None:
+        """
+        メッセージをインデックスに追加します
+        """
+        with self.lock:
+            if message_id in self.slots:
+                return
+
+            grams = _document_grams(content)
+            slot = len(self.message_ids)
+            length = sum(grams.values())
+            self.message_ids.append(message_id)
+            self.session_ids.append(session_id)
+            self.lengths.append(length)
+            self.alive.append(1)
+            self.slots[message_id] = slot
+            self.total_length += length
+            self.last_message_id = max(self.last_message_id, message_id)
+            self.dirty += 1
+
+            for gram, tf in grams.items():
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = (array("I"), array("H"))
+                    self.postings[gram] = posting
+                    self._add_char_grams(gram)
+                posting[0].append(slot)
+                posting[1].append(min(tf, 0xFFFF))
+
+    def _add_char_grams(self, gram: str) -> None:
+        # 文中の文字はその文字で始まるか終わるbigramに、1文字だけの区切りは1文字のn-gramに含まれる
+        if len(gram) <= 2:
+            for char in set(gram):
+                self.char_grams.setdefault(char, set()).add(gram)
+
+    def remove_session(self, session_id: int) -> None:
+        """
+        セッションに属するメッセージをインデックスから除外します
+        """
+        with self.lock:
+            for slot, owner in enumerate(self.session_ids):
+                if owner == session_id and self.alive[slot]:
+                    self.alive[slot] = 0
+                    self.slots.pop(self.message_ids[slot], None)
+                    self.total_length -= self.lengths[slot]
+                    self.dirty += 1
+
+    def candidates(
+        self, grams: List[str], limit: int = 1000, chars: Optional[List[str]] = None
+    ) -> List[ChatSearchCandidate]:
+        """
+        全てのn-gramと文字を含むメッセージをBM25スコアの高い順に最大limit件返します
+        """
+        query_terms = Counter(grams)
+        query_chars = Counter(chars or [])
+        with self.lock:
+            doc_count = len(self.slots)
+            if doc_count == 0 or not (query_terms or query_chars):
+                return []
+
+            postings = []
+            for gram, query_tf in query_terms.items():
+                posting = self.postings.get(gram)
+                if posting is None:
+                    return []
+                postings.append((posting, query_tf))
+            for char, query_tf in query_chars.items():
+                posting = self._char_posting(char)
+                if posting is None:
+                    return []
+                postings.append((posting, query_tf))
+
+            # 出現数の少ないn-gramから積集合を取る
+            postings.sort(key=lambda item: len(item[0][0]))
+            alive = self.alive
+            matched: Optional[Set[int]] = None
+            for (slots, _), _ in postings:
+                current = {slot for slot in slots if alive[slot]}
+                matched = current if matched is None else matched & current
+                if not matched:
+                    return []
+
+            avg_length = self.total_length / doc_count
+            k1, b = self.K1, self.B
+            scores: Dict[int, float] = dict.fromkeys(matched, 0.0)
+            for (slots, frequencies), query_tf in postings:
+                df = min(len(slots), doc_count)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                weight = query_tf * idf * (k1 + 1)
+                for slot, tf in zip(slots, frequencies):
+                    if slot in scores:
+                        norm = k1 * (1 - b + b * self.lengths[slot] / avg_length)
+                        scores[slot] += weight * tf / (tf + norm)
+
+            # 同点の場合は新しいメッセージを優先する
+            ranked = heapq.nlargest(
+                limit,
+                scores.items(),
+                key=lambda item: (item[1], self.message_ids[item[0]])
+            )
+            return [
+                ChatSearchCandidate(
+                    message_id=self.message_ids[slot],
+                    session_id=self.session_ids[slot],
+                    score=score
+                )
+                for slot, score in ranked
+            ]
+
+    def _char_posting(self, char: str) -> Optional[Tuple[array, array]]:
+        """
+        文字を含むn-gramの転置リストを合わせ、その文字の転置リストとして返します
+        """
+        frequencies: Dict[int, int] = {}
+        for gram in self.char_grams.get(char, ()):
+            slots, tfs = self.postings[gram]
+            for slot, tf in zip(slots, tfs):
+                frequencies[slot] = frequencies.get(slot, 0) + tf
+        if not frequencies:
+            return None
+        merged_slots = array("I", frequencies.keys())
+        merged_tfs = array("H", (min(tf, 0xFFFF) for tf in frequencies.values()))
+        return merged_slots, merged_tfs
+
+    def to_state(self) -> dict:
+        """
+        保存用の状態を複製して返します（配列の複製だけをロック中に行い、直列化はロックの外で行えるようにする）
+        """
+        with self.lock:
+            return {
+                "version": _INDEX_FORMAT_VERSION,
+                "message_ids": array("Q", self.message_ids),
+                "session_ids": array("Q", self.session_ids),
+                "lengths": array("I", self.lengths),
+                "alive": bytearray(self.alive),
+                "postings": {
+                    gram: (array("I", slots), array("H", frequencies))
+                    for gram, (slots, frequencies) in self.postings.items()
+                },
+                "total_length": self.total_length,
+                "last_message_id": self.last_message_id,
+                "dirty": self.dirty,
+            }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "ChatSearchIndex":
+        if state.get("version") != _INDEX_FORMAT_VERSION:
+            raise ValueError(f"未対応のインデックス形式です: {state.get('version')}")
+
+        index = cls()
+        index.message_ids = state["message_ids"]
+        index.session_ids = state["session_ids"]
+        index.lengths = state["lengths"]
+        index.alive = state["alive"]
+        index.postings = state["postings"]
+        index.total_length = state["total_length"]
+        index.last_message_id = state["last_message_id"]
+        index.slots = {
+            message_id: slot
+            for slot, message_id in enumerate(index.message_ids)
+            if index.alive[slot]
+        }
+        for gram in index.postings:
+            index._add_char_grams(gram)
+        return index
+
+
+class ChatSearchService:
+    """
+    組織ごとのチャットメッセージ全文検索インデックスを管理します
+    インデックスはローカルディスクに保存され、起動後の初回検索時に読み込み（存在しなければ再構築）、
+    以降はメッセージ追加のたびにインクリメンタルに更新します
+    読み込み・再構築はデータベースの全件の読み取りを含むため、ワーカースレッド（run_in_thread）で行います
+    """
+
+    _indexes: Dict[int, ChatSearchIndex] = {}
+    _load_lock = threading.Lock()
+    _saving: Set[int] = set()  # バックグラウンドで保存中の組織ID
+    _saving_lock = threading.Lock()
+    _page_size = 1000
+    # 読み込み時に最大IDより前から読み直す範囲（IDの順と異なる順でコミットされたメッセージを取り込むため）
+    _catch_up_overlap = 1000
+
+    def __init__(
+        self, supabase=None, index_dir: Optional[str] = None, archive_service: Optional[ChatArchiveService] = None
+    ):
+        self._supabase = supabase
+        self.index_dir = index_dir or settings.CHAT_SEARCH_INDEX_DIR
+        self.messages_table = "chat_messages"
+        self.sessions_table = "chat_sessions"
+        self._archive_service = archive_service
+
+    @property
+    def supabase(self):
+        if self._supabase is None:
+            self._supabase = get_supabase_client()
+        return self._supabase
+
+    @property
+    def archive_service(self) -> ChatArchiveService:
+        if self._archive_service is None:
+            self._archive_service = ChatArchiveService(supabase=self._supabase)
+        return self._archive_service
+
+    def get_index(self, organization_id: int) -> ChatSearchIndex:
+        """
+        組織のインデックスを取得します（ディスクから読み込み、未反映のメッセージを取り込みます）
+        データベースを読むため、イベントループからはload_indexを使ってください
+        """
+        index = self._indexes.get(organization_id)
+        if index is not None:
+            return index
+
+        with self._load_lock:
+            index = self._indexes.get(organization_id)
+            if index is None:
+                index = self._load(organization_id) or ChatSearchIndex()
+                self._catch_up(organization_id, index)
+                self._indexes[organization_id] = index
+            return index
+
+    def index_message(self, organization_id: int, message_id: int, session_id: int, content: str) -> None:
+        """
+        追加されたメッセージをインデックスに反映します（読み込み済みの組織のみ）
+        """
+        index = self._indexes.get(organization_id)
+        if index is None:
+            # 未読み込みの場合は次回読み込み時にデータベースから取り込まれる
+            return
+
+        index.add(message_id, session_id, content)
+        if index.dirty >= settings.CHAT_SEARCH_FLUSH_INTERVAL:
+            self._save_in_background(organization_id)
+
+    def _save_in_background(self, organization_id: int) -> None:
+        """
+        インデックス全体の書き出しはリクエストの処理を止めないよう、イベントループの外（スレッドプール）で行います
+        保存中の組織は重ねて保存しません（未保存の更新は次回の保存に含まれます）
+        """
+        with self._saving_lock:
+            if organization_id in self._saving:
+                return
+            self._saving.add(organization_id)
+
+        def run() -> None:
+            try:
+                self.save(organization_id)
+            except Exception:
+                logger.warning("チャット検索インデックスを保存できませんでした: org=%s", organization_id, exc_info=True)
+            finally:
+                with self._saving_lock:
+                    self._saving.discard(organization_id)
+
+        try:
+            asyncio.get_running_loop().run_in_executor(None, run)
+        except RuntimeError:
+            # イベントループの外（スクリプトなど）ではそのまま保存する
+            run()
+
+    def remove_session(self, organization_id: int, session_id: int) -> None:
+        """
+        削除されたセッションのメッセージをインデックスから除外します
+        """
+        index = self._indexes.get(organization_id)
+        if index is not None:
+            index.remove_session(session_id)
+
+    async def load_index(self, organization_id: int) -> ChatSearchIndex:
+        """
+        組織のインデックスを取得します（未読み込みの場合はワーカースレッドで読み込みます）
+        """
+        index = self._indexes.get(organization_id)
+        if index is not None:
+            return index
+        return await run_in_thread(self._get_index_async, organization_id)
+
+    async def _get_index_async(self, organization_id: int) -> ChatSearchIndex:
+        return self.get_index(organization_id)
+
+    async def search(
+        self, organization_id: int, query: str, limit: int = 1000
+    ) -> Tuple[ChatSearchQuery, List[ChatSearchCandidate]]:
+        """
+        クエリを解析し、n-gramインデックスで候補メッセージをスコア順に取得します
+        フレーズの完全一致確認は本文を取得する呼び出し側で行います
+        """
+        parsed = parse_search_query(query)
+        if not parsed.grams and not parsed.chars:
+            return parsed, []
+        index = await self.load_index(organization_id)
+        return parsed, index.candidates(parsed.grams, limit=limit, chars=parsed.chars)
+
+    async def rebuild(self, organization_id: int) -> ChatSearchIndex:
+        """
+        アーカイブ済みのメッセージとデータベースの内容からインデックスを作り直して保存します
+        """
+        return await run_in_thread(self._rebuild, organization_id)
+
+    async def _rebuild(self, organization_id: int) -> ChatSearchIndex:
+        index = ChatSearchIndex()
+        for session_id in self._session_ids(organization_id):
+            for row in self.archive_service.iter_messages(session_id):
+                index.add(row["id"], row["session_id"], row["content"])
+        # アーカイブより小さいIDのメッセージがデータベースに残っている場合があるため、先頭から読む
+        self._catch_up(organization_id, index, after=0)
+        with self._load_lock:
+            self._indexes[organization_id] = index
+        self.save(organization_id)
+        return index
+
+    def _session_ids(self, organization_id: int) -> List[int]:
+        session_ids: List[int] = []
+        while True:
+            response = self.supabase.table(self.sessions_table).select(
+                "id"
+            ).eq(
+                "organization_id", organization_id
+            ).gt(
+                "id", session_ids[-1] if session_ids else 0
+            ).order("id").limit(self._page_size).execute()
+
+            session_ids.extend(row["id"] for row in response.data)
+            if len(response.data) < self._page_size:
+                return session_ids
+
+    def save(self, organization_id: int) -> None:
+        """
+        インデックスをディスクに保存します（一時ファイルに書き込んでから置き換え）
+        ロックは状態の複製の間だけ保持し、直列化と書き込みの間もメッセージを追加できるようにします
+        """
+        index = self._indexes.get(organization_id)
+        if index is None:
+            return
+
+        path = self._index_path(organization_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        state = index.to_state()
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        with index.lock:
+            # 複製した後に追加された分は未保存として残す
+            index.dirty = max(0, index.dirty - state["dirty"])
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        メモリ上のインデックスを破棄します
+        """
+        cls._indexes.clear()
+
+    def _index_path(self, organization_id: int) -> str:
+        return os.path.join(self.index_dir, f"org_{organization_id}.idx")
+
+    def _load(self, organization_id: int) -> Optional[ChatSearchIndex]:
+        path = self._index_path(organization_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                return ChatSearchIndex.from_state(pickle.load(f))
+        except Exception:
+            logger.warning("チャット検索インデックスを読み込めないため再構築します: %s", path, exc_info=True)
+            return None
+
+    def _catch_up(self, organization_id: int, index: ChatSearchIndex, after: Optional[int] = None) -> None:
+        """
+        インデックスに未反映のメッセージをデータベースから取り込みます
+        インデックス済みの最大IDより_catch_up_overlap件前から読み直し、後からコミットされた小さいIDのメッセージも取り込みます
+        （インデックス済みのメッセージはaddで無視されます）
+        """
+        cursor = max(0, index.last_message_id - self._catch_up_overlap) if after is None else after
+        while True:
+            response = self.supabase.table(self.messages_table).select(
+                "id, session_id, content"
+            ).eq(
+                "organization_id", organization_id
+            ).gt(
+                "id", cursor
+            ).order("id").limit(self._page_size).execute()
+
+            for row in response.data:
+                index.add(row["id"], row["session_id"], row["content"])
+
+            if len(response.data) < self._page_size:
+                break
+            cursor = response.data[-1]["id"]
+
+        if index.dirty:
+            self._indexes[organization_id] = index
+            self.save(organization_id)
+
+
+def build_snippet(content: str, phrases: List[str], width: int = 40) -> str:
+    """
+    最初に一致した語句の前後を切り出した抜粋を作成します
+    """
+    # 一致位置は正規化後の文字列で探し、元の文字列の位置に戻してから切り出す
+    normalized, offsets = normalize_text_with_offsets(content)
+    position = -1
+    for phrase in phrases:
+        position = normalized.find(phrase)
+        if position >= 0:
+            break
+
+    if position < 0 or len(content) <= width * 2:
+        return content[:width * 2]
+
+    start = max(0, offsets[position] - width // 2)
+    end = min(len(content), start + width * 2)
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(content) else ""
+    return f"{prefix}{content[start:end]}{suffix}"
+
+
+def matches_all_phrases(content: str, phrases: List[str]) -> bool:
+    """
+    本文（正規化後）が全ての語句を部分文字列として含むかを判定します
+    """
+    normalized = normalize_text(content)
+    return all(phrase in normalized for phrase in phrases)
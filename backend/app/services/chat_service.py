@@ -1,29 +1,118 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+import hashlib
 import json
+import logging
 import os
 
+from app.core import events, metrics
+from app.core.config import settings
 from app.db.session import get_supabase_client
-from app.models.chat import ChatMessage, ChatSession
+from app.models.chat import ChatMessage, ChatMessagePreview, ChatSession
 from app.schemas.chat import ChatMessageCreate, ChatSessionCreate, ChatSessionUpdate
+from app.services.chat_intent_service import ChatIntentService
+from app.services.chat_agent_service import ChatAgentService
+from app.services.farm_retrieval_service import FarmRetrievalService, RetrievedRecord
+from app.services.chat_search_service import ChatSearchService, build_snippet, matches_all_phrases
+from app.services.chat_archive_service import ChatArchiveService
+from app.utils.cache_utils import TTLCache, MISSING
+from app.utils.text_utils import normalize_question
 from app.exceptions.service_exceptions import (
     DatabaseOperationException,
     ResourceNotFoundException,
     ValidationException
 )
 
+logger = logging.getLogger(__name__)
+
+# セッション詳細で返すメッセージの既定件数（それより古いメッセージはページングで取得）
+DEFAULT_MESSAGE_PAGE_SIZE = 50
+
+# chat_sessionsに保持する最新メッセージのプレビュー文字数
+LAST_MESSAGE_PREVIEW_LENGTH = 200
+
+# キーワード応答（FAQ）
+FARMING_RESPONSES = {
+    "こんにちは": "こんにちは！SmartFarm AIアシスタントです。農業に関するご質問があればお気軽にどうぞ。",
+    "天気": "現在の天気予報データにはアクセスできませんが、地域の気象情報を確認することをお勧めします。農作業の計画に役立ちます。",
+    "作物": "どのような作物についてお知りになりたいですか？栽培方法、病害虫対策、収穫時期など具体的にお聞かせください。",
+    "肥料": "適切な肥料選びは作物の成長に重要です。土壌検査を行い、作物に合った肥料を選ぶことをお勧めします。",
+    "病害虫": "病害虫の早期発見と対策が重要です。定期的な観察と予防的な対策を行いましょう。具体的な症状があれば教えてください。",
+    "水やり": "水やりは作物によって適切な量と頻度が異なります。過剰な水やりは根腐れの原因になるため注意が必要です。",
+    "収穫": "収穫のタイミングは作物の品質に大きく影響します。適切な収穫時期を見極めることが重要です。",
+    "土壌": "健康な土壌は農業の基本です。定期的な土壌検査と適切な管理を行いましょう。",
+    "有機栽培": "有機栽培は環境に優しく、安全な作物を生産できます。輪作や天敵の利用など総合的な管理が重要です。",
+    "スマート農業": "IoTセンサーやデータ分析を活用することで、効率的な農業経営が可能になります。具体的な導入方法についてご質問ください。"
+}
+
+# FAQの内容が変わればキャッシュキーも変わるようにするためのバージョン
+FAQ_VERSION = hashlib.sha1(json.dumps(FARMING_RESPONSES, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+# 正規化した質問文をキーとするAI応答のキャッシュ（組織単位）
+response_cache = TTLCache(
+    maxsize=settings.CHAT_RESPONSE_CACHE_SIZE,
+    ttl=settings.CHAT_RESPONSE_CACHE_TTL_SECONDS
+)
+
+
+def _invalidate_response_cache(event: events.DataChangeEvent) -> None:
+    """
+    営農データが変更された組織の応答キャッシュを破棄します（組織不明の場合は全て破棄）
+    """
+    if event.organization_id is None:
+        response_cache.clear()
+    else:
+        response_cache.invalidate(lambda key: key[0] == event.organization_id)
+
+
+events.subscribe(_invalidate_response_cache)
+metrics.register_cache("chat_response", response_cache)
+
 
 class ChatService:
-    def __init__(self, supabase=None):
+    def __init__(
+        self,
+        supabase=None,
+        intent_service: Optional[ChatIntentService] = None,
+        retrieval_service: Optional[FarmRetrievalService] = None,
+        search_service: Optional[ChatSearchService] = None,
+        archive_service: Optional[ChatArchiveService] = None,
+        agent_service: Optional[ChatAgentService] = None,
+    ):
         self.supabase = supabase or get_supabase_client()
         self.sessions_table = "chat_sessions"
         self.messages_table = "chat_messages"
+        self._intent_service = intent_service
+        self._agent_service = agent_service
+        self.retrieval_service = retrieval_service or FarmRetrievalService(supabase=self.supabase)
+        self.archive_service = archive_service or ChatArchiveService(supabase=self.supabase)
+        self.search_service = search_service or ChatSearchService(supabase=self.supabase, archive_service=self.archive_service)
+
+    @property
+    def intent_service(self) -> ChatIntentService:
+        """
+        定型質問ルーター（初回アクセス時に生成）
+        """
+        if self._intent_service is None:
+            self._intent_service = ChatIntentService(supabase=self.supabase)
+        return self._intent_service
+
+    @property
+    def agent_service(self) -> ChatAgentService:
+        """
+        ツール呼び出しエージェント（初回アクセス時に生成）
+        """
+        if self._agent_service is None:
+            self._agent_service = ChatAgentService(supabase=self.supabase)
+        return self._agent_service
 
     async def get_chat_sessions(
-        self, organization_id: int, skip: int = 0, limit: int = 100
+        self, organization_id: int, skip: int = 0, limit: int = 100, include_last_message: bool = False
     ) -> List[ChatSession]:
         """
         組織に属する全てのチャットセッションを取得します
+        include_last_messageがTrueの場合は最新メッセージのプレビューを含めます
+        （chat_sessionsの非正規化カラムから取得するため追加のクエリは発生しません）
         """
         try:
             response = self.supabase.table(self.sessions_table).select(
@@ -41,21 +130,21 @@ class ChatService:
             
             sessions = []
             for item in response.data:
-                if item.get("created_at"):
-                    item["created_at"] = datetime.fromisoformat(item["created_at"].replace("Z", "+00:00"))
-                if item.get("updated_at"):
-                    item["updated_at"] = datetime.fromisoformat(item["updated_at"].replace("Z", "+00:00"))
-                
-                item["messages"] = []
-                sessions.append(ChatSession(**item))
+                session = self._session_from_row(item)
+                if not include_last_message:
+                    session.last_message = None
+                sessions.append(session)
             
             return sessions
         except Exception as e:
             raise DatabaseOperationException(f"チャットセッションの取得中にエラーが発生しました: {str(e)}")
 
-    async def get_chat_session(self, session_id: int, with_messages: bool = True) -> Optional[ChatSession]:
+    async def get_chat_session(
+        self, session_id: int, with_messages: bool = True, message_limit: int = DEFAULT_MESSAGE_PAGE_SIZE
+    ) -> Optional[ChatSession]:
         """
         特定のチャットセッションを取得します
+        with_messagesがTrueの場合は最新message_limit件のメッセージを古い順で含めます
         """
         try:
             response = self.supabase.table(self.sessions_table).select(
@@ -67,36 +156,99 @@ class ChatService:
             if not response.data:
                 return None
             
-            session_data = response.data[0]
-            
-            if session_data.get("created_at"):
-                session_data["created_at"] = datetime.fromisoformat(session_data["created_at"].replace("Z", "+00:00"))
-            if session_data.get("updated_at"):
-                session_data["updated_at"] = datetime.fromisoformat(session_data["updated_at"].replace("Z", "+00:00"))
-            
-            session = ChatSession(**session_data)
+            session = self._session_from_row(response.data[0])
             
             if with_messages:
-                messages_response = self.supabase.table(self.messages_table).select(
-                    "*"
-                ).eq(
-                    "session_id", session_id
-                ).order(
-                    "created_at", desc=False
-                ).execute()
-                
-                messages = []
-                for msg in messages_response.data:
-                    if msg.get("created_at"):
-                        msg["created_at"] = datetime.fromisoformat(msg["created_at"].replace("Z", "+00:00"))
-                    messages.append(ChatMessage(**msg))
-                
-                session.messages = messages
+                messages, next_cursor = await self.get_messages(
+                    session_id=session_id,
+                    limit=message_limit
+                )
+                session.messages = list(reversed(messages))
+                session.messages_next_cursor = next_cursor
             
             return session
         except Exception as e:
             raise DatabaseOperationException(f"チャットセッションの取得中にエラーが発生しました: {str(e)}")
 
+    def _session_from_row(self, item: Dict[str, Any]) -> ChatSession:
+        """
+        chat_sessionsの行データをChatSessionに変換します（非正規化カラムから最新メッセージのプレビューを組み立てます）
+        """
+        if item.get("created_at"):
+            item["created_at"] = datetime.fromisoformat(item["created_at"].replace("Z", "+00:00"))
+        if item.get("updated_at"):
+            item["updated_at"] = datetime.fromisoformat(item["updated_at"].replace("Z", "+00:00"))
+        
+        last_message_id = item.pop("last_message_id", None)
+        last_message_preview = item.pop("last_message_preview", None)
+        last_message_is_from_ai = item.pop("last_message_is_from_ai", None)
+        last_message_at = item.pop("last_message_at", None)
+        
+        item["messages"] = []
+        item["message_count"] = item.get("message_count") or 0
+        if last_message_id is not None and last_message_at:
+            item["last_message"] = ChatMessagePreview(
+                id=last_message_id,
+                content=last_message_preview or "",
+                is_from_ai=bool(last_message_is_from_ai),
+                created_at=datetime.fromisoformat(last_message_at.replace("Z", "+00:00"))
+            )
+        
+        return ChatSession(**item)
+
+    async def get_messages(
+        self, session_id: int, before: Optional[int] = None, limit: int = DEFAULT_MESSAGE_PAGE_SIZE
+    ) -> Tuple[List[ChatMessage], Optional[int]]:
+        """
+        セッションのメッセージを新しい順に取得します（カーソルページング）
+        
+        Args:
+            session_id: チャットセッションID
+            before: このメッセージIDより古いメッセージを取得する（Noneの場合は最新から）
+            limit: 取得する最大件数
+            
+        Returns:
+            (メッセージのリスト（新しい順）, 次のページのカーソル（続きがない場合はNone）)のタプル
+        """
+        try:
+            query = self.supabase.table(self.messages_table).select(
+                "*"
+            ).eq(
+                "session_id", session_id
+            )
+            
+            if before is not None:
+                query = query.lt("id", before)
+            
+            # 続きの有無を判定するため1件多く取得する
+            response = query.order(
+                "id", desc=True
+            ).limit(limit + 1).execute()
+            
+            rows = response.data or []
+            
+            # データベースに残っている分で足りない場合はアーカイブから続きを読む
+            if len(rows) <= limit:
+                archive_before = rows[-1]["id"] if rows else before
+                rows.extend(self.archive_service.get_messages(
+                    session_id=session_id,
+                    before=archive_before,
+                    limit=limit + 1 - len(rows)
+                ))
+            
+            has_more = len(rows) > limit
+            
+            messages = []
+            for msg in rows[:limit]:
+                if msg.get("created_at"):
+                    msg["created_at"] = datetime.fromisoformat(msg["created_at"].replace("Z", "+00:00"))
+                messages.append(ChatMessage(**msg))
+            
+            next_cursor = messages[-1].id if has_more and messages else None
+            return messages, next_cursor
+        except Exception as e:
+            raise DatabaseOperationException(f"メッセージの取得中にエラーが発生しました: {str(e)}")
+
     async def create_chat_session(
         self, session_in: ChatSessionCreate, organization_id: int, user_id: Optional[int] = None
     ) -> ChatSession:
@@ -121,16 +273,7 @@ class ChatService:
             if not response.data:
                 raise DatabaseOperationException("チャットセッションの作成に失敗しました")
             
-            created_session = response.data[0]
-            
-            if created_session.get("created_at"):
-                created_session["created_at"] = datetime.fromisoformat(created_session["created_at"].replace("Z", "+00:00"))
-            if created_session.get("updated_at"):
-                created_session["updated_at"] = datetime.fromisoformat(created_session["updated_at"].replace("Z", "+00:00"))
-            
-            created_session["messages"] = []
-            
-            return ChatSession(**created_session)
+            return self._session_from_row(response.data[0])
         except Exception as e:
             raise DatabaseOperationException(f"チャットセッションの作成中にエラーが発生しました: {str(e)}")
 
@@ -186,6 +329,9 @@ class ChatService:
             
             if not response.data:
                 raise DatabaseOperationException("チャットセッションの削除に失敗しました")
+            
+            self.search_service.remove_session(existing_session.organization_id, session_id)
+            self.archive_service.delete_session(session_id)
         except ResourceNotFoundException as e:
             raise e
         except Exception as e:
@@ -225,39 +371,163 @@ class ChatService:
             if created_message.get("created_at"):
                 created_message["created_at"] = datetime.fromisoformat(created_message["created_at"].replace("Z", "+00:00"))
             
-            await self.update_chat_session(
+            # 一覧表示用の非正規化カラム（最新メッセージ・件数）もあわせて更新する
+            # 同時に追加されたメッセージで件数が欠けないよう、加算と比較はデータベース関数で行う
+            # （migrations/create_record_chat_message_function.sql）
+            self.supabase.rpc("record_chat_message", {
+                "p_session_id": session_id,
+                "p_message_id": created_message["id"],
+                "p_preview": message_in.content[:LAST_MESSAGE_PREVIEW_LENGTH],
+                "p_is_from_ai": message_in.is_from_ai,
+                "p_created_at": now.isoformat(),
+            }).execute()
+            
+            message = ChatMessage(**created_message)
+            self.search_service.index_message(
+                organization_id=organization_id,
+                message_id=message.id,
                 session_id=session_id,
-                session_in=ChatSessionUpdate()
+                content=message.content
             )
-            
-            return ChatMessage(**created_message)
+            return message
         except ResourceNotFoundException as e:
             raise e
         except Exception as e:
             raise DatabaseOperationException(f"メッセージの追加中にエラーが発生しました: {str(e)}")
 
-    async def get_ai_response(self, user_message: str, session_history: List[Dict[str, Any]]) -> str:
+    async def search_messages(
+        self, organization_id: int, query: str, limit: int = 20
+    ) -> List[Tuple[ChatMessage, float, str]]:
         """
-        ユーザーのメッセージに対するAI応答を生成します
+        組織内の全セッションのメッセージを全文検索します
+        n-gramインデックスで絞り込んだ候補の本文を取得し、語句が実際に含まれるものだけをスコア順に返します
+        
+        Returns:
+            (メッセージ, スコア, 抜粋)のタプルのリスト
         """
         try:
-            farming_responses = {
-                "こんにちは": "こんにちは！SmartFarm AIアシスタントです。農業に関するご質問があればお気軽にどうぞ。",
-                "天気": "現在の天気予報データにはアクセスできませんが、地域の気象情報を確認することをお勧めします。農作業の計画に役立ちます。",
-                "作物": "どのような作物についてお知りになりたいですか？栽培方法、病害虫対策、収穫時期など具体的にお聞かせください。",
-                "肥料": "適切な肥料選びは作物の成長に重要です。土壌検査を行い、作物に合った肥料を選ぶことをお勧めします。",
-                "病害虫": "病害虫の早期発見と対策が重要です。定期的な観察と予防的な対策を行いましょう。具体的な症状があれば教えてください。",
-                "水やり": "水やりは作物によって適切な量と頻度が異なります。過剰な水やりは根腐れの原因になるため注意が必要です。",
-                "収穫": "収穫のタイミングは作物の品質に大きく影響します。適切な収穫時期を見極めることが重要です。",
-                "土壌": "健康な土壌は農業の基本です。定期的な土壌検査と適切な管理を行いましょう。",
-                "有機栽培": "有機栽培は環境に優しく、安全な作物を生産できます。輪作や天敵の利用など総合的な管理が重要です。",
-                "スマート農業": "IoTセンサーやデータ分析を活用することで、効率的な農業経営が可能になります。具体的な導入方法についてご質問ください。"
-            }
+            parsed, candidates = await self.search_service.search(organization_id, query)
             
-            for keyword, response in farming_responses.items():
+            results = []
+            batch_size = max(limit * 2, 50)
+            for start in range(0, len(candidates), batch_size):
+                batch = candidates[start:start + batch_size]
+                response = self.supabase.table(self.messages_table).select(
+                    "*"
+                ).in_(
+                    "id", [candidate.message_id for candidate in batch]
+                ).execute()
+                
+                rows = {row["id"]: row for row in response.data}
+                
+                # データベースに無いものはアーカイブ済みのメッセージとして読み出す
+                archived_ids: Dict[int, List[int]] = {}
+                for candidate in batch:
+                    if candidate.message_id not in rows:
+                        archived_ids.setdefault(candidate.session_id, []).append(candidate.message_id)
+                for archived_session_id, message_ids in archived_ids.items():
+                    for row in self.archive_service.get_messages_by_ids(archived_session_id, message_ids):
+                        rows[row["id"]] = row
+                
+                for candidate in batch:
+                    row = rows.get(candidate.message_id)
+                    if not row or not matches_all_phrases(row["content"], parsed.phrases):
+                        continue
+                    
+                    if row.get("created_at"):
+                        row["created_at"] = datetime.fromisoformat(row["created_at"].replace("Z", "+00:00"))
+                    message = ChatMessage(**row)
+                    results.append((message, candidate.score, build_snippet(message.content, parsed.phrases)))
+                    if len(results) >= limit:
+                        return results
+            
+            return results
+        except Exception as e:
+            raise DatabaseOperationException(f"メッセージの検索中にエラーが発生しました: {str(e)}")
+
+    async def respond(
+        self, user_message: str, organization_id: int, session_history: List[Dict[str, Any]]
+    ) -> str:
+        """
+        ユーザーのメッセージに応答します
+        定型的な質問は営農データから直接回答し、次にツール呼び出しエージェント、
+        それでも回答できない場合はAI応答にフォールバックします
+        """
+        with metrics.chat_responses_in_progress.track_inprogress():
+            return await self._respond(user_message, organization_id, session_history)
+
+    async def _respond(
+        self, user_message: str, organization_id: int, session_history: List[Dict[str, Any]]
+    ) -> str:
+        intent_response = await self.intent_service.answer(
+            user_message=user_message,
+            organization_id=organization_id
+        )
+        if intent_response is not None:
+            return intent_response
+        
+        cache_key = (organization_id, FAQ_VERSION, normalize_question(user_message))
+        cached_response = response_cache.get(cache_key)
+        if cached_response is not MISSING:
+            return cached_response
+        
+        if settings.CHAT_AGENT_ENABLED and self.agent_service.enabled:
+            try:
+                agent_result = await self.agent_service.run(
+                    user_message=user_message,
+                    organization_id=organization_id,
+                    session_history=session_history
+                )
+            except Exception as e:
+                logger.warning("エージェントの実行に失敗しました: %s", e)
+                agent_result = None
+            
+            if agent_result is not None and agent_result.content:
+                # データを更新した応答は同じ質問でも再実行が必要なためキャッシュしない
+                if not agent_result.wrote_data:
+                    response_cache.set(cache_key, agent_result.content)
+                return agent_result.content
+        
+        context_records = await self.retrieval_service.search(
+            organization_id=organization_id,
+            query=user_message,
+            top_k=settings.CHAT_CONTEXT_TOP_K
+        )
+        
+        ai_response = await self.get_ai_response(
+            user_message=user_message,
+            session_history=session_history,
+            context_records=context_records
+        )
+        response_cache.set(cache_key, ai_response)
+        return ai_response
+
+    def get_response_cache_stats(self) -> Dict[str, Any]:
+        """
+        応答キャッシュの統計情報（ヒット率など）を返します
+        """
+        return response_cache.stats()
+
+    async def get_ai_response(
+        self,
+        user_message: str,
+        session_history: List[Dict[str, Any]],
+        context_records: Optional[List[RetrievedRecord]] = None
+    ) -> str:
+        """
+        ユーザーのメッセージに対するAI応答を生成します
+        context_recordsには質問に関連する営農データ（検索インデックスの上位件）を渡します
+        """
+        try:
+            for keyword, response in FARMING_RESPONSES.items():
                 if keyword in user_message:
                     return response
             
+            if context_records:
+                lines = ["登録されているデータの中から、関連しそうな情報を見つけました。"]
+                lines.extend(f"・{record.text}" for record in context_records)
+                return "\n".join(lines)
+            
             return "申し訳ありませんが、もう少し具体的に農業に関するご質問をいただけますか？作物の栽培方法、病害虫対策、肥料、水やりなどについてお答えできます。"
             
         except Exception as e:
@@ -2,15 +2,20 @@ import json
 from typing import List, Optional, Any, Dict, cast
 from datetime import datetime
 
+from app.core.events import publish_change
 from app.db.session import get_supabase_client
 from app.models.crop import Crop, WorkflowStep
 from app.schemas.crop import CropCreate, CropUpdate
+from app.services.service_cache import create_service_cache, id_tag, org_tag, organization_tags
 from app.utils.json_utils import parse_json_string, to_json_string
 
+# 作物の読み取りキャッシュ（書き込み時に組織・ID単位で破棄）
+crop_cache = create_service_cache("crops")
+
 
 class CropService:
-    def __init__(self):
-        self.supabase = get_supabase_client()
+    def __init__(self, supabase=None):
+        self.supabase = supabase or get_supabase_client()
         self.table = "crops"
 
     async def get_crops(
@@ -19,6 +24,13 @@ class CropService:
         """
         組織に属する全ての作物を取得します
         """
+        return await crop_cache.get_or_load(
+            ("list", organization_id, skip, limit),
+            lambda: self._fetch_crops(organization_id, skip, limit),
+            tags=[org_tag(organization_id)],
+        )
+
+    async def _fetch_crops(self, organization_id: int, skip: int, limit: int) -> List[Crop]:
         response = self.supabase.table(self.table).select("*").eq(
             "organization_id", organization_id
         ).range(skip, skip + limit - 1).execute()
@@ -28,8 +40,8 @@ class CropService:
             # workflowをJSON文字列からリストに変換（存在する場合）
             if item.get("workflow") and isinstance(item["workflow"], str):
                 workflow_data = parse_json_string(item["workflow"])
-                if workflow_data:
-                    item["workflow"] = self._convert_workflow_data_to_steps(workflow_data)
+                # 空のリスト・不正なJSONは文字列のまま残さない（モデルの検証に失敗するため）
+                item["workflow"] = self._convert_workflow_data_to_steps(workflow_data) if workflow_data else []
                 
             crops.append(Crop(**item))
         
@@ -39,6 +51,14 @@ class CropService:
         """
         特定のIDの作物を取得します
         """
+        return await crop_cache.get_or_load(
+            ("detail", crop_id),
+            lambda: self._fetch_crop(crop_id),
+            tags=[id_tag(crop_id)],
+            tags_for=organization_tags,
+        )
+
+    async def _fetch_crop(self, crop_id: Optional[int]) -> Optional[Crop]:
         response = self.supabase.table(self.table).select("*").eq(
             "id", crop_id
         ).limit(1).execute()
@@ -50,8 +70,8 @@ class CropService:
         # workflowをJSON文字列からリストに変換（存在する場合）
         if item.get("workflow") and isinstance(item["workflow"], str):
             workflow_data = parse_json_string(item["workflow"])
-            if workflow_data:
-                item["workflow"] = self._convert_workflow_data_to_steps(workflow_data)
+            # 空のリスト・不正なJSONは文字列のまま残さない（モデルの検証に失敗するため）
+            item["workflow"] = self._convert_workflow_data_to_steps(workflow_data) if workflow_data else []
         
         return Crop(**item)
 
@@ -84,11 +104,12 @@ class CropService:
         
         created_crop = response.data[0]
         
-        # workflowをセット（存在する場合）
-        if crop_in.workflow:
-            created_crop["workflow"] = crop_in.workflow
+        # workflowをセット（存在する場合。スキーマのWorkflowStepはモデルのWorkflowStepに変換する）
+        created_crop["workflow"] = self._convert_workflow_data_to_steps(workflow_data) if crop_in.workflow else []
         
-        return Crop(**created_crop)
+        crop = Crop(**created_crop)
+        publish_change(organization_id, "crops", crop.id, "created", crop.dict())
+        return crop
 
     async def update_crop(self, crop_id: int, crop_in: CropUpdate) -> Crop:
         """
@@ -125,10 +146,12 @@ class CropService:
         # workflowをJSON文字列からリストに変換（存在する場合）
         if updated_crop.get("workflow") and isinstance(updated_crop["workflow"], str):
             workflow_data = parse_json_string(updated_crop["workflow"])
-            if workflow_data:
-                updated_crop["workflow"] = self._convert_workflow_data_to_steps(workflow_data)
+            # 空のリスト・不正なJSONは文字列のまま残さない（モデルの検証に失敗するため）
+            updated_crop["workflow"] = self._convert_workflow_data_to_steps(workflow_data) if workflow_data else []
         
-        return Crop(**updated_crop)
+        crop = Crop(**updated_crop)
+        publish_change(crop.organization_id, "crops", crop.id, "updated", crop.dict())
+        return crop
 
     async def delete_crop(self, crop_id: int) -> bool:
         """
@@ -139,6 +162,7 @@ class CropService:
         if not response.data:
             return False
         
+        publish_change(response.data[0].get("organization_id"), "crops", crop_id, "deleted")
         return True
     
     def _convert_workflow_data_to_steps(self, workflow_data: List[dict]) -> List[WorkflowStep]:
@@ -0,0 +1,67 @@
+from datetime import date
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.db.session import get_supabase_client
+from app.exceptions.service_exceptions import DatabaseOperationException
+
+# 集計に使う状態・種別（データベース関数には引数で渡す）
+COMPLETED_TASK_STATUS = "completed"
+ACTIVE_PLAN_STATUS = "進行中"
+CONSUMABLE_RESOURCE_TYPE = "資材"
+
+
+class DashboardService:
+    """
+    ホーム画面の集計を返します
+
+    作業・作付け計画・資材・圃場の件数や面積は、データベース関数 dashboard_summary
+    （migrations/create_dashboard_summary_function.sql）で集計し、一覧を取得せずに1回のラウンドトリップで求めます
+    """
+
+    function = "dashboard_summary"
+
+    def __init__(self, supabase=None):
+        self.supabase = supabase or get_supabase_client()
+
+    async def get_summary(self, organization_id: int, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        組織の集計を取得します
+
+        Args:
+            organization_id: 組織ID
+            today: 期限の判定に使う日付（省略時は今日）
+
+        Returns:
+            今日が期限・期限切れの未完了の作業数、状態ごとの作業数・作付け計画数、在庫の少ない資材数、
+            進行中の作付け計画の面積（m²）、圃場数・圃場の総面積（ha）
+        """
+        today = today or date.today()
+        try:
+            response = self.supabase.rpc(self.function, {
+                "p_organization_id": organization_id,
+                "p_today": today.isoformat(),
+                "p_completed_task_status": COMPLETED_TASK_STATUS,
+                "p_active_plan_status": ACTIVE_PLAN_STATUS,
+                "p_consumable_resource_type": CONSUMABLE_RESOURCE_TYPE,
+                "p_low_stock_threshold": settings.DASHBOARD_LOW_STOCK_THRESHOLD,
+            }).execute()
+        except Exception as e:
+            raise DatabaseOperationException(f"集計の取得中にエラーが発生しました: {str(e)}")
+
+        summary = response.data or {}
+        # PostgRESTはスカラーを返す関数の結果をそのまま返すが、配列で返す場合もある
+        if isinstance(summary, list):
+            summary = summary[0] if summary else {}
+        return {
+            "date": today,
+            "tasks_due_today": summary.get("tasks_due_today", 0),
+            "tasks_overdue": summary.get("tasks_overdue", 0),
+            "tasks_by_status": summary.get("tasks_by_status") or {},
+            "plans_by_status": summary.get("plans_by_status") or {},
+            "low_stock_resources": summary.get("low_stock_resources", 0),
+            "low_stock_threshold": settings.DASHBOARD_LOW_STOCK_THRESHOLD,
+            "cultivated_area": summary.get("cultivated_area") or 0.0,
+            "field_count": summary.get("field_count", 0),
+            "total_field_area": summary.get("total_field_area") or 0.0,
+        }
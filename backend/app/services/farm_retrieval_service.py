@@ -0,0 +1,370 @@
+import heapq
+import math
+import threading
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core import events
+from app.db.session import get_supabase_client
+from app.utils.async_utils import run_in_thread
+from app.utils.json_utils import parse_json_string
+from app.utils.text_utils import char_ngrams
+
+
+@dataclass
+class RetrievedRecord:
+    """検索でヒットした営農データ"""
+    entity: str
+    entity_id: int
+    text: str
+    score: float
+
+
+def _join(*parts: Optional[str]) -> str:
+    return " ".join(part for part in parts if part)
+
+
+def _describe_field(record: Dict[str, Any]) -> str:
+    tags = record.get("tags")
+    if isinstance(tags, str):
+        tags = parse_json_string(tags)
+    return _join(
+        f"圃場「{record.get('name')}」",
+        f"面積 {record['area']}ha" if record.get("area") not in (None, "") else None,
+        f"土壌 {record['soil_type']}" if record.get("soil_type") else None,
+        f"作物 {record['crop_type']}" if record.get("crop_type") else None,
+        f"タグ {'、'.join(tags)}" if tags else None,
+        f"メモ {record['notes']}" if record.get("notes") else None,
+    )
+
+
+def _workflow_step_names(workflow: Any) -> List[str]:
+    if isinstance(workflow, str):
+        workflow = parse_json_string(workflow)
+    names: List[str] = []
+    for step in workflow or []:
+        if isinstance(step, str):
+            names.append(step)
+        elif isinstance(step, dict):
+            names.append(step.get("name", ""))
+            names.extend(_workflow_step_names(step.get("sub_steps")))
+    return [name for name in names if name]
+
+
+def _describe_crop(record: Dict[str, Any]) -> str:
+    steps = _workflow_step_names(record.get("workflow"))
+    return _join(
+        f"作物「{record.get('name')}」",
+        f"分類 {record['category']}" if record.get("category") else None,
+        f"作業 {'→'.join(steps)}" if steps else None,
+        f"メモ {record['notes']}" if record.get("notes") else None,
+    )
+
+
+def _describe_planting_plan(record: Dict[str, Any]) -> str:
+    return _join(
+        f"作付け計画「{record.get('plan_name')}」",
+        f"シーズン {record['season']}" if record.get("season") else None,
+        f"定植日 {record['planting_date']}" if record.get("planting_date") else None,
+        f"収穫日 {record['harvest_date']}" if record.get("harvest_date") else None,
+        f"状態 {record['status']}" if record.get("status") else None,
+        f"メモ {record['notes']}" if record.get("notes") else None,
+    )
+
+
+def _describe_task(record: Dict[str, Any]) -> str:
+    scheduled_date = record.get("scheduled_date")
+    return _join(
+        f"作業「{record.get('task_type')}」",
+        f"予定日 {str(scheduled_date)[:10]}" if scheduled_date else None,
+        f"圃場 {record['field_name']}" if record.get("field_name") else None,
+        f"状態 {record['status']}" if record.get("status") else None,
+        f"担当 {record['assigned_to']}" if record.get("assigned_to") else None,
+        f"メモ {record['notes']}" if record.get("notes") else None,
+    )
+
+
+def _describe_resource(record: Dict[str, Any]) -> str:
+    quantity = record.get("quantity")
+    return _join(
+        f"資材・農機「{record.get('name')}」",
+        f"種別 {record['resource_type']}" if record.get("resource_type") else None,
+        f"数量 {quantity:g}{record.get('unit') or ''}" if isinstance(quantity, (int, float)) else None,
+        f"状態 {record['status']}" if record.get("status") else None,
+        f"保管場所 {record['location']}" if record.get("location") else None,
+        f"メモ {record['notes']}" if record.get("notes") else None,
+    )
+
+
+# エンティティ名（テーブル名）と文章化関数の対応
+DESCRIBERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "fields": _describe_field,
+    "crops": _describe_crop,
+    "planting_plans": _describe_planting_plan,
+    "tasks": _describe_task,
+    "resources": _describe_resource,
+}
+
+
+class FarmRetrievalIndex:
+    """
+    1組織分の営農データに対する文字bigramのBM25インデックス
+    転置リストは配列（array）で保持し、追加・削除をインクリメンタルに反映します
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset_locked()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _reset_locked(self) -> None:
+        self._keys: List[Tuple[str, int]] = []  # slot -> (entity, id)
+        self._texts: List[str] = []  # slot -> 文章
+        self._lengths = array("I")  # slot -> n-gram数
+        self._alive = bytearray()  # slot -> 有効フラグ
+        self._slots: Dict[Tuple[str, int], int] = {}  # (entity, id) -> slot
+        self._postings: Dict[str, Tuple[array, array]] = {}  # n-gram -> (slot配列, 出現回数配列)
+        self._total_length = 0
+        self._dead = 0
+
+    def upsert(self, entity: str, entity_id: int, text: str) -> None:
+        """
+        ドキュメントを追加または置き換えます
+        """
+        with self._lock:
+            self._remove_locked(entity, entity_id)
+            self._add_locked(entity, entity_id, text)
+            self._maybe_compact_locked()
+
+    def remove(self, entity: str, entity_id: int) -> None:
+        """
+        ドキュメントを削除します
+        """
+        with self._lock:
+            self._remove_locked(entity, entity_id)
+            self._maybe_compact_locked()
+
+    def search(self, query: str, top_k: int = 5) -> List[RetrievedRecord]:
+        """
+        クエリとの関連度が高い順にドキュメントを返します
+        """
+        query_terms = Counter(char_ngrams(query))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            doc_count = len(self._slots)
+            if doc_count == 0:
+                return []
+
+            postings = [
+                (self._postings[term], query_tf)
+                for term, query_tf in query_terms.items()
+                if term in self._postings
+            ]
+            # 半数以上のドキュメントに出現するn-gramは識別力が低いため、他に手掛かりがあれば無視する
+            selective = [item for item in postings if len(item[0][0]) * 2 <= doc_count]
+            if selective:
+                postings = selective
+
+            avg_length = self._total_length / doc_count
+            k1, b = self.K1, self.B
+            alive = self._alive
+            lengths = self._lengths
+            scores: Dict[int, float] = {}
+            for (slots, frequencies), query_tf in postings:
+                df = min(len(slots), doc_count)  # 削除済みスロットを含むため上限を揃える
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                weight = query_tf * idf * (k1 + 1)
+                for slot, tf in zip(slots, frequencies):
+                    if not alive[slot]:
+                        continue
+                    norm = k1 * (1 - b + b * lengths[slot] / avg_length)
+                    scores[slot] = scores.get(slot, 0.0) + weight * tf / (tf + norm)
+
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            return [
+                RetrievedRecord(
+                    entity=self._keys[slot][0],
+                    entity_id=self._keys[slot][1],
+                    text=self._texts[slot],
+                    score=score,
+                )
+                for slot, score in best
+            ]
+
+    def _add_locked(self, entity: str, entity_id: int, text: str) -> None:
+        grams = Counter(char_ngrams(text))
+        slot = len(self._keys)
+        self._keys.append((entity, entity_id))
+        self._texts.append(text)
+        length = sum(grams.values())
+        self._lengths.append(length)
+        self._alive.append(1)
+        self._slots[(entity, entity_id)] = slot
+        self._total_length += length
+
+        for gram, tf in grams.items():
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = (array("I"), array("H"))
+                self._postings[gram] = posting
+            posting[0].append(slot)
+            posting[1].append(min(tf, 0xFFFF))
+
+    def _remove_locked(self, entity: str, entity_id: int) -> None:
+        slot = self._slots.pop((entity, entity_id), None)
+        if slot is None:
+            return
+        self._alive[slot] = 0
+        self._texts[slot] = ""
+        self._total_length -= self._lengths[slot]
+        self._dead += 1
+
+    def _maybe_compact_locked(self) -> None:
+        if self._dead > 64 and self._dead > len(self._slots):
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        """
+        削除済みのスロットを取り除いて転置リストを再構築します
+        """
+        documents = [
+            (self._keys[slot][0], self._keys[slot][1], self._texts[slot])
+            for slot in sorted(self._slots.values())
+        ]
+        self._reset_locked()
+        for entity, entity_id, text in documents:
+            self._add_locked(entity, entity_id, text)
+
+
+class FarmRetrievalService:
+    """
+    組織ごとの営農データ検索インデックスを管理します
+    インデックスは初回検索時にデータベースから構築し、以降はサービス層の書き込みイベントで更新します
+    構築中に届いた変更イベントは保留し、構築後に適用してから公開します（読み取り済みのページの変更を取りこぼさないため）
+    """
+
+    _indexes: Dict[int, FarmRetrievalIndex] = {}
+    _pending: Dict[int, List[events.DataChangeEvent]] = {}  # 構築中の組織ID -> 構築中に届いた変更イベント
+    _build_lock = threading.Lock()
+    _state_lock = threading.Lock()  # _indexes・_pendingの更新とイベントの振り分けを排他する
+    _page_size = 1000
+
+    def __init__(self, supabase=None):
+        self._supabase = supabase
+
+    @property
+    def supabase(self):
+        if self._supabase is None:
+            self._supabase = get_supabase_client()
+        return self._supabase
+
+    async def search(self, organization_id: int, query: str, top_k: int = 5) -> List[RetrievedRecord]:
+        """
+        メッセージに関連する営農データを上位top_k件取得します
+        """
+        index = self._indexes.get(organization_id)
+        if index is None:
+            # 初回の構築はテーブルのページングを含むため、イベントループを止めないようワーカースレッドで行う
+            index = await run_in_thread(self._load_index, organization_id)
+        return index.search(query, top_k=top_k)
+
+    async def _load_index(self, organization_id: int) -> FarmRetrievalIndex:
+        return self.get_index(organization_id)
+
+    def get_index(self, organization_id: int) -> FarmRetrievalIndex:
+        """
+        組織のインデックスを取得します（未構築の場合はデータベースから構築）
+        """
+        index = self._indexes.get(organization_id)
+        if index is not None:
+            return index
+
+        with self._build_lock:
+            index = self._indexes.get(organization_id)
+            if index is not None:
+                return index
+
+            with self._state_lock:
+                self._pending[organization_id] = []
+            try:
+                index = self._build_index(organization_id)
+            except BaseException:
+                with self._state_lock:
+                    self._pending.pop(organization_id, None)
+                raise
+
+            with self._state_lock:
+                for event in self._pending.pop(organization_id, []):
+                    self._apply(index, event)
+                self._indexes[organization_id] = index
+            return index
+
+    @classmethod
+    def reset(cls, organization_id: Optional[int] = None) -> None:
+        """
+        インデックスを破棄します（次回検索時に再構築されます）
+        """
+        with cls._state_lock:
+            if organization_id is None:
+                cls._indexes.clear()
+            else:
+                cls._indexes.pop(organization_id, None)
+
+    def _build_index(self, organization_id: int) -> FarmRetrievalIndex:
+        index = FarmRetrievalIndex()
+        for entity, describe in DESCRIBERS.items():
+            start = 0
+            while True:
+                response = self.supabase.table(entity).select("*").eq(
+                    "organization_id", organization_id
+                ).order("id").range(start, start + self._page_size - 1).execute()
+
+                for record in response.data:
+                    index.upsert(entity, record["id"], describe(record))
+
+                if len(response.data) < self._page_size:
+                    break
+                start += self._page_size
+        return index
+
+    @classmethod
+    def handle_change(cls, event: events.DataChangeEvent) -> None:
+        """
+        サービス層のデータ変更をインデックスに反映します
+        """
+        if event.entity not in DESCRIBERS or event.entity_id is None:
+            return
+
+        with cls._state_lock:
+            if event.organization_id is None:
+                targets = list(cls._indexes.values())
+                pending = list(cls._pending.values())
+            else:
+                index = cls._indexes.get(event.organization_id)
+                targets = [index] if index is not None else []
+                pending = [cls._pending[event.organization_id]] if event.organization_id in cls._pending else []
+            # 構築中のインデックスには構築後に適用する
+            for queue in pending:
+                queue.append(event)
+
+        for index in targets:
+            cls._apply(index, event)
+
+    @staticmethod
+    def _apply(index: FarmRetrievalIndex, event: events.DataChangeEvent) -> None:
+        if event.action == "deleted" or event.record is None:
+            index.remove(event.entity, event.entity_id)
+        else:
+            index.upsert(event.entity, event.entity_id, DESCRIBERS[event.entity](event.record))
+
+
+events.subscribe(FarmRetrievalService.handle_change)
@@ -2,15 +2,20 @@ import json
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
+from app.core.events import publish_change
 from app.db.session import get_supabase_client
 from app.models.field import Field
 from app.schemas.field import FieldCreate, FieldUpdate, GeoCoordinate
+from app.services.service_cache import create_service_cache, id_tag, org_tag, organization_tags
 from app.utils.json_utils import parse_json_string, to_json_string
 
+# 圃場の読み取りキャッシュ（書き込み時に組織・ID単位で破棄）
+field_cache = create_service_cache("fields")
+
 
 class FieldService:
-    def __init__(self):
-        self.supabase = get_supabase_client()
+    def __init__(self, supabase=None):
+        self.supabase = supabase or get_supabase_client()
         self.table = "fields"
 
     async def get_fields(
@@ -19,6 +24,13 @@ class FieldService:
         """
         組織に属する全ての圃場を取得します
         """
+        return await field_cache.get_or_load(
+            ("list", organization_id, skip, limit),
+            lambda: self._fetch_fields(organization_id, skip, limit),
+            tags=[org_tag(organization_id)],
+        )
+
+    async def _fetch_fields(self, organization_id: int, skip: int, limit: int) -> List[Field]:
         response = self.supabase.table(self.table).select("*").eq(
             "organization_id", organization_id
         ).range(skip, skip + limit - 1).execute()
@@ -40,6 +52,14 @@ class FieldService:
         """
         特定のIDの圃場を取得します
         """
+        return await field_cache.get_or_load(
+            ("detail", field_id),
+            lambda: self._fetch_field(field_id),
+            tags=[id_tag(field_id)],
+            tags_for=organization_tags,
+        )
+
+    async def _fetch_field(self, field_id: int) -> Optional[Field]:
         response = self.supabase.table(self.table).select("*").eq(
             "id", field_id
         ).limit(1).execute()
@@ -98,7 +118,9 @@ class FieldService:
         if field_in.tags:
             created_field["tags"] = field_in.tags
         
-        return Field(**created_field)
+        field = Field(**created_field)
+        publish_change(organization_id, "fields", field.id, "created", field.dict())
+        return field
 
     async def update_field(self, field_id: int, field_in: FieldUpdate) -> Field:
         """
@@ -147,10 +169,17 @@ class FieldService:
         if updated_field.get("tags") and isinstance(updated_field["tags"], str):
             updated_field["tags"] = parse_json_string(updated_field["tags"])
         
-        return Field(**updated_field)
+        field = Field(**updated_field)
+        publish_change(field.organization_id, "fields", field.id, "updated", field.dict())
+        return field
 
     async def delete_field(self, field_id: int) -> None:
         """
         圃場を削除します
         """
-        self.supabase.table(self.table).delete().eq("id", field_id).execute()
+        response = self.supabase.table(self.table).delete().eq("id", field_id).execute()
+        
+        # 該当する圃場がなければ変更はないため通知しない（組織なしの通知は全組織のキャッシュを破棄してしまう）
+        if not response.data:
+            return
+        publish_change(response.data[0].get("organization_id"), "fields", field_id, "deleted")
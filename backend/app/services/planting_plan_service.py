@@ -2,13 +2,18 @@ import json
 from typing import List, Optional, Dict, Any, cast, Tuple
 from datetime import datetime, date, timedelta
 
+from app.core import metrics
+from app.core.events import publish_change
 from app.db.session import get_supabase_client
 from app.models.planting_plan import PlantingPlan, PlantingPlanField, WorkflowInstance
 from app.models.crop import WorkflowStep
 from app.schemas.planting_plan import PlantingPlanCreate, PlantingPlanUpdate
 from app.services.crop_service import CropService
+from app.utils.async_utils import run_in_thread
 from app.utils.date_utils import convert_iso_to_date
 from app.utils.json_utils import parse_json_string, to_json_string
+from app.utils.singleflight import SingleFlight
+from app.utils.text_utils import escape_like
 from app.exceptions.service_exceptions import (
     DatabaseOperationException,
     ResourceNotFoundException,
@@ -16,82 +21,66 @@ from app.exceptions.service_exceptions import (
     WorkflowException
 )
 
+# 同じ組織・範囲の作付け計画一覧の同時取得をまとめる（朝のカレンダー表示などの集中対策）
+plan_list_flights = SingleFlight()
+metrics.register_cache("planting_plans_singleflight", plan_list_flights)
+
 
 class PlantingPlanService:
-    def __init__(self, crop_service: Optional[CropService] = None):
-        self.supabase = get_supabase_client()
+    def __init__(self, crop_service: Optional[CropService] = None, supabase=None):
+        self.supabase = supabase or get_supabase_client()
         self.plan_table = "planting_plans"
         self.field_table = "planting_plan_fields"
         self.workflow_table = "workflow_instances"
-        self.crop_service = crop_service or CropService()
+        self.crop_service = crop_service or CropService(supabase=self.supabase)
 
     async def get_planting_plans(
         self, organization_id: int, skip: int = 0, limit: int = 100
     ) -> List[PlantingPlan]:
         """
         組織に属する全ての作付け計画を取得します
+        同じ条件の取得が実行中であれば、その結果を共有します
         """
+        # DBアクセスをスレッドで行い、待っている間に届いた同じ条件のリクエストを合流させる
+        return await plan_list_flights.do(
+            (organization_id, skip, limit),
+            lambda: run_in_thread(self._fetch_planting_plans, organization_id, skip, limit),
+        )
+
+    async def _fetch_planting_plans(self, organization_id: int, skip: int, limit: int) -> List[PlantingPlan]:
         response = self.supabase.table(self.plan_table).select("*").eq(
             "organization_id", organization_id
         ).range(skip, skip + limit - 1).execute()
         
-        plans = []
-        for plan_data in response.data:
-            plan = PlantingPlan(**plan_data)
-            
-            # 関連する圃場情報を取得
-            fields_response = self.supabase.table(self.field_table).select("*").eq(
-                "planting_plan_id", plan.id
-            ).order("sequence").execute()
-            
-            plan.fields = [PlantingPlanField(**field_data) for field_data in fields_response.data]
-            
-            # 関連する作業インスタンスを取得
-            workflow_response = self.supabase.table(self.workflow_table).select("*").eq(
-                "planting_plan_id", plan.id
-            ).execute()
-            
-            plan.workflow_instances = []
-            for instance_data in workflow_response.data:
-                # 日付型に変換
-                if instance_data.get("planned_date"):
-                    instance_data["planned_date"] = convert_iso_to_date(instance_data["planned_date"])
-                if instance_data.get("actual_date"):
-                    instance_data["actual_date"] = convert_iso_to_date(instance_data["actual_date"])
-                
-                plan.workflow_instances.append(WorkflowInstance(**instance_data))
-            
-            plans.append(plan)
-        
+        plans = [PlantingPlan(**plan_data) for plan_data in response.data]
+        self._attach_fields_and_workflow_instances(plans)
         return plans
 
-    async def get_planting_plan(self, plan_id: Optional[int]) -> Optional[PlantingPlan]:
+    def _attach_fields_and_workflow_instances(self, plans: List[PlantingPlan]) -> None:
         """
-        特定のIDの作付け計画を取得します
+        作付け計画に関連する圃場情報と作業インスタンスを設定します
+        計画の件数に関わらず、圃場情報・作業インスタンスそれぞれ1回のクエリでまとめて取得します
         """
-        response = self.supabase.table(self.plan_table).select("*").eq(
-            "id", plan_id
-        ).limit(1).execute()
-        
-        if not response.data:
-            return None
+        if not plans:
+            return
         
-        plan_data = response.data[0]
-        plan = PlantingPlan(**plan_data)
+        plan_ids = [plan.id for plan in plans]
+        fields_by_plan: Dict[int, List[PlantingPlanField]] = {plan_id: [] for plan_id in plan_ids}
+        instances_by_plan: Dict[int, List[WorkflowInstance]] = {plan_id: [] for plan_id in plan_ids}
         
         # 関連する圃場情報を取得
-        fields_response = self.supabase.table(self.field_table).select("*").eq(
-            "planting_plan_id", plan.id
+        fields_response = self.supabase.table(self.field_table).select("*").in_(
+            "planting_plan_id", plan_ids
         ).order("sequence").execute()
         
-        plan.fields = [PlantingPlanField(**field_data) for field_data in fields_response.data]
+        for field_data in fields_response.data:
+            fields_by_plan[field_data["planting_plan_id"]].append(PlantingPlanField(**field_data))
         
         # 関連する作業インスタンスを取得
-        workflow_response = self.supabase.table(self.workflow_table).select("*").eq(
-            "planting_plan_id", plan.id
+        workflow_response = self.supabase.table(self.workflow_table).select("*").in_(
+            "planting_plan_id", plan_ids
         ).execute()
         
-        plan.workflow_instances = []
         for instance_data in workflow_response.data:
             # 日付型に変換
             if instance_data.get("planned_date"):
@@ -99,8 +88,65 @@ class PlantingPlanService:
             if instance_data.get("actual_date"):
                 instance_data["actual_date"] = convert_iso_to_date(instance_data["actual_date"])
             
-            plan.workflow_instances.append(WorkflowInstance(**instance_data))
+            instances_by_plan[instance_data["planting_plan_id"]].append(WorkflowInstance(**instance_data))
+        
+        for plan in plans:
+            plan.fields = fields_by_plan[plan.id]
+            plan.workflow_instances = instances_by_plan[plan.id]
+
+    async def find_planting_plans_by_crop_name(
+        self, organization_id: int, crop_name: str, limit: int = 20
+    ) -> List[Tuple[str, PlantingPlan]]:
+        """
+        作物名で作付け計画を検索します（圃場情報・作業インスタンスは含みません）
         
+        Args:
+            organization_id: 組織ID
+            crop_name: 作物名（部分一致）
+            limit: 取得する最大件数
+            
+        Returns:
+            (作物名, 作付け計画)のタプルのリスト（定植日順）
+        """
+        try:
+            crops_response = self.supabase.table("crops").select("id, name").eq(
+                "organization_id", organization_id
+            ).ilike("name", f"%{escape_like(crop_name)}%").execute()
+            
+            if not crops_response.data:
+                return []
+            
+            crop_names = {crop["id"]: crop["name"] for crop in crops_response.data}
+            
+            response = self.supabase.table(self.plan_table).select("*").eq(
+                "organization_id", organization_id
+            ).in_(
+                "crop_id", list(crop_names.keys())
+            ).order("planting_date").limit(limit).execute()
+            
+            return [
+                (crop_names.get(plan_data["crop_id"], crop_name), PlantingPlan(**plan_data))
+                for plan_data in response.data
+            ]
+        except Exception as e:
+            raise DatabaseOperationException(
+                f"作付け計画の検索中にエラーが発生しました: {str(e)}",
+                {"crop_name": crop_name, "error": str(e)}
+            )
+
+    async def get_planting_plan(self, plan_id: Optional[int]) -> Optional[PlantingPlan]:
+        """
+        特定のIDの作付け計画を取得します
+        """
+        response = self.supabase.table(self.plan_table).select("*").eq(
+            "id", plan_id
+        ).limit(1).execute()
+        
+        if not response.data:
+            return None
+        
+        plan = PlantingPlan(**response.data[0])
+        self._attach_fields_and_workflow_instances([plan])
         return plan
 
     async def create_planting_plan(
@@ -192,7 +238,9 @@ class PlantingPlanService:
                 pass
             
             # 作成した作付け計画を完全な形で取得して返す
-            return await self.get_planting_plan(created_plan.id)
+            plan = await self.get_planting_plan(created_plan.id)
+            publish_change(organization_id, "planting_plans", created_plan.id, "created", plan.dict() if plan else None)
+            return plan
         except (ResourceNotFoundException, ValidationException) as e:
             raise
         except Exception as e:
@@ -265,7 +313,9 @@ class PlantingPlanService:
                 )
             
             # 更新後の作付け計画を取得して返す
-            return await self.get_planting_plan(plan_id)
+            plan = await self.get_planting_plan(plan_id)
+            publish_change(existing_plan.organization_id, "planting_plans", plan_id, "updated", plan.dict() if plan else None)
+            return plan
         except (ResourceNotFoundException, ValidationException) as e:
             raise
         except Exception as e:
@@ -311,6 +361,7 @@ class PlantingPlanService:
                     {"plan_id": plan_id}
                 )
             
+            publish_change(existing_plan.organization_id, "planting_plans", plan_id, "deleted")
             return True
         except (ResourceNotFoundException, ValidationException) as e:
             raise
@@ -380,7 +431,15 @@ class PlantingPlanService:
             if instance_data.get("actual_date"):
                 instance_data["actual_date"] = convert_iso_to_date(instance_data["actual_date"])
             
-            return WorkflowInstance(**instance_data)
+            instance = WorkflowInstance(**instance_data)
+            
+            # 作業インスタンスは組織IDを持たないため、作付け計画から求めて通知する
+            plan_response = self.supabase.table(self.plan_table).select("organization_id").eq(
+                "id", instance.planting_plan_id
+            ).limit(1).execute()
+            organization_id = plan_response.data[0]["organization_id"] if plan_response.data else None
+            publish_change(organization_id, "workflow_instances", instance.id, "updated", instance.dict())
+            return instance
         except (ResourceNotFoundException, ValidationException) as e:
             raise
         except Exception as e:
@@ -2,15 +2,21 @@ from typing import List, Optional
 from datetime import datetime
 import json
 
+from app.core.events import publish_change
 from app.db.session import get_supabase_client
 from app.models.resource import Resource
 from app.schemas.resource import ResourceCreate, ResourceUpdate
+from app.services.service_cache import create_service_cache, id_tag, org_tag, organization_tags
+from app.utils.text_utils import escape_like
 from app.exceptions.service_exceptions import (
     DatabaseOperationException,
     ResourceNotFoundException,
     ValidationException
 )
 
+# 資材・農機の読み取りキャッシュ（書き込み時に組織・ID単位で破棄）
+resource_cache = create_service_cache("resources")
+
 
 class ResourceService:
     def __init__(self, supabase=None):
@@ -23,6 +29,13 @@ class ResourceService:
         """
         組織に属する全ての資材・農機を取得します
         """
+        return await resource_cache.get_or_load(
+            ("list", organization_id, skip, limit),
+            lambda: self._fetch_resources(organization_id, skip, limit),
+            tags=[org_tag(organization_id)],
+        )
+
+    async def _fetch_resources(self, organization_id: int, skip: int, limit: int) -> List[Resource]:
         try:
             response = self.supabase.table(self.table).select(
                 "*"
@@ -50,10 +63,48 @@ class ResourceService:
         except Exception as e:
             raise DatabaseOperationException(f"資材・農機の取得中にエラーが発生しました: {str(e)}")
 
+    async def find_resources_by_name(
+        self, organization_id: int, keyword: str, limit: int = 10
+    ) -> List[Resource]:
+        """
+        名前に指定キーワードを含む資材・農機を取得します
+        """
+        try:
+            response = self.supabase.table(self.table).select(
+                "*"
+            ).eq(
+                "organization_id", organization_id
+            ).ilike(
+                "name", f"%{escape_like(keyword)}%"
+            ).order(
+                "name", desc=False
+            ).limit(limit).execute()
+            
+            resources = []
+            for item in response.data:
+                if item.get("created_at"):
+                    item["created_at"] = datetime.fromisoformat(item["created_at"].replace("Z", "+00:00"))
+                if item.get("updated_at"):
+                    item["updated_at"] = datetime.fromisoformat(item["updated_at"].replace("Z", "+00:00"))
+                
+                resources.append(Resource(**item))
+            
+            return resources
+        except Exception as e:
+            raise DatabaseOperationException(f"資材・農機の取得中にエラーが発生しました: {str(e)}")
+
     async def get_resource(self, resource_id: int) -> Optional[Resource]:
         """
         特定の資材・農機を取得します
         """
+        return await resource_cache.get_or_load(
+            ("detail", resource_id),
+            lambda: self._fetch_resource(resource_id),
+            tags=[id_tag(resource_id)],
+            tags_for=organization_tags,
+        )
+
+    async def _fetch_resource(self, resource_id: int) -> Optional[Resource]:
         try:
             response = self.supabase.table(self.table).select(
                 "*"
@@ -117,7 +168,9 @@ class ResourceService:
             if created_resource.get("updated_at"):
                 created_resource["updated_at"] = datetime.fromisoformat(created_resource["updated_at"].replace("Z", "+00:00"))
             
-            return Resource(**created_resource)
+            resource = Resource(**created_resource)
+            publish_change(organization_id, "resources", resource.id, "created", resource.dict())
+            return resource
         except Exception as e:
             raise DatabaseOperationException(f"資材・農機の作成中にエラーが発生しました: {str(e)}")
 
@@ -172,7 +225,9 @@ class ResourceService:
             if updated_resource.get("updated_at"):
                 updated_resource["updated_at"] = datetime.fromisoformat(updated_resource["updated_at"].replace("Z", "+00:00"))
             
-            return Resource(**updated_resource)
+            resource = Resource(**updated_resource)
+            publish_change(resource.organization_id, "resources", resource.id, "updated", resource.dict())
+            return resource
         except ResourceNotFoundException as e:
             raise e
         except Exception as e:
@@ -193,6 +248,8 @@ class ResourceService:
             
             if not response.data:
                 raise DatabaseOperationException("資材・農機の削除に失敗しました")
+            
+            publish_change(existing_resource.organization_id, "resources", resource_id, "deleted")
         except ResourceNotFoundException as e:
             raise e
         except Exception as e:
@@ -0,0 +1,63 @@
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from app.core import events, metrics
+from app.core.config import settings
+from app.utils.cache_utils import ReadThroughCache
+
+# エンティティ名 -> 読み取りキャッシュ
+_caches: Dict[str, ReadThroughCache] = {}
+
+
+def org_tag(organization_id: Optional[int]) -> Tuple[str, Optional[int]]:
+    """組織の一覧系の結果に付けるタグ"""
+    return ("org", organization_id)
+
+
+def id_tag(entity_id: Optional[int]) -> Tuple[str, Optional[int]]:
+    """1件の取得結果に付けるタグ"""
+    return ("id", entity_id)
+
+
+def organization_tags(value: Any) -> Iterable[Hashable]:
+    """
+    取得したモデルの組織IDをタグにします（IDだけで取得する詳細系の結果を組織単位でも破棄するため）
+    """
+    organization_id = getattr(value, "organization_id", None)
+    return [org_tag(organization_id)] if organization_id is not None else []
+
+
+def create_service_cache(entity: str) -> ReadThroughCache:
+    """
+    エンティティの読み取りキャッシュを作成します
+
+    同じエンティティのデータ変更イベントで、変更された組織の一覧と変更されたIDの詳細を破棄します
+    （他のワーカーでの変更はTTLで反映されます）
+    """
+    cache = ReadThroughCache(
+        maxsize=settings.SERVICE_CACHE_SIZE,
+        fresh_ttl=settings.SERVICE_CACHE_TTL_SECONDS,
+        stale_ttl=settings.SERVICE_CACHE_STALE_SECONDS,
+        enabled=settings.SERVICE_CACHE_ENABLED,
+    )
+
+    def invalidate(event: events.DataChangeEvent) -> None:
+        if event.entity != entity:
+            return
+        if event.organization_id is None:
+            cache.clear()
+        else:
+            cache.invalidate_tags(org_tag(event.organization_id), id_tag(event.entity_id))
+
+    invalidate.__name__ = f"invalidate_{entity}_cache"
+    events.subscribe(invalidate)
+    metrics.register_cache(f"{entity}_read", cache)
+    _caches[entity] = cache
+    return cache
+
+
+def clear_service_caches() -> None:
+    """
+    全ての読み取りキャッシュを破棄します（イベントを経由せずにデータを入れ替えた場合に使います）
+    """
+    for cache in _caches.values():
+        cache.clear()
@@ -0,0 +1,245 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core import events
+from app.core.config import settings
+from app.db.session import get_supabase_client
+from app.exceptions.service_exceptions import DatabaseOperationException, ValidationException
+from app.utils.json_utils import parse_json_string
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_field(row: Dict[str, Any]) -> Dict[str, Any]:
+    # 座標・タグはJSON文字列で保存されているため、一覧APIと同じくリストに変換する
+    if isinstance(row.get("coordinates"), str):
+        row["coordinates"] = parse_json_string(row["coordinates"])
+    if isinstance(row.get("tags"), str):
+        row["tags"] = parse_json_string(row["tags"])
+    return row
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+# 差分同期の対象（エンティティ名 -> 取得した行の変換処理）
+SYNC_ENTITIES: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "fields": _parse_field,
+    "tasks": lambda row: row,
+    "planting_plans": lambda row: row,
+    "workflow_instances": lambda row: row,
+    "resources": lambda row: row,
+}
+
+
+class SyncService:
+    """
+    change_logテーブルを使ってオフライン端末向けの差分を返します
+
+    サービス層の書き込みで発生したデータ変更イベントをchange_logに記録し、
+    同期トークン（change_logのID）以降に変更されたレコードの最新の状態と、削除されたレコードのIDを返します
+    作付け計画の削除は、その計画の圃場情報・作業インスタンスの削除を含みます
+
+    change_logのIDは挿入時に採番されるため、同時に書き込まれた場合は小さいIDの行が後からコミットされることがあります
+    直近（SYNC_SAFETY_LAG_SECONDS以内）の変更も返しますが、次のトークンはそれより前までにとどめ、次回の同期で読み直します
+    変更履歴はCHANGE_LOG_RETENTION_DAYS日で削除し（prune_change_log）、削除済みの範囲を指すトークンにはresetを返します
+    """
+
+    table = "change_log"
+    _recorder_client = None
+
+    def __init__(self, supabase=None):
+        self.supabase = supabase or get_supabase_client()
+
+    async def get_changes(
+        self, organization_id: int, since: Optional[str], limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        同期トークン以降の変更を返します
+
+        Args:
+            organization_id: 組織ID
+            since: 前回の同期で受け取ったnext_token（省略時は現在のトークンのみを返す）
+            limit: 1回で処理する変更履歴の件数（超える場合はhas_moreを返す）
+
+        Returns:
+            next_token・has_more・reset と、エンティティごとの upserted（最新の行）/ deleted（ID）
+        """
+        limit = limit or settings.SYNC_BATCH_SIZE
+        changes: Dict[str, Dict[str, List[Any]]] = {
+            entity: {"upserted": [], "deleted": []} for entity in SYNC_ENTITIES
+        }
+
+        try:
+            if since is None:
+                # 初回は一覧APIで全件を取得してもらい、以降の差分の起点だけを返す
+                return {"next_token": str(self._head(organization_id)), "has_more": False, "reset": True, "changes": changes}
+
+            watermark = self._parse_token(since)
+            oldest = self._oldest()
+            if oldest is not None and watermark < oldest - 1:
+                # トークン以降の変更履歴が保持期間を過ぎて削除されている可能性があるため、全件を取得し直してもらう
+                return {"next_token": str(self._head(organization_id)), "has_more": False, "reset": True, "changes": changes}
+
+            response = self.supabase.table(self.table).select(
+                "id, entity, entity_id, action, changed_at"
+            ).eq(
+                "organization_id", organization_id
+            ).gt(
+                "id", watermark
+            ).order(
+                "id", desc=False
+            ).limit(limit + 1).execute()
+
+            rows = response.data or []
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            next_token = self._next_token(rows, watermark, has_more)
+
+            # 同じレコードの変更は最後の操作だけを使う
+            latest: Dict[Tuple[str, int], str] = {}
+            for row in rows:
+                if row["entity"] in SYNC_ENTITIES:
+                    latest[(row["entity"], row["entity_id"])] = row["action"]
+
+            upsert_ids: Dict[str, List[int]] = {entity: [] for entity in SYNC_ENTITIES}
+            for (entity, entity_id), action in latest.items():
+                if action == "deleted":
+                    changes[entity]["deleted"].append(entity_id)
+                else:
+                    upsert_ids[entity].append(entity_id)
+
+            # エンティティごとに1回のクエリで最新の行を取得する
+            for entity, ids in upsert_ids.items():
+                if not ids:
+                    continue
+                found = self._fetch_rows(entity, "id", ids)
+                changes[entity]["upserted"].extend(found.values())
+                # 変更履歴の後に削除され、まだ履歴に現れていないもの
+                changes[entity]["deleted"].extend(entity_id for entity_id in ids if entity_id not in found)
+
+            # 新規作成・更新された作付け計画の作業インスタンス（計画と同時に作成されるため）
+            plan_ids = [row["id"] for row in changes["planting_plans"]["upserted"]]
+            if plan_ids:
+                known = {row["id"] for row in changes["workflow_instances"]["upserted"]}
+                for instance in self._fetch_rows("workflow_instances", "planting_plan_id", plan_ids).values():
+                    if instance["id"] not in known:
+                        changes["workflow_instances"]["upserted"].append(instance)
+
+            return {"next_token": str(next_token), "has_more": has_more, "reset": False, "changes": changes}
+        except ValidationException:
+            raise
+        except Exception as e:
+            raise DatabaseOperationException(f"差分の取得中にエラーが発生しました: {str(e)}")
+
+    @staticmethod
+    def _next_token(rows: List[Dict[str, Any]], watermark: int, has_more: bool) -> int:
+        """
+        次の同期トークンを返します
+        安全のための遅延より新しい行に達したらそれ以降には進めません（その間に小さいIDの行がコミットされうるため）
+        """
+        lag_cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.SYNC_SAFETY_LAG_SECONDS)
+        next_token = watermark
+        for row in rows:
+            if row.get("changed_at") is not None and _parse_timestamp(row["changed_at"]) > lag_cutoff:
+                break
+            next_token = row["id"]
+        if has_more and next_token == watermark:
+            # 1回分の件数が全て直近の変更の場合は、同じ範囲を取得し続けないよう進める
+            next_token = rows[-1]["id"]
+        return next_token
+
+    def _head(self, organization_id: int) -> int:
+        response = self.supabase.table(self.table).select("id").eq(
+            "organization_id", organization_id
+        ).order("id", desc=True).limit(1).execute()
+        if response.data:
+            return response.data[0]["id"]
+        # 変更の無い組織は全体の最新のIDを起点にする（保持期間を過ぎてもresetにならないように）
+        response = self.supabase.table(self.table).select("id").order("id", desc=True).limit(1).execute()
+        return response.data[0]["id"] if response.data else 0
+
+    def _oldest(self) -> Optional[int]:
+        response = self.supabase.table(self.table).select("id").order("id").limit(1).execute()
+        return response.data[0]["id"] if response.data else None
+
+    def prune_change_log(self, days: Optional[int] = None) -> int:
+        """
+        保持期間より古い変更履歴を削除します（定期実行用）
+
+        保持期間内の最も小さいIDより前の行をまとめて削除し、削除済みの範囲をIDの連続した範囲にします
+        （get_changesは残っている最小のIDとトークンを比べてresetを判定するため）
+        最新の行は常に残します
+
+        Returns:
+            削除した行数
+        """
+        days = settings.CHANGE_LOG_RETENTION_DAYS if days is None else days
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        try:
+            response = self.supabase.table(self.table).select("id").gte(
+                "changed_at", cutoff.isoformat()
+            ).order("id").limit(1).execute()
+            if response.data:
+                horizon = response.data[0]["id"]
+            else:
+                newest = self.supabase.table(self.table).select("id").order("id", desc=True).limit(1).execute()
+                if not newest.data:
+                    return 0
+                horizon = newest.data[0]["id"]
+
+            deleted = self.supabase.table(self.table).delete().lt("id", horizon).execute()
+            return len(deleted.data or [])
+        except Exception as e:
+            raise DatabaseOperationException(f"変更履歴の削除中にエラーが発生しました: {str(e)}")
+
+    def _fetch_rows(self, entity: str, column: str, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        convert = SYNC_ENTITIES[entity]
+        rows: Dict[int, Dict[str, Any]] = {}
+        batch_size = settings.SYNC_BATCH_SIZE
+        for start in range(0, len(ids), batch_size):
+            response = self.supabase.table(entity).select("*").in_(
+                column, ids[start:start + batch_size]
+            ).execute()
+            for row in response.data or []:
+                rows[row["id"]] = convert(row)
+        return rows
+
+    @staticmethod
+    def _parse_token(token: str) -> int:
+        try:
+            value = int(token)
+        except (TypeError, ValueError):
+            raise ValidationException("同期トークンが不正です", {"since": token})
+        if value < 0:
+            raise ValidationException("同期トークンが不正です", {"since": token})
+        return value
+
+    @classmethod
+    def record_change(cls, event: events.DataChangeEvent) -> None:
+        """
+        データ変更イベントをchange_logに記録します
+        """
+        if not settings.CHANGE_LOG_ENABLED or event.entity not in SYNC_ENTITIES:
+            return
+        if event.organization_id is None or event.entity_id is None:
+            logger.warning("組織・IDが不明な変更は差分同期に記録できません: %s", event)
+            return
+
+        if cls._recorder_client is None:
+            cls._recorder_client = get_supabase_client()
+        cls._recorder_client.table(cls.table).insert({
+            "organization_id": event.organization_id,
+            "entity": event.entity,
+            "entity_id": event.entity_id,
+            "action": event.action,
+        }).execute()
+
+
+events.subscribe(SyncService.record_change)
@@ -1,10 +1,12 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 import json
 
+from app.core.events import publish_change
 from app.db.session import get_supabase_client
 from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.task import TaskCreate, TaskFilter, TaskUpdate
+from app.utils.text_utils import escape_like
 from app.exceptions.service_exceptions import (
     DatabaseOperationException,
     ResourceNotFoundException,
@@ -12,6 +14,13 @@ from app.exceptions.service_exceptions import (
 )
 
 
+# 作業の状態
+TASK_STATUSES: Tuple[str, ...] = ("pending", "in_progress", "completed")
+
+# 並び替えに指定できる列（tasksのインデックスに合わせる）
+TASK_SORT_COLUMNS: Tuple[str, ...] = ("scheduled_date", "status", "field_id", "created_at", "updated_at")
+
+
 class TaskService:
     def __init__(self, supabase=None):
         self.supabase = supabase or get_supabase_client()
@@ -19,53 +28,138 @@ class TaskService:
         self.fields_table = "fields"
 
     async def get_tasks(
-        self, organization_id: int, skip: int = 0, limit: int = 100
+        self,
+        organization_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[TaskFilter] = None,
+        sort_by: str = "scheduled_date",
+        descending: bool = False,
     ) -> List[Task]:
         """
-        組織に属する全ての作業を取得します
+        組織に属する作業を取得します
+
+        絞り込み・並び替えはクエリで行います（tasksの (organization_id, scheduled_date)・
+        (organization_id, status)・(field_id) のインデックスを使います）
+
+        Args:
+            organization_id: 組織ID
+            skip: スキップする件数
+            limit: 取得する最大件数
+            filters: 絞り込み条件（省略時は全て）
+            sort_by: 並び替える列（TASK_SORT_COLUMNSのいずれか）
+            descending: 降順にする場合はTrue
+        """
+        if sort_by not in TASK_SORT_COLUMNS:
+            raise ValidationException(
+                f"並び替えに指定できる列は {', '.join(TASK_SORT_COLUMNS)} です", {"sort": sort_by}
+            )
+
+        try:
+            query = self._apply_filters(
+                self.supabase.table(self.table).select("*").eq("organization_id", organization_id),
+                filters,
+            )
+            if query is None:
+                return []
+
+            # 同じ値の行の順序を固定し、ページングで重複・欠落しないようにする
+            response = query.order(
+                sort_by, desc=descending
+            ).order(
+                "id", desc=descending
+            ).range(
+                skip, skip + limit - 1
+            ).execute()
+            
+            if not response.data:
+                return []
+            
+            return self._build_tasks_with_field_names(response.data)
+        except Exception as e:
+            raise DatabaseOperationException(f"作業の取得中にエラーが発生しました: {str(e)}")
+
+    @staticmethod
+    def _apply_filters(query, filters: Optional[TaskFilter]):
+        """
+        絞り込み条件をクエリに追加します（一致する行が無いことが明らかな場合はNoneを返します）
+        """
+        if filters is None:
+            return query
+        if filters.statuses is not None:
+            if not filters.statuses:
+                return None
+            query = query.in_("status", filters.statuses)
+        if filters.field_ids is not None:
+            if not filters.field_ids:
+                return None
+            query = query.in_("field_id", filters.field_ids)
+        if filters.assigned_to:
+            query = query.eq("assigned_to", filters.assigned_to)
+        if filters.scheduled_from is not None:
+            query = query.gte("scheduled_date", filters.scheduled_from.isoformat())
+        if filters.scheduled_to is not None:
+            query = query.lt("scheduled_date", filters.scheduled_to.isoformat())
+        if filters.notes:
+            query = query.ilike("notes", f"%{escape_like(filters.notes)}%")
+        return query
+
+    async def get_tasks_scheduled_between(
+        self, organization_id: int, start: datetime, end: datetime, limit: int = 50
+    ) -> List[Task]:
+        """
+        指定期間（start以上end未満）に予定されている作業を取得します
         """
         try:
             response = self.supabase.table(self.table).select(
                 "*"
             ).eq(
                 "organization_id", organization_id
+            ).gte(
+                "scheduled_date", start.isoformat()
+            ).lt(
+                "scheduled_date", end.isoformat()
             ).order(
                 "scheduled_date", desc=False
-            ).range(
-                skip, skip + limit - 1
-            ).execute()
+            ).limit(limit).execute()
             
             if not response.data:
                 return []
             
-            field_ids = [item["field_id"] for item in response.data]
-            fields_response = self.supabase.table(self.fields_table).select(
-                "id, name"
-            ).in_("id", field_ids).execute()
-            
-            field_map = {field["id"]: field["name"] for field in fields_response.data}
-            
-            tasks = []
-            for item in response.data:
-                if item.get("scheduled_date"):
-                    item["scheduled_date"] = datetime.fromisoformat(item["scheduled_date"].replace("Z", "+00:00"))
-                if item.get("completed_date"):
-                    item["completed_date"] = datetime.fromisoformat(item["completed_date"].replace("Z", "+00:00"))
-                if item.get("created_at"):
-                    item["created_at"] = datetime.fromisoformat(item["created_at"].replace("Z", "+00:00"))
-                if item.get("updated_at"):
-                    item["updated_at"] = datetime.fromisoformat(item["updated_at"].replace("Z", "+00:00"))
-                
-                task = Task(**item)
-                task_dict = task.dict()
-                task_dict["field_name"] = field_map.get(item["field_id"], "不明")
-                
-                tasks.append(Task(**task_dict))
-            
-            return tasks
+            return self._build_tasks_with_field_names(response.data)
         except Exception as e:
             raise DatabaseOperationException(f"作業の取得中にエラーが発生しました: {str(e)}")
 
+    def _build_tasks_with_field_names(self, rows: List[dict]) -> List[Task]:
+        """
+        作業の行データを圃場名付きのTaskモデルに変換します（圃場名は1回のクエリでまとめて取得）
+        """
+        field_ids = list({item["field_id"] for item in rows})
+        fields_response = self.supabase.table(self.fields_table).select(
+            "id, name"
+        ).in_("id", field_ids).execute()
+        
+        field_map = {field["id"]: field["name"] for field in fields_response.data}
+        
+        tasks = []
+        for item in rows:
+            if item.get("scheduled_date"):
+                item["scheduled_date"] = datetime.fromisoformat(item["scheduled_date"].replace("Z", "+00:00"))
+            if item.get("completed_date"):
+                item["completed_date"] = datetime.fromisoformat(item["completed_date"].replace("Z", "+00:00"))
+            if item.get("created_at"):
+                item["created_at"] = datetime.fromisoformat(item["created_at"].replace("Z", "+00:00"))
+            if item.get("updated_at"):
+                item["updated_at"] = datetime.fromisoformat(item["updated_at"].replace("Z", "+00:00"))
+            
+            task = Task(**item)
+            task_dict = task.dict()
+            task_dict["field_name"] = field_map.get(item["field_id"], "不明")
+            
+            tasks.append(Task(**task_dict))
+        
+        return tasks
+
     async def get_task(self, task_id: int) -> Optional[Task]:
         """
         特定の作業を取得します
@@ -162,7 +256,9 @@ class TaskService:
             task_dict = task.dict()
             task_dict["field_name"] = field_response.data[0]["name"]
             
-            return Task(**task_dict)
+            created = Task(**task_dict)
+            publish_change(organization_id, "tasks", created.id, "created", created.dict())
+            return created
         except ValidationException as e:
             raise e
         except Exception as e:
@@ -248,7 +344,9 @@ class TaskService:
             else:
                 task_dict["field_name"] = "不明"
             
-            return Task(**task_dict)
+            updated = Task(**task_dict)
+            publish_change(updated.organization_id, "tasks", updated.id, "updated", updated.dict())
+            return updated
         except ResourceNotFoundException as e:
             raise e
         except ValidationException as e:
@@ -271,6 +369,8 @@ class TaskService:
             
             if not response.data:
                 raise DatabaseOperationException("作業の削除に失敗しました")
+            
+            publish_change(existing_task.organization_id, "tasks", task_id, "deleted")
         except ResourceNotFoundException as e:
             raise e
         except Exception as e:
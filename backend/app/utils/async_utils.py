@@ -0,0 +1,23 @@
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+async def run_in_thread(func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+    """
+    非同期関数をワーカースレッド上の別イベントループで実行する
+
+    サービス層はSupabaseクライアントの同期I/Oをasync関数内で呼び出しているため、
+    そのままasyncio.gatherしても逐次実行になる。スレッドに逃がすことで複数の呼び出しを並行させる
+    （contextvarsは呼び出し元のコンテキストが引き継がれる）
+
+    Args:
+        func: 実行する非同期関数
+        *args: 関数に渡す位置引数
+        **kwargs: 関数に渡すキーワード引数
+
+    Returns:
+        関数の戻り値
+    """
+    return await asyncio.to_thread(lambda: asyncio.run(func(*args, **kwargs)))
@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# キャッシュに存在しないことを表す値（Noneをキャッシュできるようにするため）
+MISSING = object()
+
+
+class TTLCache:
+    """
+    有効期限（TTL）付きのLRUキャッシュ（スレッドセーフ）
+
+    容量を超えた場合は最も長く参照されていないエントリから削除します
+    ヒット率を把握できるよう、ヒット・ミス・削除の回数を記録します
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """
+        キャッシュから値を取得します（期限切れの場合はdefaultを返します）
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        値をキャッシュに保存します
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """
+        指定したキーのエントリを削除します
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        条件に一致するキーのエントリを全て削除します
+
+        Returns:
+            削除したエントリ数
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """
+        全てのエントリを削除します
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を返します
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class ReadThroughCache:
+    """
+    サービスの読み取り結果をタグ付きで保持するキャッシュ（スレッドセーフ）
+
+    - fresh_ttl秒以内のエントリはそのまま返します
+    - fresh_ttlを過ぎてもstale_ttl秒以内であれば古い値を返し、裏で再取得します（stale-while-revalidate）
+    - 書き込み時はタグ単位で破棄します（破棄と並行していた取得結果は保存しません）
+    - 容量を超えた場合は最も長く参照されていないエントリから削除します
+
+    返した値は呼び出し元の間で共有されるため、変更しないでください
+    """
+
+    def __init__(self, maxsize: int = 1000, fresh_ttl: float = 60.0, stale_ttl: float = 300.0, enabled: bool = True):
+        self.maxsize = maxsize
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = max(stale_ttl, fresh_ttl)
+        self.enabled = enabled
+        # キー -> (新鮮な期限, 古い値を返せる期限, 値, タグ)
+        self._data: "OrderedDict[Hashable, Tuple[float, float, Any, FrozenSet[Hashable]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 破棄のたびに進める時刻。取得の開始後に、取得結果のタグが破棄されていれば（clearの場合は全て）保存しない
+        # 他の組織・他のIDの破棄では、実行中の取得結果を捨てない
+        self._clock = 0
+        self._cleared_at = 0
+        self._tag_invalidated_at: Dict[Hashable, int] = {}
+        self._loads: "Counter[int]" = Counter()  # 取得の開始時刻 -> 実行中の件数
+        self._refreshing: Set[Hashable] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Iterable[Hashable] = (),
+        tags_for: Optional[Callable[[Any], Iterable[Hashable]]] = None,
+    ) -> Any:
+        """
+        キャッシュから値を返し、なければloaderで取得して保存します
+
+        Args:
+            key: キャッシュキー
+            loader: 値を取得する非同期関数
+            tags: 破棄に使うタグ
+            tags_for: 取得した値から追加のタグを求める関数（詳細取得で組織IDをタグにする場合など）
+        """
+        if not self.enabled:
+            return await loader()
+
+        now = time.monotonic()
+        refresh = False
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                fresh_until, stale_until, value, _ = entry
+                if now < fresh_until:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if now < stale_until:
+                    self._data.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        refresh = True
+                else:
+                    del self._data[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                started = self._begin_load()
+
+        if entry is not None:
+            if refresh:
+                asyncio.get_running_loop().create_task(self._refresh(key, loader, tags, tags_for))
+            return entry[2]
+
+        try:
+            value = await loader()
+        except BaseException:
+            with self._lock:
+                self._end_load(started)
+            raise
+        self._store(key, value, tags, tags_for, started)
+        return value
+
+    async def _refresh(self, key, loader, tags, tags_for) -> None:
+        with self._lock:
+            started = self._begin_load()
+        try:
+            value = await loader()
+        except Exception:
+            # 再取得に失敗しても古い値は期限まで返し続ける
+            logger.exception("キャッシュの再取得に失敗しました: %s", key)
+            with self._lock:
+                self._end_load(started)
+                self._refreshing.discard(key)
+            return
+        self._store(key, value, tags, tags_for, started)
+
+    def _begin_load(self) -> int:
+        # ロックを保持して呼び出す
+        self._loads[self._clock] += 1
+        return self._clock
+
+    def _end_load(self, started: int) -> None:
+        # ロックを保持して呼び出す。実行中の取得より前の破棄時刻は不要になるため削除する
+        self._loads[started] -= 1
+        if self._loads[started] <= 0:
+            del self._loads[started]
+        if not self._loads:
+            self._tag_invalidated_at.clear()
+        elif self._tag_invalidated_at:
+            oldest = min(self._loads)
+            for tag in [tag for tag, at in self._tag_invalidated_at.items() if at <= oldest]:
+                del self._tag_invalidated_at[tag]
+
+    def _store(self, key, value, tags, tags_for, started: int) -> None:
+        all_tags = set(tags)
+        if tags_for is not None:
+            all_tags.update(tags_for(value))
+        now = time.monotonic()
+        with self._lock:
+            self._refreshing.discard(key)
+            invalidated = self._cleared_at > started or any(
+                self._tag_invalidated_at.get(tag, 0) > started for tag in all_tags
+            )
+            self._end_load(started)
+            if invalidated:
+                return
+            self._data[key] = (now + self.fresh_ttl, now + self.stale_ttl, value, frozenset(all_tags))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_tags(self, *tags: Hashable) -> int:
+        """
+        いずれかのタグを持つエントリを全て削除します
+
+        Returns:
+            削除したエントリ数
+        """
+        targets = set(tags)
+        with self._lock:
+            self._clock += 1
+            if self._loads:
+                for tag in targets:
+                    self._tag_invalidated_at[tag] = self._clock
+            keys = [key for key, entry in self._data.items() if entry[3] & targets]
+            for key in keys:
+                del self._data[key]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """
+        全てのエントリを削除します
+        """
+        with self._lock:
+            self._clock += 1
+            self._cleared_at = self._clock
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を返します（古い値を返した場合もヒットに数えます）
+        """
+        with self._lock:
+            hits = self.hits + self.stale_hits
+            lookups = hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -1,8 +1,58 @@
 import json
+from datetime import date, datetime, time
+from decimal import Decimal
 from typing import Any, List, Dict, Optional, TypeVar, Generic, Type
 
+try:
+    import orjson
+except ImportError:  # orjsonが無い環境では標準のjsonを使う
+    orjson = None
+
 T = TypeVar('T')
 
+# orjsonで辞書の整数キーを文字列に変換する（標準のjsonと同じ動作）
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _default(obj: Any) -> Any:
+    """
+    JSONで表現できない値の変換（orjson・標準のjsonで共通）
+    """
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    PythonオブジェクトをUTF-8のJSONバイト列に変換する（レスポンス本文用の高速な経路）
+
+    orjsonがあればorjsonを、無ければ標準のjsonを使います（出力はどちらも空白を含まない形式）
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        obj, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """
+    JSON文字列・バイト列をPythonオブジェクトに変換する
+
+    Raises:
+        ValueError: JSONとして不正な場合
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 def parse_json_string(json_str: Optional[str]) -> Any:
     """
@@ -17,8 +67,8 @@ def parse_json_string(json_str: Optional[str]) -> Any:
     if not json_str:
         return None
     try:
-        return json.loads(json_str)
-    except json.JSONDecodeError:
+        return loads(json_str)
+    except ValueError:
         return None
 
 
@@ -32,4 +82,4 @@ def to_json_string(obj: Any) -> str:
     Returns:
         JSON文字列
     """
-    return json.dumps(obj)
+    return dumps(obj).decode("utf-8")
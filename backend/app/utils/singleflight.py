@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _LeaderCancelled(Exception):
+    """リーダーの実行がキャンセルされたことを合流した呼び出しに伝える（合流した側で再実行する）"""
+
+
+class SingleFlight:
+    """
+    同じキーの読み取りが同時に実行中であれば、新たに実行せずその結果を共有します（スレッドセーフ）
+
+    最初の呼び出し（リーダー）だけが関数を実行し、実行中に来た呼び出しはその完了を待って同じ結果
+    （例外の場合は同じ例外）を受け取ります。完了後の呼び出しは再び実行されます（結果は保持しません）
+    別スレッドのイベントループ（run_in_thread）からの呼び出しも合流できます
+
+    キャンセル（クライアントの切断・タイムアウト）は他の呼び出しに伝えません
+    リーダーがキャンセルされた場合は実行中の枠を空け、合流していた呼び出しのうち1つが新たなリーダーとして再実行します
+
+    返した値は呼び出し元の間で共有されるため、変更しないでください
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.executions = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                if future is not None:
+                    self.shared += 1
+                    leader = False
+                else:
+                    future = Future()
+                    self._calls[key] = future
+                    self.executions += 1
+                    leader = True
+
+            if not leader:
+                try:
+                    # 合流した側のキャンセルで共有の結果をキャンセルしないようにする
+                    return await asyncio.shield(asyncio.wrap_future(future))
+                except _LeaderCancelled:
+                    continue
+
+            try:
+                result = await func()
+            except asyncio.CancelledError:
+                self._finish(key)
+                future.set_exception(_LeaderCancelled())
+                raise
+            except BaseException as e:
+                self._finish(key)
+                future.set_exception(e)
+                raise
+            self._finish(key)
+            future.set_result(result)
+            return result
+
+    def _finish(self, key: Hashable) -> None:
+        # 結果を設定する前に外し、完了後の呼び出しが古い結果に合流しないようにする
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        実行回数と合流した回数を返します（メトリクスのキャッシュ統計と同じ形式）
+        """
+        with self._lock:
+            calls = self.executions + self.shared
+            return {
+                "size": len(self._calls),
+                "hits": self.shared,
+                "misses": self.executions,
+                "hit_rate": self.shared / calls if calls else 0.0,
+            }
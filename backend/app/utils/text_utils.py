@@ -0,0 +1,108 @@
+import re
+import unicodedata
+from typing import List, Tuple
+
+# 空白・句読点・記号で文字列を区切るためのパターン
+_SEPARATOR_PATTERN = re.compile(r"[\s　、。，．,.!?！？「」『』（）()\[\]【】:：;；/・\-〜~\"'`]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    検索用に文字列を正規化する（NFKC正規化＋小文字化）
+
+    Args:
+        text: 正規化する文字列
+
+    Returns:
+        正規化された文字列
+    """
+    if not text:
+        return ""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def normalize_text_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """
+    normalize_textと同じ正規化を行い、正規化後の各文字に対応する元の文字列の位置もあわせて返す
+    （NFKC正規化で長さが変わる文字（半角カナの濁点・㈱など）があっても元の文字列の位置を求めるため）
+    結合文字・半角の濁点と半濁点は直前の文字とまとめて正規化する
+
+    Args:
+        text: 正規化する文字列
+
+    Returns:
+        (正規化された文字列, 正規化後の各文字に対応する元の文字列の位置のリスト)
+    """
+    pieces: List[str] = []
+    offsets: List[int] = []
+    start = 0
+    while start < len(text):
+        end = start + 1
+        while end < len(text) and (unicodedata.combining(text[end]) or text[end] in "\uff9e\uff9f"):
+            end += 1
+        piece = normalize_text(text[start:end])
+        pieces.append(piece)
+        offsets.extend([start] * len(piece))
+        start = end
+    return "".join(pieces), offsets
+
+
+def split_segments(text: str) -> List[str]:
+    """
+    正規化済みの文字列を空白・句読点で区切った部分文字列のリストに分割する
+
+    Args:
+        text: 正規化済みの文字列
+
+    Returns:
+        空でない部分文字列のリスト
+    """
+    return [segment for segment in _SEPARATOR_PATTERN.split(text) if segment]
+
+
+def normalize_question(text: str) -> str:
+    """
+    質問文をキャッシュのキーとして比較できる形に正規化する
+    NFKC正規化・小文字化のうえ、空白と句読点・記号を取り除く
+
+    Args:
+        text: 質問文
+
+    Returns:
+        正規化された文字列（例: "トマトの 病気は？" → "トマトの病気は"）
+    """
+    return "".join(split_segments(normalize_text(text)))
+
+
+def char_ngrams(text: str, n: int = 2) -> List[str]:
+    """
+    文字列を文字n-gramに分割する（日本語のように単語区切りのない言語向け）
+    区切り文字をまたぐn-gramは生成せず、n文字未満の部分文字列はそのまま1語として扱う
+
+    Args:
+        text: 分割する文字列
+        n: n-gramの長さ
+
+    Returns:
+        n-gramのリスト（重複を含む）
+    """
+    grams: List[str] = []
+    for segment in split_segments(normalize_text(text)):
+        if len(segment) < n:
+            grams.append(segment)
+            continue
+        grams.extend(segment[i:i + n] for i in range(len(segment) - n + 1))
+    return grams
+
+
+def escape_like(text: str) -> str:
+    """
+    LIKE・ILIKEのパターンに埋め込む文字列のワイルドカード（%・_）とエスケープ文字をエスケープする
+
+    Args:
+        text: 利用者が入力した文字列
+
+    Returns:
+        部分一致のパターン（f"%{escape_like(text)}%"）にそのまま埋め込める文字列
+    """
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
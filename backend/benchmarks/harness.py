@@ -0,0 +1,314 @@
+"""
+ローカルバックエンド上でAPIを実行するためのベンチマーク共通処理
+
+appモジュールは設定を読み込み時に確定するため、configure_environment() を呼んでから
+load_app() でアプリケーションを読み込んでください
+"""
+import os
+import tempfile
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+API = "/api/v1"
+
+
+def configure_environment(latency_ms: float = 0.0, data_dir: Optional[str] = None) -> str:
+    """
+    ローカルバックエンドを使うように環境変数を設定します
+
+    Returns:
+        検索インデックスやアーカイブの保存先にした一時ディレクトリ
+    """
+    data_dir = data_dir or tempfile.mkdtemp(prefix="smartfarm-bench-")
+    os.environ["DATABASE_BACKEND"] = "local"
+    os.environ["LOCAL_DB_LATENCY_MS"] = str(latency_ms)
+    os.environ["DB_INSTRUMENTATION_ENABLED"] = "true"
+    os.environ["CHAT_SEARCH_INDEX_DIR"] = os.path.join(data_dir, "chat_search")
+    os.environ["CHAT_ARCHIVE_DIR"] = os.path.join(data_dir, "chat_archive")
+    # 外部のAIモデルを呼ばずにエージェントの経路を計測する
+    os.environ["CHAT_AGENT_LOCAL_MODEL"] = "true"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+    return data_dir
+
+
+def load_app():
+    from app.main import app
+
+    return app
+
+
+def app_client(app, base_url: str = "http://benchmark", **kwargs):
+    """
+    アプリケーションを直接呼び出すHTTPクライアントを返します
+
+    ルートで発生した例外はクライアントに送出せず500のレスポンスとして返します
+    （1つのルートの不具合で計測全体が中断しないようにするため）
+    """
+    import httpx
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url=base_url, **kwargs)
+
+
+class QueryCounter:
+    """
+    クエリ実行ごとに呼び出され、ラウンドトリップ数と形を記録します
+    """
+
+    def __init__(self):
+        from app.db.instrumentation import add_query_listener
+
+        self._lock = threading.Lock()
+        self.count = 0
+        self.shapes: Counter = Counter()
+        add_query_listener(self._on_query)
+
+    def _on_query(self, table: str, operation: str, shape: str, duration: float, rows: int) -> None:
+        with self._lock:
+            self.count += 1
+            self.shapes[shape] += 1
+
+    def reset(self) -> int:
+        """
+        記録をクリアし、クリア前のクエリ数を返します
+        """
+        with self._lock:
+            count, self.count = self.count, 0
+            self.shapes = Counter()
+            return count
+
+    def snapshot(self) -> Tuple[int, Counter]:
+        """
+        記録をクリアし、クリア前のクエリ数と形ごとの回数を返します
+        """
+        with self._lock:
+            result = (self.count, self.shapes)
+            self.count = 0
+            self.shapes = Counter()
+            return result
+
+
+@dataclass
+class BenchContext:
+    """シード済みデータの規模と、ルートの実行に使う値"""
+    organization_id: int
+    scale: Any
+    token: str
+    sequence: int = 0
+
+    def next(self) -> int:
+        self.sequence += 1
+        return self.sequence
+
+    @property
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+@dataclass
+class RouteCase:
+    """ベンチマーク対象の1ルートと、そのリクエストの組み立て方"""
+    method: str
+    path: str  # ルートテンプレート（/api/v1 以降）
+    path_params: Callable[[BenchContext], Dict[str, Any]] = lambda ctx: {}
+    query: Dict[str, Any] = field(default_factory=dict)
+    json: Optional[Callable[[BenchContext], Any]] = None
+    form: Optional[Callable[[BenchContext], Dict[str, str]]] = None
+    setup: Optional[Callable[[BenchContext], Dict[str, Any]]] = None  # 計測外で実行し、パスパラメータを返す
+    auth: bool = False
+    name: Optional[str] = None  # 同じルートを条件を変えて複数回計測する場合の区別
+
+    @property
+    def route(self) -> str:
+        return API + self.path
+
+    @property
+    def label(self) -> str:
+        return f"{self.route} [{self.name}]" if self.name else self.route
+
+    def build(self, ctx: BenchContext) -> Tuple[str, Dict[str, Any]]:
+        params = self.setup(ctx) if self.setup else self.path_params(ctx)
+        url = self.route.format(**params)
+        kwargs: Dict[str, Any] = {"params": dict(self.query)}
+        if self.json is not None:
+            kwargs["json"] = self.json(ctx)
+        if self.form is not None:
+            kwargs["data"] = self.form(ctx)
+        if self.auth:
+            kwargs["headers"] = ctx.auth_headers
+        return url, kwargs
+
+
+def _insert(table: str, values: Dict[str, Any]) -> int:
+    from app.db.local_backend import get_local_backend
+
+    return get_local_backend().table(table).insert(values).execute().data[0]["id"]
+
+
+def _middle(count: int) -> int:
+    return max(1, count // 2)
+
+
+def _field_body(ctx: BenchContext) -> Dict[str, Any]:
+    return {
+        "name": f"ベンチ圃場{ctx.next()}",
+        "coordinates": [{"lat": 43.0, "lng": 141.0}, {"lat": 43.001, "lng": 141.0}, {"lat": 43.001, "lng": 141.001}],
+        "area": 1.2,
+        "soil_type": "黒ボク土",
+    }
+
+
+def _plan_body(ctx: BenchContext) -> Dict[str, Any]:
+    return {
+        "plan_name": f"ベンチ作付け{ctx.next()}",
+        "crop_id": 1,
+        "planting_date": "2024-04-01",
+        "harvest_date": "2024-07-01",
+        "fields": [{"field_id": 1, "sequence": 1, "area": 1000}],
+    }
+
+
+def _task_body(ctx: BenchContext) -> Dict[str, Any]:
+    return {"field_id": 1, "task_type": "防除", "status": "pending", "scheduled_date": "2024-05-01T08:00:00"}
+
+
+def _resource_body(ctx: BenchContext) -> Dict[str, Any]:
+    return {"name": f"ベンチ資材{ctx.next()}", "resource_type": "資材", "quantity": 10, "unit": "袋", "status": "利用可能"}
+
+
+def _now_row(ctx: BenchContext, **values: Any) -> Dict[str, Any]:
+    return {"organization_id": ctx.organization_id, "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-01T00:00:00", **values}
+
+
+ROUTE_CASES: List[RouteCase] = [
+    # 認証
+    RouteCase("POST", "/auth/login", form=lambda ctx: {"username": f"admin{ctx.organization_id}@example.com", "password": "password"}),
+    RouteCase("POST", "/auth/register", json=lambda ctx: {
+        "name": "ベンチユーザー", "email": f"bench{ctx.next()}@example.com", "password": "password",
+        "organization_id": ctx.organization_id,
+    }),
+    # 圃場
+    RouteCase("GET", "/fields/", query={"limit": 100}),
+    RouteCase("POST", "/fields/", json=_field_body),
+    RouteCase("GET", "/fields/{field_id}", path_params=lambda ctx: {"field_id": _middle(ctx.scale.fields)}),
+    RouteCase("PUT", "/fields/{field_id}", path_params=lambda ctx: {"field_id": _middle(ctx.scale.fields)},
+              json=lambda ctx: {"notes": f"更新{ctx.next()}"}),
+    RouteCase("DELETE", "/fields/{field_id}", setup=lambda ctx: {
+        "field_id": _insert("fields", _now_row(ctx, name="削除用", coordinates="[]", area=1.0)),
+    }),
+    # 作物
+    RouteCase("GET", "/crops/", query={"limit": 100}, auth=True),
+    RouteCase("POST", "/crops/", auth=True, json=lambda ctx: {
+        "name": f"ベンチ作物{ctx.next()}", "category": "ナス科",
+        "workflow": [{"name": "定植", "days": 0, "sub_steps": []}, {"name": "収穫", "days": 90, "sub_steps": []}],
+    }),
+    RouteCase("GET", "/crops/{crop_id}", auth=True, path_params=lambda ctx: {"crop_id": _middle(ctx.scale.crops)}),
+    RouteCase("PUT", "/crops/{crop_id}", auth=True, path_params=lambda ctx: {"crop_id": _middle(ctx.scale.crops)},
+              json=lambda ctx: {"notes": f"更新{ctx.next()}"}),
+    RouteCase("DELETE", "/crops/{crop_id}", auth=True, setup=lambda ctx: {
+        "crop_id": _insert("crops", _now_row(ctx, name="削除用", category="ナス科", workflow="[]")),
+    }),
+    # 作付け計画
+    RouteCase("GET", "/planting_plans/", query={"limit": 100}, auth=True),
+    RouteCase("POST", "/planting_plans/", json=_plan_body, auth=True),
+    RouteCase("GET", "/planting_plans/{plan_id}", auth=True, path_params=lambda ctx: {"plan_id": _middle(ctx.scale.planting_plans)}),
+    RouteCase("PUT", "/planting_plans/{plan_id}", auth=True, path_params=lambda ctx: {"plan_id": _middle(ctx.scale.planting_plans)},
+              json=lambda ctx: {"notes": f"更新{ctx.next()}"}),
+    RouteCase("DELETE", "/planting_plans/{plan_id}", auth=True, setup=lambda ctx: {
+        "plan_id": _insert("planting_plans", _now_row(ctx, plan_name="削除用", crop_id=1, status="計画中")),
+    }),
+    RouteCase("PUT", "/planting_plans/workflow-instances/{instance_id}", auth=True,
+              path_params=lambda ctx: {"instance_id": _middle(ctx.scale.workflow_instances)},
+              json=lambda ctx: {"status": "進行中"}),
+    # カレンダー
+    RouteCase("GET", "/calendar/events", query={"start_date": date(2024, 4, 1).isoformat(), "end_date": date(2024, 4, 30).isoformat()}),
+    # 作業
+    RouteCase("GET", "/tasks/", query={"limit": 100}),
+    RouteCase("GET", "/tasks/", query={
+        "limit": 100, "status": ["pending", "in_progress"], "field_id": [1, 2, 3],
+        "scheduled_from": date(2024, 4, 1).isoformat(), "scheduled_to": date(2024, 6, 30).isoformat(),
+        "sort": "scheduled_date", "desc": "true",
+    }, name="絞り込み"),
+    RouteCase("POST", "/tasks/", json=_task_body),
+    RouteCase("GET", "/tasks/{task_id}", path_params=lambda ctx: {"task_id": _middle(ctx.scale.tasks)}),
+    RouteCase("PUT", "/tasks/{task_id}", path_params=lambda ctx: {"task_id": _middle(ctx.scale.tasks)},
+              json=lambda ctx: {"notes": f"更新{ctx.next()}"}),
+    RouteCase("DELETE", "/tasks/{task_id}", setup=lambda ctx: {
+        "task_id": _insert("tasks", _now_row(ctx, field_id=1, task_type="削除用", status="pending", scheduled_date="2024-05-01T08:00:00")),
+    }),
+    # 資材・農機
+    RouteCase("GET", "/resources/", query={"limit": 100}),
+    RouteCase("POST", "/resources/", json=_resource_body),
+    RouteCase("GET", "/resources/{resource_id}", path_params=lambda ctx: {"resource_id": _middle(ctx.scale.resources)}),
+    RouteCase("PUT", "/resources/{resource_id}", path_params=lambda ctx: {"resource_id": _middle(ctx.scale.resources)},
+              json=lambda ctx: {"quantity": ctx.next() % 100}),
+    RouteCase("DELETE", "/resources/{resource_id}", setup=lambda ctx: {
+        "resource_id": _insert("resources", _now_row(ctx, name="削除用", resource_type="資材", status="利用可能")),
+    }),
+    # 差分同期（過去の全ての変更を取得する）
+    RouteCase("GET", "/sync", query={"since": "0"}, auth=True),
+    # ダッシュボード
+    RouteCase("GET", "/dashboard/summary", auth=True),
+    # バッチ（ダッシュボードの初期表示でまとめて取得する一覧）
+    RouteCase("POST", "/batch", auth=True, json=lambda ctx: {"requests": [
+        {"id": "fields", "path": "/fields/?limit=100"},
+        {"id": "tasks", "path": "/tasks/?limit=100"},
+        {"id": "resources", "path": "/resources/?limit=100"},
+        {"id": "planting_plans", "path": "/planting_plans/?limit=100"},
+        {"id": "calendar", "path": "/calendar/events?start_date=2024-04-01&end_date=2024-04-30"},
+    ]}),
+    # AIチャット
+    RouteCase("GET", "/chat/sessions", query={"include_last_message": "true"}),
+    RouteCase("GET", "/chat/search", query={"q": "トマト 定植", "limit": 20}),
+    RouteCase("GET", "/chat/response-cache/stats"),
+    RouteCase("POST", "/chat/sessions", json=lambda ctx: {"title": f"ベンチ相談{ctx.next()}"}),
+    RouteCase("GET", "/chat/sessions/{session_id}", path_params=lambda ctx: {"session_id": _middle(ctx.scale.chat_sessions)}),
+    RouteCase("PUT", "/chat/sessions/{session_id}", path_params=lambda ctx: {"session_id": _middle(ctx.scale.chat_sessions)},
+              json=lambda ctx: {"title": f"更新{ctx.next()}"}),
+    RouteCase("DELETE", "/chat/sessions/{session_id}", setup=lambda ctx: {
+        "session_id": _insert("chat_sessions", _now_row(ctx, title="削除用")),
+    }),
+    RouteCase("GET", "/chat/sessions/{session_id}/messages", query={"limit": 50},
+              path_params=lambda ctx: {"session_id": _middle(ctx.scale.chat_sessions)}),
+    RouteCase("POST", "/chat/sessions/{session_id}/messages",
+              path_params=lambda ctx: {"session_id": _middle(ctx.scale.chat_sessions)},
+              json=lambda ctx: {"content": f"トマトの収穫時期は？{ctx.next()}"}),
+]
+
+
+def uncovered_routes(app) -> List[str]:
+    """
+    ROUTE_CASESに含まれていないAPIルートを返します（新しいルートの追加漏れの検出用）
+    """
+    covered = {(case.method, case.route) for case in ROUTE_CASES}
+    missing = []
+    for route in app.routes:
+        path = getattr(route, "path", "")
+        if not path.startswith(API):
+            continue
+        for method in sorted(getattr(route, "methods", None) or []):
+            if method != "HEAD" and (method, path) not in covered:
+                missing.append(f"{method} {path}")
+    return missing
+
+
+def seed(scale, organization_id: int = 1, seed: int = 42, batch_size: int = 5000) -> Tuple[Dict[str, int], "BenchContext"]:
+    """
+    ローカルバックエンドに合成データを投入し、ベンチマーク用のコンテキストを返します
+    """
+    from app.db.local_backend import get_local_backend
+    from app.db.synthetic import SyntheticDataGenerator, load_dataset
+    from app.services.service_cache import clear_service_caches
+    from app.services.user_service import UserService
+
+    backend = get_local_backend()
+    backend.reset()
+    # データを直接入れ替えるため、変更イベントで破棄されない読み取りキャッシュを破棄する
+    clear_service_caches()
+    generator = SyntheticDataGenerator(scale, organization_id=organization_id, seed=seed)
+    result = load_dataset(backend, generator, batch_size=batch_size)
+    token = UserService().create_access_token(user_id=next(generator.rows("users"))["id"])
+    return result.counts, BenchContext(organization_id=organization_id, scale=scale, token=token)
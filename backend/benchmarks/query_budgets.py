@@ -0,0 +1,164 @@
+"""
+全APIルートのDBラウンドトリップ数がデータ量に依存しないことを検査します
+
+ローカルバックエンドに2つの規模の合成データを投入して各ルートを実行し、クエリ数が
+両方の規模で同じであること（BUDGETSに上限を宣言したルートは上限以下であること）を確認します
+5xxを返したルート・規模によってステータスが変わったルートも失敗とします
+違反したルートは発行したクエリの形とともに出力し、終了コード1で終了します
+
+使い方（backend/ で実行）:
+    python -m benchmarks.query_budgets
+    python -m benchmarks.query_budgets --small 0.01 --large 0.05 --route planting_plans
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks import harness
+
+# 入力によってクエリ数が変わるルートの上限（method, route） -> 最大クエリ数
+# 一覧系のルートはここに追加せず、件数に依存しないクエリにしてください
+BUDGETS: Dict[Tuple[str, str], int] = {
+    # AIエージェントが呼び出すツールの数は質問内容によって変わる
+    ("POST", harness.API + "/chat/sessions/{session_id}/messages"): 12,
+}
+
+
+@dataclass
+class Measurement:
+    """1つの規模での1ルートの計測結果"""
+    status_code: int
+    count: int
+    shapes: Counter = field(default_factory=Counter)
+    error: Optional[str] = None  # リクエストの実行中に発生した例外
+
+
+@dataclass
+class BudgetResult:
+    case: harness.RouteCase
+    small: Measurement
+    large: Measurement
+
+    @property
+    def budget(self) -> Optional[int]:
+        return BUDGETS.get((self.case.method, self.case.route))
+
+    @property
+    def status_error(self) -> Optional[str]:
+        """
+        ステータスの異常（例外・5xx・規模によるステータスの違い）を返します
+        """
+        for label, measurement in (("小", self.small), ("大", self.large)):
+            if measurement.error is not None:
+                return f"{label}規模で例外が発生 ({measurement.error})"
+            if measurement.status_code >= 500:
+                return f"{label}規模でステータス{measurement.status_code}"
+        if self.small.status_code != self.large.status_code:
+            return f"データ量によってステータスが変化 ({self.small.status_code} -> {self.large.status_code})"
+        return None
+
+    @property
+    def ok(self) -> bool:
+        if self.status_error is not None:
+            return False
+        if self.budget is not None:
+            return max(self.small.count, self.large.count) <= self.budget
+        return self.small.count == self.large.count
+
+    def describe(self) -> List[str]:
+        if self.status_error is not None:
+            reason = self.status_error
+        elif self.budget is not None:
+            reason = f"上限{self.budget}回に対して {self.small.count}回 / {self.large.count}回"
+        else:
+            reason = f"データ量によってクエリ数が変化 ({self.small.count}回 -> {self.large.count}回)"
+        lines = [f"{self.case.method} {self.case.label}: {reason}"]
+        for shape, count in self.large.shapes.most_common():
+            delta = count - self.small.shapes.get(shape, 0)
+            marker = f" (+{delta})" if delta > 0 else ""
+            lines.append(f"    {count:5}x {shape}{marker}")
+        return lines
+
+
+async def measure(app, cases: List[harness.RouteCase], scale, counter: harness.QueryCounter,
+                  seed: int) -> List[Measurement]:
+    """
+    casesと同じ順序で計測結果を返します（同じルートを条件を変えて複数回計測するため、ルートをキーにしない）
+    """
+    _, ctx = harness.seed(scale, seed=seed)
+    results: List[Measurement] = []
+    async with harness.app_client(app, base_url="http://budget") as client:
+        for case in cases:
+            try:
+                # 1回目は遅延初期化（検索インデックスの構築など）を含むため計測しない
+                url, kwargs = case.build(ctx)
+                await client.request(case.method, url, **kwargs)
+
+                url, kwargs = case.build(ctx)
+                counter.reset()
+                response = await client.request(case.method, url, **kwargs)
+                count, shapes = counter.snapshot()
+                results.append(Measurement(response.status_code, count, shapes))
+            except Exception as e:
+                # 1つのルートの失敗で検査全体を中断しない
+                count, shapes = counter.snapshot()
+                results.append(Measurement(0, count, shapes, error=f"{type(e).__name__}: {e}"))
+    return results
+
+
+async def run(args) -> List[BudgetResult]:
+    from app.db.synthetic import SyntheticScale
+
+    app = harness.load_app()
+    counter = harness.QueryCounter()
+    cases = [case for case in harness.ROUTE_CASES if not args.route or any(part in case.route for part in args.route)]
+
+    small = await measure(app, cases, SyntheticScale().scaled(args.small), counter, args.seed)
+    large = await measure(app, cases, SyntheticScale().scaled(args.large), counter, args.seed)
+    return [BudgetResult(case, small_result, large_result) for case, small_result, large_result in zip(cases, small, large)]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="APIルートのクエリ数の検査")
+    parser.add_argument("--small", type=float, default=0.01, help="小さい方のデータ量の係数")
+    parser.add_argument("--large", type=float, default=0.05, help="大きい方のデータ量の係数")
+    parser.add_argument("--seed", type=int, default=42, help="合成データの乱数シード")
+    parser.add_argument("--route", action="append", help="対象ルートを部分一致で絞り込む（複数指定可）")
+    args = parser.parse_args(argv)
+
+    harness.configure_environment()
+    # キャッシュがあるとクエリ数の増加が隠れるため、DBへのクエリを常に発行させる
+    os.environ["SERVICE_CACHE_ENABLED"] = "false"
+    logging.getLogger("app.request_stats").setLevel(logging.ERROR)
+
+    results = asyncio.run(run(args))
+    failures = [result for result in results if not result.ok]
+    for result in results:
+        status = "OK  " if result.ok else "FAIL"
+        print(
+            f"{status} {result.case.method:6} {result.case.label:55} "
+            f"queries={result.small.count}/{result.large.count} status={result.small.status_code}/{result.large.status_code}"
+        )
+
+    app = harness.load_app()
+    missing = harness.uncovered_routes(app)
+    if missing:
+        print("\nROUTE_CASESに含まれていないルート:", file=sys.stderr)
+        for route in missing:
+            print(f"  {route}", file=sys.stderr)
+
+    if failures:
+        print(f"\n{len(failures)}件のルートがクエリ数の検査に失敗しました:", file=sys.stderr)
+        for result in failures:
+            print("\n".join(result.describe()), file=sys.stderr)
+    if failures or missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+TrafficRecorderMiddlewareで記録したリクエストを再生し、記録時とのレイテンシの差を出力します
+
+記録時の間隔を保ったまま（--speedで倍速・0で待ち時間なし）リクエストを送信し、
+ルートごとに記録時と再生時のp50/p95/p99とその差をJSONで出力します
+
+使い方（backend/ で実行）:
+    # 起動中のローカル環境に対して再生する
+    python -m benchmarks.replay_traffic data/traffic/requests.jsonl --base-url http://localhost:8005 --speed 4
+    # ローカルバックエンドに合成データを投入し、プロセス内のアプリに対して再生する
+    python -m benchmarks.replay_traffic data/traffic/requests.jsonl --scale 0.1 --speed 0
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks import harness
+from benchmarks.run_endpoints import percentile
+
+
+def build_request(record: Dict[str, Any], sequence: int, token: Optional[str]) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    記録から (method, path, httpxのキーワード引数) を組み立てます
+    """
+    from app.middleware.traffic_recorder import restore
+
+    kwargs: Dict[str, Any] = {"params": [(key, restore(value, key, sequence)) for key, value in record.get("query", [])]}
+    body_type, body = record.get("body_type"), record.get("body")
+    if body_type == "json":
+        kwargs["json"] = restore(body, sequence=sequence)
+    elif body_type == "form":
+        kwargs["data"] = restore(body, sequence=sequence)
+    elif body_type == "raw":
+        kwargs["content"] = b"\0" * body["bytes"]
+    if record.get("auth") and token:
+        kwargs["headers"] = {"Authorization": f"Bearer {token}"}
+    return record["method"], record["path"], kwargs
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+    }
+
+
+def _compare(recorded: List[float], replayed: List[float]) -> Dict[str, Any]:
+    before, after = _distribution(recorded), _distribution(replayed)
+    return {
+        "recorded": before,
+        "replayed": after,
+        "delta_ms": {key: round(after[key] - before[key], 3) for key in before},
+    }
+
+
+async def replay(client, records: List[Dict[str, Any]], speed: float, concurrency: int,
+                 token: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    記録を再生し、リクエストごとの結果（ステータス・レイテンシ・予定時刻からの遅れ）を返します
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    origin = records[0]["started_at"] if records else 0.0
+    started = time.perf_counter()
+
+    async def send(sequence: int, record: Dict[str, Any]) -> Dict[str, Any]:
+        scheduled = (record["started_at"] - origin) / speed if speed > 0 else 0.0
+        delay = scheduled - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with semaphore:
+            lag = (time.perf_counter() - started) - scheduled
+            method, path, kwargs = build_request(record, sequence, token)
+            request_started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = response.status_code
+            except Exception as e:
+                print(f"{method} {path}: {e}", file=sys.stderr)
+                status = 0
+            return {
+                "record": record,
+                "status": status,
+                "latency_ms": (time.perf_counter() - request_started) * 1000,
+                "lag_ms": max(0.0, lag * 1000),
+            }
+
+    return await asyncio.gather(*(send(i, record) for i, record in enumerate(records)))
+
+
+def summarize(results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    by_route: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+    for result in results:
+        record = result["record"]
+        by_route[(record["method"], record.get("route") or record["path"])].append(result)
+
+    routes = []
+    for (method, route), items in sorted(by_route.items(), key=lambda item: -len(item[1])):
+        statuses: Dict[str, int] = defaultdict(int)
+        mismatched = 0
+        for item in items:
+            statuses[str(item["status"])] += 1
+            if item["status"] != item["record"]["status"]:
+                mismatched += 1
+        routes.append({
+            "method": method,
+            "route": route,
+            "requests": len(items),
+            "status_codes": dict(statuses),
+            "status_mismatches": mismatched,
+            **_compare([item["record"]["duration_ms"] for item in items], [item["latency_ms"] for item in items]),
+        })
+
+    recorded_span = (results[-1]["record"]["started_at"] - results[0]["record"]["started_at"]) if results else 0.0
+    return {
+        "requests": len(results),
+        "recorded_seconds": round(recorded_span, 3),
+        "replayed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed > 0 else None,
+        # 送信待ちによる予定時刻からの遅れ（大きい場合は並列数が不足している）
+        "schedule_lag_p95_ms": round(percentile([result["lag_ms"] for result in results], 95), 3),
+        "overall": _compare(
+            [result["record"]["duration_ms"] for result in results], [result["latency_ms"] for result in results]
+        ),
+        "routes": routes,
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+    from app.middleware.traffic_recorder import load_records
+
+    records = load_records(args.recording)
+    if args.route:
+        records = [record for record in records if any(part in (record.get("route") or record["path"]) for part in args.route)]
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        raise SystemExit("再生するリクエストがありません")
+
+    token = args.token
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+    else:
+        from app.db.synthetic import SyntheticScale
+
+        app = harness.load_app()
+        counts, ctx = harness.seed(SyntheticScale().scaled(args.scale), seed=args.seed)
+        print(f"シード完了: {sum(counts.values())}行", file=sys.stderr)
+        token = token or ctx.token
+        client = harness.app_client(app, base_url="http://replay", timeout=args.timeout)
+
+    async with client:
+        started = time.perf_counter()
+        results = await replay(client, records, args.speed, args.concurrency, token)
+        elapsed = time.perf_counter() - started
+
+    report = summarize(results, elapsed)
+    report["meta"] = {
+        "recording": args.recording,
+        "target": args.base_url or f"in-process (scale={args.scale})",
+        "speed": args.speed,
+        "concurrency": args.concurrency,
+    }
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="記録したリクエストの再生")
+    parser.add_argument("recording", help="TrafficRecorderMiddlewareの出力ファイル")
+    parser.add_argument("--base-url", help="再生先のURL（省略時はプロセス内のアプリにローカルバックエンドで再生する）")
+    parser.add_argument("--speed", type=float, default=1.0, help="再生速度の倍率（0の場合は待ち時間なしで送信する）")
+    parser.add_argument("--concurrency", type=int, default=64, help="同時に送信するリクエストの上限")
+    parser.add_argument("--token", help="認証が必要なリクエストに付けるアクセストークン")
+    parser.add_argument("--route", action="append", help="対象ルートを部分一致で絞り込む（複数指定可）")
+    parser.add_argument("--limit", type=int, help="再生するリクエスト数の上限")
+    parser.add_argument("--timeout", type=float, default=30.0, help="リクエストのタイムアウト（秒）")
+    parser.add_argument("--scale", type=float, default=0.1, help="プロセス内で再生する場合の合成データ量の係数")
+    parser.add_argument("--seed", type=int, default=42, help="合成データの乱数シード")
+    parser.add_argument("--output", help="結果のJSONの出力先（省略時は標準出力）")
+    args = parser.parse_args(argv)
+
+    if not args.base_url:
+        harness.configure_environment()
+        logging.getLogger("app.request_stats").setLevel(logging.ERROR)
+
+    report = asyncio.run(run(args))
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+全APIルートのレイテンシ・DBラウンドトリップ数・メモリ使用量を計測します
+
+ローカルバックエンドに合成データ（既定: 圃場5,000・作付け計画2,000・作業工程100,000・作業200,000・
+チャットメッセージ10,000件）を投入し、ルートごとに結果をJSONで出力します
+
+使い方（backend/ で実行）:
+    python -m benchmarks.run_endpoints --scale 0.1 --iterations 20 --output data/benchmarks/result.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from benchmarks import harness
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    最近傍順位法によるパーセンタイル
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_case(client, case: harness.RouteCase, ctx: harness.BenchContext, counter: harness.QueryCounter,
+                   iterations: int, warmup: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    round_trips: List[int] = []
+    statuses: Dict[str, int] = {}
+
+    for i in range(warmup + iterations):
+        url, kwargs = case.build(ctx)
+        counter.reset()
+        started = time.perf_counter()
+        try:
+            response = await client.request(case.method, url, **kwargs)
+            status_code = str(response.status_code)
+        except Exception as e:
+            # クライアント側の例外もルートの結果として記録し、次のルートの計測を続ける
+            status_code = f"error:{type(e).__name__}"
+        elapsed = time.perf_counter() - started
+        queries = counter.reset()
+        if i < warmup:
+            continue
+        latencies.append(elapsed * 1000)
+        round_trips.append(queries)
+        statuses[status_code] = statuses.get(status_code, 0) + 1
+
+    # メモリは計測のオーバーヘッドが大きいため、別に1回だけ実行して確保量のピークを測る
+    url, kwargs = case.build(ctx)
+    tracemalloc.start()
+    try:
+        await client.request(case.method, url, **kwargs)
+    except Exception:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    counter.reset()
+
+    server_errors = sum(count for code, count in statuses.items() if not code.isdigit() or int(code) >= 500)
+
+    return {
+        "method": case.method,
+        "route": case.route,
+        "name": case.name,
+        "iterations": iterations,
+        "status_codes": statuses,
+        "server_errors": server_errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "round_trips": int(statistics.median(round_trips)),
+        "round_trips_max": max(round_trips),
+        "peak_alloc_kib": round(peak / 1024, 1),
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    from app.db.synthetic import SyntheticScale
+
+    app = harness.load_app()
+    scale = SyntheticScale().scaled(args.scale)
+    started = time.perf_counter()
+    counts, ctx = harness.seed(scale, seed=args.seed)
+    seed_seconds = time.perf_counter() - started
+    print(f"シード完了: {sum(counts.values())}行 ({seed_seconds:.1f}秒)", file=sys.stderr)
+
+    counter = harness.QueryCounter()
+    cases = [case for case in harness.ROUTE_CASES if not args.route or any(part in case.route for part in args.route)]
+    results = []
+    async with harness.app_client(app) as client:
+        for case in cases:
+            result = await run_case(client, case, ctx, counter, args.iterations, args.warmup)
+            results.append(result)
+            print(
+                f"{case.method:6} {case.label:55} p50={result['p50_ms']:8.2f}ms "
+                f"p95={result['p95_ms']:8.2f}ms queries={result['round_trips']}"
+                + (f" 5xx={result['server_errors']}" if result["server_errors"] else ""),
+                file=sys.stderr,
+            )
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "scale_factor": args.scale,
+            "rows": counts,
+            "seed_seconds": round(seed_seconds, 2),
+            "iterations": args.iterations,
+            "latency_ms": args.latency_ms,
+            # Linuxではキロバイト単位
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        "uncovered_routes": harness.uncovered_routes(app),
+        "failed_routes": [f"{result['method']} {result['route']}" for result in results if result["server_errors"]],
+        "routes": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="APIルートのベンチマーク")
+    parser.add_argument("--scale", type=float, default=1.0, help="既定のデータ量に掛ける係数")
+    parser.add_argument("--iterations", type=int, default=20, help="ルートごとの計測回数")
+    parser.add_argument("--warmup", type=int, default=2, help="計測前に実行する回数")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="1クエリごとに挿入する遅延（ミリ秒）")
+    parser.add_argument("--seed", type=int, default=42, help="合成データの乱数シード")
+    parser.add_argument("--route", action="append", help="対象ルートを部分一致で絞り込む（複数指定可）")
+    parser.add_argument("--output", help="結果のJSONの出力先（省略時は標準出力）")
+    args = parser.parse_args(argv)
+
+    harness.configure_environment(latency_ms=args.latency_ms)
+    # リクエストごとの構造化ログは計測結果と混ざるため抑制する
+    logging.getLogger("app.request_stats").setLevel(logging.ERROR)
+
+    report = asyncio.run(run(args))
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+大きな一覧レスポンスのシリアライズ時間を計測します
+
+ローカルバックエンドに合成データを投入し、件数の多いルートの戻り値について
+DBからの取得を除いた次の段階をそれぞれ計測します
+
+- validate: response_modelによる検証とJSON互換の値への変換（FastAPIのserialize_response）
+- stdlib: 標準のJSONResponse（json.dumps）でのバイト列への変換
+- fast: FastJSONResponse（json_utils.dumps。orjsonがあればorjson）でのバイト列への変換
+- jsonable_encoder: response_modelの無いルートでの変換（jsonable_encoder + json.dumps）
+
+使い方（backend/ で実行）:
+    python -m benchmarks.serialization --scale 0.5 --limit 1000
+    python -m benchmarks.serialization --route planting_plans --budget-ms 100
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from benchmarks import harness
+
+
+@dataclass
+class SerializationTarget:
+    """計測対象のルートと、その戻り値の取得方法"""
+    path: str  # ルートテンプレート（/api/v1 以降）
+    load: Callable[[harness.BenchContext, int], Awaitable[Any]]
+
+    @property
+    def route(self) -> str:
+        return harness.API + self.path
+
+
+async def _load_planting_plans(ctx: harness.BenchContext, limit: int) -> Any:
+    from app.services.planting_plan_service import PlantingPlanService
+
+    return await PlantingPlanService().get_planting_plans(ctx.organization_id, skip=0, limit=limit)
+
+
+async def _load_tasks(ctx: harness.BenchContext, limit: int) -> Any:
+    from app.services.task_service import TaskService
+
+    return await TaskService().get_tasks(ctx.organization_id, skip=0, limit=limit)
+
+
+async def _load_fields(ctx: harness.BenchContext, limit: int) -> Any:
+    from app.services.field_service import FieldService
+
+    return await FieldService().get_fields(ctx.organization_id, skip=0, limit=limit)
+
+
+async def _load_sync(ctx: harness.BenchContext, limit: int) -> Any:
+    from app.services.sync_service import SyncService
+
+    return await SyncService().get_changes(ctx.organization_id, since="0", limit=limit)
+
+
+TARGETS: List[SerializationTarget] = [
+    SerializationTarget("/planting_plans/", _load_planting_plans),
+    SerializationTarget("/tasks/", _load_tasks),
+    SerializationTarget("/fields/", _load_fields),
+    SerializationTarget("/sync", _load_sync),
+]
+
+
+def _find_route(app, path: str):
+    for route in app.routes:
+        if getattr(route, "path", None) == path and "GET" in (getattr(route, "methods", None) or []):
+            return route
+    raise LookupError(f"ルートが見つかりません: GET {path}")
+
+
+async def _timed(func: Callable[[], Any], iterations: int) -> Dict[str, Any]:
+    timings: List[float] = []
+    result = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = func()
+        if asyncio.iscoroutine(result):
+            result = await result
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"p50_ms": round(statistics.median(timings), 3), "max_ms": round(max(timings), 3), "result": result}
+
+
+async def measure(app, target: SerializationTarget, ctx: harness.BenchContext, limit: int, iterations: int) -> Dict[str, Any]:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+
+    from app.api.responses import FastJSONResponse
+
+    route = _find_route(app, target.route)
+    data = await target.load(ctx, limit)
+
+    validate = await _timed(lambda: serialize_response(field=route.response_field, response_content=data), iterations)
+    content = validate.pop("result")
+    stdlib = await _timed(lambda: JSONResponse(content).body, iterations)
+    fast = await _timed(lambda: FastJSONResponse(content).body, iterations)
+    encoder = await _timed(lambda: json.dumps(jsonable_encoder(data), ensure_ascii=False), iterations)
+
+    body = fast.pop("result")
+    if json.loads(body) != json.loads(stdlib.pop("result")):
+        raise AssertionError(f"{target.route}: FastJSONResponseの出力が標準のJSONResponseと一致しません")
+    encoder.pop("result")
+
+    return {
+        "route": target.route,
+        "items": len(data) if isinstance(data, list) else None,
+        "bytes": len(body),
+        "validate": validate,
+        "stdlib": stdlib,
+        "fast": fast,
+        "jsonable_encoder": encoder,
+        "total_fast_ms": round(validate["p50_ms"] + fast["p50_ms"], 3),
+        "total_stdlib_ms": round(validate["p50_ms"] + stdlib["p50_ms"], 3),
+    }
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    from app.db.synthetic import SyntheticScale
+
+    app = harness.load_app()
+    scale = SyntheticScale().scaled(args.scale)
+    counts, ctx = harness.seed(scale, seed=args.seed)
+    print(f"シード完了: {sum(counts.values())}行", file=sys.stderr)
+
+    targets = [target for target in TARGETS if not args.route or any(part in target.route for part in args.route)]
+    results = []
+    for target in targets:
+        result = await measure(app, target, ctx, args.limit, args.iterations)
+        results.append(result)
+        print(
+            f"GET {result['route']:30} items={result['items']} bytes={result['bytes']:>10} "
+            f"validate={result['validate']['p50_ms']:8.2f}ms stdlib={result['stdlib']['p50_ms']:8.2f}ms "
+            f"fast={result['fast']['p50_ms']:8.2f}ms jsonable_encoder={result['jsonable_encoder']['p50_ms']:8.2f}ms",
+            file=sys.stderr,
+        )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="一覧レスポンスのシリアライズ時間の計測")
+    parser.add_argument("--scale", type=float, default=0.5, help="既定のデータ量に掛ける係数（0.5で作付け計画1,000件）")
+    parser.add_argument("--limit", type=int, default=1000, help="一覧で取得する件数")
+    parser.add_argument("--iterations", type=int, default=10, help="段階ごとの計測回数")
+    parser.add_argument("--seed", type=int, default=42, help="合成データの乱数シード")
+    parser.add_argument("--route", action="append", help="対象ルートを部分一致で絞り込む（複数指定可）")
+    parser.add_argument("--budget-ms", type=float, help="validate + fast の上限（超えたルートがあれば終了コード1）")
+    args = parser.parse_args(argv)
+
+    harness.configure_environment()
+    logging.getLogger("app.request_stats").setLevel(logging.ERROR)
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    if args.budget_ms is not None:
+        over = [result for result in results if result["total_fast_ms"] > args.budget_ms]
+        for result in over:
+            print(f"上限超過: GET {result['route']} {result['total_fast_ms']}ms > {args.budget_ms}ms", file=sys.stderr)
+        if over:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
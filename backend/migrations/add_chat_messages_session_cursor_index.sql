@@ -0,0 +1,2 @@
+-- チャットメッセージのカーソルページング（session_idで絞り込み、idの降順で取得）用の複合インデックス
+CREATE INDEX IF NOT EXISTS idx_chat_messages_session_id_id ON chat_messages(session_id, id DESC);
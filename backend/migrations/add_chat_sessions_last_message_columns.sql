@@ -0,0 +1,27 @@
+-- セッション一覧で最新メッセージのプレビューと件数を返すための非正規化カラム
+-- ChatService.add_message がメッセージ追加時に更新します
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS last_message_id INTEGER;
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS last_message_preview VARCHAR(200);
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS last_message_is_from_ai BOOLEAN;
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS last_message_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS message_count INTEGER NOT NULL DEFAULT 0;
+
+-- 既存データのバックフィル
+UPDATE chat_sessions AS s
+SET
+    last_message_id = m.id,
+    last_message_preview = LEFT(m.content, 200),
+    last_message_is_from_ai = m.is_from_ai,
+    last_message_at = m.created_at,
+    message_count = c.message_count
+FROM (
+    SELECT DISTINCT ON (session_id) session_id, id, content, is_from_ai, created_at
+    FROM chat_messages
+    ORDER BY session_id, id DESC
+) AS m
+JOIN (
+    SELECT session_id, COUNT(*) AS message_count
+    FROM chat_messages
+    GROUP BY session_id
+) AS c ON c.session_id = m.session_id
+WHERE s.id = m.session_id;
@@ -0,0 +1,7 @@
+-- 作業一覧（GET /api/v1/tasks/）の絞り込み・並び替え用のインデックス
+-- 組織内の予定日での範囲指定・並び替え
+CREATE INDEX IF NOT EXISTS idx_tasks_organization_id_scheduled_date ON tasks(organization_id, scheduled_date);
+-- 組織内の状態での絞り込み
+CREATE INDEX IF NOT EXISTS idx_tasks_organization_id_status ON tasks(organization_id, status);
+-- 圃場での絞り込み（圃場名の取得・圃場の削除時の参照にも使う）
+CREATE INDEX IF NOT EXISTS idx_tasks_field_id ON tasks(field_id);
@@ -0,0 +1,13 @@
+-- オフライン端末向けの差分同期（GET /api/v1/sync）用の変更履歴
+-- SyncService.record_change がサービス層の書き込みごとに1行追加します（レコードの内容は保持しない）
+CREATE TABLE IF NOT EXISTS change_log (
+    id BIGSERIAL PRIMARY KEY,
+    organization_id INTEGER NOT NULL,
+    entity VARCHAR(50) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    action VARCHAR(20) NOT NULL,
+    changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- 同期トークン（id）以降の組織の変更を取得するための複合インデックス
+CREATE INDEX IF NOT EXISTS idx_change_log_organization_id_id ON change_log(organization_id, id);
@@ -0,0 +1,60 @@
+-- ホーム画面の集計（GET /api/v1/dashboard/summary）を1回のラウンドトリップで返す関数
+-- 状態・種別の値はアプリケーション側の定数を引数で受け取る（DashboardService を参照）
+CREATE OR REPLACE FUNCTION dashboard_summary(
+    p_organization_id INTEGER,
+    p_today DATE,
+    p_completed_task_status TEXT,
+    p_active_plan_status TEXT,
+    p_consumable_resource_type TEXT,
+    p_low_stock_threshold FLOAT
+) RETURNS JSON
+LANGUAGE sql STABLE
+AS $$
+    SELECT json_build_object(
+        'tasks_due_today', (
+            SELECT COUNT(*) FROM tasks
+            WHERE organization_id = p_organization_id
+              AND status <> p_completed_task_status
+              AND scheduled_date >= p_today AND scheduled_date < p_today + 1
+        ),
+        'tasks_overdue', (
+            SELECT COUNT(*) FROM tasks
+            WHERE organization_id = p_organization_id
+              AND status <> p_completed_task_status
+              AND scheduled_date < p_today
+        ),
+        'tasks_by_status', COALESCE((
+            SELECT json_object_agg(status, total) FROM (
+                SELECT status, COUNT(*) AS total FROM tasks
+                WHERE organization_id = p_organization_id
+                GROUP BY status
+            ) task_counts
+        ), '{}'::json),
+        'plans_by_status', COALESCE((
+            SELECT json_object_agg(status, total) FROM (
+                SELECT status, COUNT(*) AS total FROM planting_plans
+                WHERE organization_id = p_organization_id
+                GROUP BY status
+            ) plan_counts
+        ), '{}'::json),
+        'low_stock_resources', (
+            SELECT COUNT(*) FROM resources
+            WHERE organization_id = p_organization_id
+              AND resource_type = p_consumable_resource_type
+              AND quantity IS NOT NULL
+              AND quantity <= p_low_stock_threshold
+        ),
+        'cultivated_area', (
+            SELECT COALESCE(SUM(plan_fields.area), 0) FROM planting_plan_fields plan_fields
+            JOIN planting_plans plans ON plans.id = plan_fields.planting_plan_id
+            WHERE plans.organization_id = p_organization_id
+              AND plans.status = p_active_plan_status
+        ),
+        'field_count', (
+            SELECT COUNT(*) FROM fields WHERE organization_id = p_organization_id
+        ),
+        'total_field_area', (
+            SELECT COALESCE(SUM(area), 0) FROM fields WHERE organization_id = p_organization_id
+        )
+    );
+$$;
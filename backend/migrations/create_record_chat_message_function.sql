@@ -0,0 +1,27 @@
+-- メッセージ追加時にチャットセッションの非正規化カラム（件数・最新メッセージ）を1文で更新する関数
+-- ChatService.add_message がメッセージの挿入後に呼び出します
+-- 件数はデータベース上で加算し、最新メッセージの列は既存より新しいID（後に挿入されたメッセージ）の場合だけ更新するため、
+-- 同じセッションへの同時の追加でも件数が欠けたり、古いメッセージで上書きされたりしません
+CREATE OR REPLACE FUNCTION record_chat_message(
+    p_session_id INTEGER,
+    p_message_id INTEGER,
+    p_preview TEXT,
+    p_is_from_ai BOOLEAN,
+    p_created_at TIMESTAMP WITH TIME ZONE
+) RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE chat_sessions
+    SET
+        message_count = message_count + 1,
+        updated_at = GREATEST(updated_at, p_created_at),
+        last_message_id = CASE WHEN last_message_id IS NULL OR last_message_id < p_message_id
+            THEN p_message_id ELSE last_message_id END,
+        last_message_preview = CASE WHEN last_message_id IS NULL OR last_message_id < p_message_id
+            THEN p_preview ELSE last_message_preview END,
+        last_message_is_from_ai = CASE WHEN last_message_id IS NULL OR last_message_id < p_message_id
+            THEN p_is_from_ai ELSE last_message_is_from_ai END,
+        last_message_at = CASE WHEN last_message_id IS NULL OR last_message_id < p_message_id
+            THEN p_created_at ELSE last_message_at END
+    WHERE id = p_session_id;
+$$;
@@ -0,0 +1,16 @@
+-- idを明示して一括投入したテーブルのシーケンスを、投入済みの最大idまで進める関数
+-- 合成データの投入（app/db/synthetic.py の load_dataset）がテーブルごとに呼び出します
+-- シーケンスを進めないと、以降のアプリケーションからのinsertが投入済みのidと衝突します
+CREATE OR REPLACE FUNCTION sync_id_sequence(p_table TEXT) RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_value BIGINT;
+BEGIN
+    EXECUTE format(
+        'SELECT setval(pg_get_serial_sequence(%L, ''id''), GREATEST(COALESCE((SELECT MAX(id) FROM %I), 0), 1))',
+        p_table, p_table
+    ) INTO v_value;
+    RETURN v_value;
+END;
+$$;
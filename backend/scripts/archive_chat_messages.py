@@ -0,0 +1,38 @@
+"""
+古いチャットメッセージをローカルのアーカイブに移動します（定期実行用）
+
+使い方（backendディレクトリで実行）:
+    python -m scripts.archive_chat_messages --older-than-days 180
+"""
+import argparse
+import time
+
+from app.core.config import settings
+from app.services.chat_archive_service import ChatArchiveService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="古いチャットメッセージをアーカイブします")
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=settings.CHAT_ARCHIVE_AFTER_DAYS,
+        help=f"この日数より古いメッセージを対象にします（既定: {settings.CHAT_ARCHIVE_AFTER_DAYS}）",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000, help="1回のクエリで処理する件数")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = ChatArchiveService().archive_messages_older_than(
+        days=args.older_than_days,
+        batch_size=args.batch_size,
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"{result.archived}件のメッセージを{len(result.sessions)}セッション分アーカイブし、"
+        f"{result.deleted}件をデータベースから削除しました（{elapsed:.1f}秒）"
+    )
+
+
+if __name__ == "__main__":
+    main()
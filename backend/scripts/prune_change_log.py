@@ -0,0 +1,31 @@
+"""
+保持期間を過ぎた差分同期の変更履歴（change_log）を削除します（定期実行用）
+
+使い方（backendディレクトリで実行）:
+    python -m scripts.prune_change_log --retention-days 30
+"""
+import argparse
+import time
+
+from app.core.config import settings
+from app.services.sync_service import SyncService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="古い変更履歴を削除します")
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=settings.CHANGE_LOG_RETENTION_DAYS,
+        help=f"この日数より古い変更履歴を削除します（既定: {settings.CHANGE_LOG_RETENTION_DAYS}）",
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    deleted = SyncService().prune_change_log(days=args.retention_days)
+    elapsed = time.perf_counter() - started
+    print(f"{deleted}件の変更履歴を削除しました（{elapsed:.1f}秒）")
+
+
+if __name__ == "__main__":
+    main()
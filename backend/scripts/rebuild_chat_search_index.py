@@ -0,0 +1,26 @@
+"""
+チャットメッセージ全文検索インデックスをデータベースから再構築します
+
+使い方（backendディレクトリで実行）:
+    python -m scripts.rebuild_chat_search_index --organization-id 1
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.chat_search_service import ChatSearchService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="チャット全文検索インデックスを再構築します")
+    parser.add_argument("--organization-id", type=int, required=True, help="対象の組織ID")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = asyncio.run(ChatSearchService().rebuild(args.organization_id))
+    elapsed = time.perf_counter() - started
+    print(f"組織ID {args.organization_id}: {len(index)}件のメッセージをインデックスしました（{elapsed:.1f}秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+合成営農データを生成して投入します（性能検証用）
+
+使い方（backendディレクトリで実行）:
+    # Supabase（またはDATABASE_BACKEND=localのインメモリ）へ一括insertで投入
+    python -m scripts.seed_synthetic_data --scale 1.0 --batch-size 5000 --concurrency 4
+
+    # PostgreSQLのCOPY用CSVを書き出す（出力先で psql -f load.sql を実行）
+    python -m scripts.seed_synthetic_data --scale 1.0 --copy-dir data/synthetic
+"""
+import argparse
+import sys
+from dataclasses import fields as dataclass_fields
+
+from app.db.synthetic import ID_BLOCK_SIZE, SyntheticDataGenerator, SyntheticScale, load_dataset, write_copy_files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="合成営農データを生成して投入します")
+    parser.add_argument("--scale", type=float, default=1.0, help="既定のデータ量に掛ける係数")
+    for item in dataclass_fields(SyntheticScale):
+        parser.add_argument(
+            f"--{item.name.replace('_', '-')}", type=int, dest=item.name,
+            help=f"{item.name}の件数（既定: {item.default} × scale）",
+        )
+    parser.add_argument("--organization-id", type=int, default=1, help="投入先の組織ID")
+    parser.add_argument(
+        "--id-offset", type=int,
+        help=f"生成するidのオフセット（既定: 組織ID × {ID_BLOCK_SIZE:,}。既存データ・他の組織のidと重ならないようにします）",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード（同じ値なら同じデータになります）")
+    parser.add_argument("--table", action="append", help="投入するテーブル（複数指定可、省略時は全て）")
+    parser.add_argument("--batch-size", type=int, default=5000, help="1回のinsertで送る行数")
+    parser.add_argument("--concurrency", type=int, default=4, help="並行して送信するバッチ数")
+    parser.add_argument("--copy-dir", help="指定した場合はデータベースに投入せず、COPY用のCSVを書き出します")
+    args = parser.parse_args()
+
+    scale = SyntheticScale().scaled(args.scale)
+    for item in dataclass_fields(SyntheticScale):
+        if getattr(args, item.name) is not None:
+            setattr(scale, item.name, getattr(args, item.name))
+
+    id_offset = args.id_offset
+    if id_offset is None:
+        id_offset = SyntheticDataGenerator.default_id_offset(args.organization_id)
+        # planting_plan_fieldsは1計画あたり最大3件
+        largest = max(max(getattr(scale, item.name) for item in dataclass_fields(SyntheticScale)), scale.planting_plans * 3)
+        if largest >= ID_BLOCK_SIZE:
+            parser.error(f"1組織あたり{ID_BLOCK_SIZE:,}件を超えるため、--id-offsetを指定してください")
+    generator = SyntheticDataGenerator(scale, organization_id=args.organization_id, seed=args.seed, id_offset=id_offset)
+
+    if args.copy_dir:
+        result = write_copy_files(generator, args.copy_dir, tables=args.table)
+    else:
+        from app.db.session import get_supabase_client
+
+        def progress(table: str, total: int) -> None:
+            print(f"\r{table}: {total}行", end="", file=sys.stderr, flush=True)
+
+        result = load_dataset(
+            get_supabase_client(),
+            generator,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            tables=args.table,
+            progress=progress,
+        )
+        print(file=sys.stderr)
+
+    for table, count in result.counts.items():
+        print(f"{table}: {count}行")
+    print(
+        f"合計 {sum(result.counts.values())}行 / {result.seconds:.1f}秒"
+        f"（{result.rows_per_minute:,.0f}行/分）"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+テスト共通の設定
+
+アプリケーション（設定）の読み込み前に、外部のSupabase・AIモデルの代わりに
+ローカルバックエンドを使うように環境変数を設定します
+"""
+import pytest
+
+from benchmarks import harness
+
+harness.configure_environment()
+
+
+@pytest.fixture
+def local_backend():
+    """
+    データを空にしたローカルバックエンド（アプリケーションが使う共有のインスタンス）
+    """
+    from app.db.local_backend import get_local_backend
+    from app.services.service_cache import clear_service_caches
+
+    backend = get_local_backend()
+    backend.reset()
+    # データを直接入れ替えるため、変更イベントで破棄されない読み取りキャッシュを破棄する
+    clear_service_caches()
+    return backend
+
+
+@pytest.fixture
+def client(local_backend):
+    """
+    アプリケーションを直接呼び出すテスト用クライアント
+    """
+    from fastapi.testclient import TestClient
+
+    with TestClient(harness.load_app()) as test_client:
+        yield test_client
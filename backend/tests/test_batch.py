@@ -0,0 +1,58 @@
+from app.core.config import settings
+from app.services.user_service import UserService
+
+API = settings.API_V1_STR
+
+
+def _seed(backend) -> None:
+    backend.table("users").insert({
+        "id": "1", "organization_id": 1, "name": "管理者", "email": "admin@example.com", "role": "admin",
+        "created_at": "2024-05-01T00:00:00", "updated_at": "2024-05-01T00:00:00",
+    }).execute()
+    backend.table("fields").insert({
+        "id": 1, "organization_id": 1, "name": "北圃場", "coordinates": "[]", "area": 1.0,
+        "created_at": "2024-05-01T00:00:00", "updated_at": "2024-05-01T00:00:00",
+    }).execute()
+
+
+def test_mixed_batch_returns_per_item_statuses_in_order(client, local_backend):
+    _seed(local_backend)
+    etag = client.get(f"{API}/fields/").headers["etag"]
+    token = UserService().create_access_token(user_id="1")
+
+    response = client.post(f"{API}/batch", headers={"Authorization": f"Bearer {token}"}, json={"requests": [
+        {"id": "fields", "path": "/fields/?limit=10"},
+        {"id": "missing", "path": "/fields/999"},
+        {"id": "cached", "path": "/fields/", "if_none_match": etag},
+        {"id": "summary", "path": "/dashboard/summary"},
+    ]})
+
+    assert response.status_code == 200
+    items = response.json()["responses"]
+    assert [(item["id"], item["status"]) for item in items] == [
+        ("fields", 200), ("missing", 404), ("cached", 304), ("summary", 200),
+    ]
+    assert [field["name"] for field in items[0]["body"]] == ["北圃場"]
+    assert items[0]["etag"] == etag
+    assert items[2]["body"] is None
+    # 認証情報は副リクエストに引き継がれる
+    assert items[3]["body"]["field_count"] == 1
+
+
+def test_batch_rejects_recursion_and_external_urls(client, local_backend):
+    response = client.post(f"{API}/batch", json={"requests": [
+        {"path": "/batch"},
+        {"path": "/batch/?x=1"},
+        {"path": "http://example.com/fields/"},
+        {"path": "fields/"},
+    ]})
+
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["responses"]] == [400, 400, 400, 400]
+
+
+def test_batch_limits_the_number_of_requests(client, local_backend):
+    requests = [{"path": "/fields/"}] * (settings.BATCH_MAX_REQUESTS + 1)
+
+    assert client.post(f"{API}/batch", json={"requests": requests}).status_code == 400
+    assert client.post(f"{API}/batch", json={"requests": []}).status_code == 400
@@ -0,0 +1,62 @@
+import asyncio
+
+from app.core import events
+from app.db.local_backend import LocalBackend
+from app.services.field_service import FieldService
+from app.services.service_cache import org_tag
+from app.utils.cache_utils import ReadThroughCache
+
+
+def test_invalidation_only_discards_loads_with_matching_tags():
+    async def main():
+        cache = ReadThroughCache()
+        release = asyncio.Event()
+
+        async def load(value):
+            await release.wait()
+            return value
+
+        org1 = asyncio.create_task(cache.get_or_load("org1", lambda: load("組織1"), tags=[org_tag(1)]))
+        org2 = asyncio.create_task(cache.get_or_load("org2", lambda: load("組織2"), tags=[org_tag(2)]))
+        await asyncio.sleep(0)
+        # 取得中に組織1だけが変更された
+        cache.invalidate_tags(org_tag(1))
+        release.set()
+        await asyncio.gather(org1, org2)
+        return cache
+
+    cache = asyncio.run(main())
+
+    assert "org1" not in cache._data
+    assert "org2" in cache._data
+    assert cache._tag_invalidated_at == {}
+
+
+def test_clear_discards_every_in_flight_load():
+    async def main():
+        cache = ReadThroughCache()
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return "値"
+
+        task = asyncio.create_task(cache.get_or_load("key", load, tags=[org_tag(1)]))
+        await asyncio.sleep(0)
+        cache.clear()
+        release.set()
+        await task
+        return cache
+
+    assert len(asyncio.run(main())) == 0
+
+
+def test_deleting_a_missing_field_publishes_nothing():
+    published = []
+    events.subscribe(published.append)
+    try:
+        asyncio.run(FieldService(supabase=LocalBackend(latency_ms=0)).delete_field(12345))
+    finally:
+        events.unsubscribe(published.append)
+
+    assert published == []
@@ -0,0 +1,50 @@
+import asyncio
+from datetime import date
+
+from fastapi import Request, Response
+
+from app.api.api_v1.endpoints.calendar import calendar_flights, get_calendar_events
+from app.models.planting_plan import PlantingPlan
+
+
+class _FakePlantingPlanService:
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def get_planting_plans(self, organization_id, skip=0, limit=100):
+        self.calls += 1
+        await self.release.wait()
+        return [PlantingPlan(
+            id=1, plan_name="春トマト", crop_id=1, organization_id=organization_id,
+            planting_date=date(2024, 4, 10), harvest_date=date(2024, 7, 1), status="計画中",
+            updated_at="2024-03-01T00:00:00",
+        )]
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/api/v1/calendar/events", "headers": []})
+
+
+def test_concurrent_calendar_requests_share_one_build():
+    async def main():
+        service = _FakePlantingPlanService()
+        executions = calendar_flights.executions
+
+        async def fetch(start_date, end_date):
+            return await get_calendar_events(_request(), Response(), start_date, end_date, service)
+
+        april = [asyncio.create_task(fetch(date(2024, 4, 1), date(2024, 4, 30))) for _ in range(5)]
+        july = asyncio.create_task(fetch(date(2024, 7, 1), date(2024, 7, 31)))
+        await asyncio.sleep(0.01)
+        service.release.set()
+        results = await asyncio.gather(*april, july)
+        return service.calls, calendar_flights.executions - executions, results
+
+    calls, executions, results = asyncio.run(main())
+
+    # 期間ごとに1回だけ取得・組み立てを行い、同じ期間の呼び出しは結果を共有する
+    assert calls == 2
+    assert executions == 2
+    assert all([event.id for event in events] == ["planting-1"] for events in results[:5])
+    assert [event.id for event in results[5]] == ["harvest-1"]
@@ -0,0 +1,43 @@
+import asyncio
+import logging
+
+from app.db.local_backend import LocalBackend
+from app.services.chat_agent_service import ChatAgentService, LocalAgentModel, ToolCall
+
+
+class _BrokenFieldService:
+    async def get_field(self, field_id):
+        raise TypeError("内部の不具合")
+
+
+def _service(**kwargs) -> ChatAgentService:
+    return ChatAgentService(supabase=LocalBackend(latency_ms=0), model=LocalAgentModel(), **kwargs)
+
+
+def _run(service: ChatAgentService, call: ToolCall):
+    return asyncio.run(service.execute_tool_calls([call], organization_id=1))[call.id]
+
+
+def test_arguments_are_checked_against_the_tool_schema():
+    service = _service()
+
+    assert _run(service, ToolCall("1", "get_field", {})) == {"error": "引数が不正です: 必須の引数がありません: field_id"}
+    assert _run(service, ToolCall("2", "get_field", {"field_id": "abc"})) == {
+        "error": "引数が不正です: field_idはintegerで指定してください"
+    }
+    assert _run(service, ToolCall("3", "list_fields", {"limit": 1000})) == {
+        "error": "引数が不正です: limitは100以下を指定してください"
+    }
+    assert _run(service, ToolCall("4", "update_task_status", {"task_id": 1, "status": "done"}))["error"].startswith(
+        "引数が不正です: statusは"
+    )
+
+
+def test_internal_type_errors_are_logged_not_blamed_on_arguments(caplog):
+    service = _service(field_service=_BrokenFieldService())
+
+    with caplog.at_level(logging.ERROR, logger="app.services.chat_agent_service"):
+        result = _run(service, ToolCall("1", "get_field", {"field_id": 1}))
+
+    assert result == {"error": "内部の不具合"}
+    assert any(record.exc_info and record.exc_info[0] is TypeError for record in caplog.records)
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db.local_backend import LocalBackend
+from app.services.chat_archive_service import ChatArchiveService
+
+
+def _message(message_id: int, days_ago: int, session_id: int = 1) -> dict:
+    return {
+        "id": message_id,
+        "session_id": session_id,
+        "role": "user",
+        "content": f"メッセージ{message_id}",
+        "created_at": (datetime.utcnow() - timedelta(days=days_ago)).isoformat(),
+    }
+
+
+@pytest.fixture
+def backend():
+    return LocalBackend(latency_ms=0)
+
+
+@pytest.fixture
+def service(backend, tmp_path):
+    return ChatArchiveService(supabase=backend, archive_dir=str(tmp_path), block_size=2)
+
+
+def _remaining_ids(backend) -> list:
+    return sorted(row["id"] for row in backend.table("chat_messages").select("id").execute().data)
+
+
+def test_archive_keeps_messages_aged_out_of_id_order(backend, service):
+    # ID 2は先に期限切れになり、ID 1は後から期限切れになる（作成日時とIDの順が一致しない）
+    backend.table("chat_messages").insert([_message(1, days_ago=20), _message(2, days_ago=40)]).execute()
+
+    first = service.archive_messages_older_than(days=30)
+    assert (first.archived, first.deleted) == (1, 1)
+    assert _remaining_ids(backend) == [1]
+
+    second = service.archive_messages_older_than(days=10)
+    assert (second.archived, second.deleted) == (1, 1)
+    assert _remaining_ids(backend) == []
+
+    # アーカイブ済みの最大IDより小さいIDも失われずにアーカイブされている
+    assert sorted(row["id"] for row in service.get_messages_by_ids(1, [1, 2])) == [1, 2]
+    assert [row["id"] for row in service.get_messages(1, limit=10)] == [2, 1]
+
+
+def test_append_reports_already_archived_ids(service):
+    rows = [_message(message_id, days_ago=40) for message_id in (3, 5)]
+    assert service.append(1, rows).written == [3, 5]
+
+    # 再実行（削除前に中断した場合など）では書き込まず、存在を確認したIDだけを返す
+    retry = service.append(1, rows + [_message(4, days_ago=40)])
+    assert retry.written == [4]
+    assert retry.present == [3, 5]
+    assert sorted(retry.ids) == [3, 4, 5]
+    assert [row["id"] for row in service.get_messages(1, limit=10)] == [5, 4, 3]
+    assert [row["id"] for row in service.get_messages(1, before=5, limit=1)] == [4]
@@ -0,0 +1,89 @@
+import asyncio
+from datetime import date
+
+from app.models.planting_plan import PlantingPlan
+from app.services.chat_intent_service import ChatIntentService
+
+
+class _FakeTaskService:
+    def __init__(self, tasks=None):
+        self.tasks = tasks or []
+        self.calls = 0
+
+    async def get_tasks_scheduled_between(self, organization_id, start, end, limit=50):
+        self.calls += 1
+        return self.tasks
+
+
+class _FakePlantingPlanService:
+    def __init__(self, plans=None):
+        self.plans = plans or []
+        self.crop_names = []
+
+    async def find_planting_plans_by_crop_name(self, organization_id, crop_name, limit=20):
+        self.crop_names.append(crop_name)
+        return self.plans
+
+
+class _FakeResourceService:
+    def __init__(self, resources=None):
+        self.resources = resources or []
+        self.keywords = []
+
+    async def find_resources_by_name(self, organization_id, keyword, limit=10):
+        self.keywords.append(keyword)
+        return self.resources
+
+
+def _service(tasks=None, plans=None, resources=None) -> ChatIntentService:
+    return ChatIntentService(
+        supabase=object(),
+        task_service=_FakeTaskService(tasks),
+        planting_plan_service=_FakePlantingPlanService(plans),
+        resource_service=_FakeResourceService(resources),
+    )
+
+
+def _plan() -> PlantingPlan:
+    return PlantingPlan(
+        id=1,
+        plan_name="春トマト",
+        crop_id=1,
+        organization_id=1,
+        planting_date=date(2024, 4, 10),
+        harvest_date=date(2024, 7, 1),
+        status="planned",
+    )
+
+
+def test_remaining_work_today_is_not_a_stock_question():
+    service = _service()
+
+    assert asyncio.run(service.answer("今日の残り作業", 1)) is None
+    assert service.resource_service.keywords == []
+
+
+def test_planting_tips_are_not_a_planting_date_question():
+    service = _service(plans=[("トマト", _plan())])
+
+    assert asyncio.run(service.answer("トマトの植え付けのコツは？", 1)) is None
+    assert service.planting_plan_service.crop_names == []
+
+
+def test_planting_date_question_is_answered_from_plans():
+    service = _service(plans=[("トマト", _plan())])
+
+    response = asyncio.run(service.answer("トマトの定植日はいつ？", 1))
+
+    assert "2024-04-10" in response
+    assert service.planting_plan_service.crop_names == ["トマト"]
+
+
+def test_falls_back_to_the_model_when_nothing_is_found():
+    service = _service()
+
+    assert asyncio.run(service.answer("堆肥の在庫は？", 1)) is None
+    assert asyncio.run(service.answer("キャベツの収穫予定は？", 1)) is None
+    assert asyncio.run(service.answer("今日の作業は？", 1)) is None
+    assert service.resource_service.keywords == ["堆肥"]
+    assert service.task_service.calls == 1
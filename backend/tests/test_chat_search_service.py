@@ -0,0 +1,113 @@
+import asyncio
+import threading
+from datetime import datetime
+
+from app.db.local_backend import LocalBackend
+from app.services import chat_search_service
+from app.services.chat_archive_service import ChatArchiveService
+from app.services.chat_search_service import ChatSearchIndex, ChatSearchService, build_snippet, parse_search_query
+from app.utils.text_utils import normalize_text, normalize_text_with_offsets
+
+
+def _index(*messages: str) -> ChatSearchIndex:
+    index = ChatSearchIndex()
+    for message_id, content in enumerate(messages, start=1):
+        index.add(message_id, 1, content)
+    return index
+
+
+def _search(index: ChatSearchIndex, query: str) -> list:
+    parsed = parse_search_query(query)
+    return sorted(candidate.message_id for candidate in index.candidates(parsed.grams, chars=parsed.chars))
+
+
+def test_single_character_terms_are_searchable():
+    index = _index("育苗ハウスの温度を確認", "苗を定植しました", "北の畑に肥料", "畑")
+    assert _search(index, "苗") == [1, 2]
+    assert _search(index, "畑") == [3, 4]
+    # 1文字の語と2文字以上の語はAND条件で組み合わせる
+    assert _search(index, "苗 定植") == [2]
+    assert _search(index, "芽") == []
+
+
+def test_normalized_offsets_match_normalize_text():
+    for text in ("ｶﾞｲﾄﾞを確認", "㈱テスト農園", "ＡＢＣ　トマト", "ﾊﾟｲﾌﾟﾊｳｽ"):
+        normalized, offsets = normalize_text_with_offsets(text)
+        assert normalized == normalize_text(text)
+        assert len(offsets) == len(normalized)
+
+
+def test_snippet_is_aligned_after_normalization():
+    content = "㈱" * 30 + "ｶﾞｲﾄﾞ" * 10 + "トマトの定植" + "あ" * 60
+    snippet = build_snippet(content, ["トマト"], width=10)
+    assert "トマト" in snippet
+
+
+def _seed_messages(backend, organization_id: int = 1):
+    now = datetime.utcnow()
+    session = backend.table("chat_sessions").insert({
+        "organization_id": organization_id, "title": "相談", "created_at": now.isoformat(), "updated_at": now.isoformat(),
+    }).execute().data[0]
+    rows = []
+    for content in ("育苗ハウスの温度", "トマトの定植", "畑の排水"):
+        rows.append(backend.table("chat_messages").insert({
+            "session_id": session["id"], "organization_id": organization_id, "content": content,
+            "is_from_ai": False, "created_at": now.isoformat(),
+        }).execute().data[0])
+    return session, rows
+
+
+def test_rebuild_includes_archived_messages(tmp_path):
+    backend = LocalBackend(latency_ms=0)
+    session, rows = _seed_messages(backend)
+    archive = ChatArchiveService(supabase=backend, archive_dir=str(tmp_path / "archive"))
+    # 最初のメッセージをアーカイブに移動する
+    archive.append(session["id"], rows[:1])
+    backend.table("chat_messages").delete().eq("id", rows[0]["id"]).execute()
+
+    service = ChatSearchService(supabase=backend, index_dir=str(tmp_path / "index"), archive_service=archive)
+    try:
+        index = asyncio.run(service.rebuild(1))
+        assert len(index) == 3
+        _, candidates = asyncio.run(service.search(1, "育苗"))
+        assert [candidate.message_id for candidate in candidates] == [rows[0]["id"]]
+    finally:
+        ChatSearchService.reset()
+
+
+def test_messages_can_be_added_while_saving(tmp_path, monkeypatch):
+    backend = LocalBackend(latency_ms=0)
+    _seed_messages(backend)
+    service = ChatSearchService(supabase=backend, index_dir=str(tmp_path))
+    try:
+        index = asyncio.run(service.load_index(1))
+        pickling = threading.Event()
+        release = threading.Event()
+        original_dump = chat_search_service.pickle.dump
+
+        def slow_dump(*args, **kwargs):
+            pickling.set()
+            release.wait(5)
+            original_dump(*args, **kwargs)
+
+        monkeypatch.setattr(chat_search_service.pickle, "dump", slow_dump)
+        index.add(100, 1, "保存中の追加前")
+        saver = threading.Thread(target=service.save, args=(1,))
+        saver.start()
+        assert pickling.wait(5)
+
+        # 直列化の間もロックを保持しないため、追加が待たされない
+        adder = threading.Thread(target=index.add, args=(101, 1, "保存中に追加したメッセージ"))
+        adder.start()
+        adder.join(1)
+        assert not adder.is_alive()
+
+        release.set()
+        saver.join(5)
+        # 複製の後に追加した分は未保存として残る
+        assert index.dirty == 1
+        monkeypatch.setattr(chat_search_service.pickle, "dump", original_dump)
+        saved = service._load(1)
+        assert 100 in saved.slots and 101 not in saved.slots
+    finally:
+        ChatSearchService.reset()
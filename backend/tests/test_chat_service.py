@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.events import publish_change
+from app.db.local_backend import LocalBackend
+from app.services.chat_agent_service import AgentResult
+from app.services.chat_archive_service import ChatArchiveService
+from app.schemas.chat import ChatMessageCreate, ChatSessionCreate
+from app.services.chat_service import LAST_MESSAGE_PREVIEW_LENGTH, ChatService, response_cache
+
+
+@pytest.fixture
+def backend():
+    return LocalBackend(latency_ms=0)
+
+
+def _chat_service(backend, tmp_path, **kwargs) -> ChatService:
+    archive_service = ChatArchiveService(supabase=backend, archive_dir=str(tmp_path / "archive"), block_size=2)
+    return ChatService(supabase=backend, archive_service=archive_service, **kwargs)
+
+
+def _insert_messages(backend, session_id: int, ages_in_days) -> None:
+    now = datetime.utcnow()
+    backend.table("chat_messages").insert([
+        {
+            "id": message_id,
+            "session_id": session_id,
+            "organization_id": 1,
+            "content": f"メッセージ{message_id}",
+            "is_from_ai": message_id % 2 == 0,
+            "created_at": (now - timedelta(days=days)).isoformat(),
+        }
+        for message_id, days in enumerate(ages_in_days, start=1)
+    ]).execute()
+
+
+@pytest.mark.parametrize("limit, expected", [
+    (2, [[6, 5], [4, 3], [2, 1]]),
+    # データベースの残りがちょうど1ページ分の場合も、続きがアーカイブにあることを返す
+    (3, [[6, 5, 4], [3, 2, 1]]),
+])
+def test_message_pages_continue_across_the_archive_boundary(backend, tmp_path, limit, expected):
+    service = _chat_service(backend, tmp_path)
+    # ID 1〜3はアーカイブへ移り、ID 4〜6はデータベースに残る
+    _insert_messages(backend, session_id=1, ages_in_days=[40, 40, 40, 1, 1, 1])
+    service.archive_service.archive_messages_older_than(days=30)
+
+    pages = []
+    cursor = None
+    while True:
+        messages, cursor = asyncio.run(service.get_messages(1, before=cursor, limit=limit))
+        pages.append([message.id for message in messages])
+        if cursor is None:
+            break
+
+    assert pages == expected
+
+
+def test_session_list_includes_the_latest_message_in_one_query(backend, tmp_path, monkeypatch):
+    service = _chat_service(backend, tmp_path)
+
+    async def setup():
+        first = await service.create_chat_session(ChatSessionCreate(title="相談1"), organization_id=1)
+        second = await service.create_chat_session(ChatSessionCreate(title="相談2"), organization_id=1)
+        await service.add_message(first.id, ChatMessageCreate(content="質問", is_from_ai=False), organization_id=1)
+        await service.add_message(first.id, ChatMessageCreate(content="回答" * 200, is_from_ai=True), organization_id=1)
+        return first, second
+
+    first, second = asyncio.run(setup())
+
+    executed = []
+    execute = backend.execute
+    monkeypatch.setattr(backend, "execute", lambda query: executed.append(query) or execute(query))
+    sessions = asyncio.run(service.get_chat_sessions(1, include_last_message=True))
+
+    assert len(executed) == 1
+    by_id = {session.id: session for session in sessions}
+    assert by_id[first.id].message_count == 2
+    assert by_id[first.id].last_message.is_from_ai is True
+    assert by_id[first.id].last_message.content == ("回答" * 200)[:LAST_MESSAGE_PREVIEW_LENGTH]
+    assert by_id[second.id].last_message is None
+    assert all(session.last_message is None for session in asyncio.run(service.get_chat_sessions(1)))
+
+
+class _NoIntent:
+    async def answer(self, user_message, organization_id):
+        return None
+
+
+class _CountingAgent:
+    enabled = True
+
+    def __init__(self, wrote_data: bool = False):
+        self.questions = []
+        self.wrote_data = wrote_data
+
+    async def run(self, user_message, organization_id, session_history):
+        self.questions.append((organization_id, user_message))
+        return AgentResult(content=f"回答{len(self.questions)}", wrote_data=self.wrote_data)
+
+
+@pytest.fixture
+def agent():
+    response_cache.clear()
+    yield _CountingAgent()
+    response_cache.clear()
+
+
+def _respond(service: ChatService, message: str, organization_id: int = 1) -> str:
+    return asyncio.run(service.respond(message, organization_id, []))
+
+
+def test_response_cache_key_ignores_spacing_and_punctuation(backend, tmp_path, agent):
+    service = _chat_service(backend, tmp_path, intent_service=_NoIntent(), agent_service=agent)
+
+    assert _respond(service, "トマトの 病気は？") == "回答1"
+    assert _respond(service, "トマトの病気は?") == "回答1"
+    # 組織が違えば別の応答としてキャッシュする
+    assert _respond(service, "トマトの病気は?", organization_id=2) == "回答2"
+    assert len(agent.questions) == 2
+
+
+def test_response_cache_is_invalidated_per_organization(backend, tmp_path, agent):
+    service = _chat_service(backend, tmp_path, intent_service=_NoIntent(), agent_service=agent)
+    _respond(service, "今週の作業は？", organization_id=1)
+    _respond(service, "今週の作業は？", organization_id=2)
+
+    publish_change(1, "tasks", 10, "updated")
+
+    assert _respond(service, "今週の作業は？", organization_id=1) == "回答3"
+    assert _respond(service, "今週の作業は？", organization_id=2) == "回答2"
+
+
+def test_responses_that_wrote_data_are_not_cached(backend, tmp_path, agent):
+    agent.wrote_data = True
+    service = _chat_service(backend, tmp_path, intent_service=_NoIntent(), agent_service=agent)
+
+    _respond(service, "作業1を完了にして")
+    _respond(service, "作業1を完了にして")
+
+    assert len(agent.questions) == 2
@@ -0,0 +1,24 @@
+import pytest
+
+from app.middleware import compression
+from app.middleware.compression import choose_encoding
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, br", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br;q=0.2, gzip;q=0.8", "gzip"),
+    ("br;q=0.9, gzip;q=0.8", "br"),
+    ("*;q=0.5, gzip;q=0.9", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("identity", None),
+])
+def test_choose_encoding_uses_the_highest_quality(monkeypatch, accept_encoding, expected):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert choose_encoding(accept_encoding) == expected
+
+
+def test_choose_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip;q=0.5") == "gzip"
+    assert choose_encoding("br") is None
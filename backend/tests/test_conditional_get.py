@@ -0,0 +1,48 @@
+from app.core.config import settings
+
+API = settings.API_V1_STR
+
+
+def _seed(backend) -> None:
+    backend.table("fields").insert({
+        "id": 1, "organization_id": 1, "name": "北圃場", "coordinates": "[]", "area": 1.0,
+        "created_at": "2024-05-01T00:00:00", "updated_at": "2024-05-01T00:00:00",
+    }).execute()
+    backend.table("tasks").insert({
+        "id": 1, "organization_id": 1, "field_id": 1, "task_type": "防除", "status": "pending",
+        "scheduled_date": "2024-05-10T08:00:00", "created_at": "2024-05-01T00:00:00", "updated_at": "2024-05-01T00:00:00",
+    }).execute()
+
+
+def test_tasks_revalidate_with_etag(client, local_backend):
+    _seed(local_backend)
+
+    first = client.get(f"{API}/tasks/")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+
+    not_modified = client.get(f"{API}/tasks/", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    # 別の条件の一覧は別のETagになる
+    filtered = client.get(f"{API}/tasks/", params={"status": "completed"}, headers={"If-None-Match": etag})
+    assert filtered.status_code == 200
+
+    assert client.put(f"{API}/tasks/1", json={"status": "completed"}).status_code == 200
+    changed = client.get(f"{API}/tasks/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_fields_revalidate_with_etag(client, local_backend):
+    _seed(local_backend)
+
+    etag = client.get(f"{API}/fields/").headers["etag"]
+    assert client.get(f"{API}/fields/", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.put(f"{API}/fields/1", json={"name": "南圃場"}).status_code == 200
+    changed = client.get(f"{API}/fields/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()[0]["name"] == "南圃場"
@@ -0,0 +1,35 @@
+import asyncio
+from datetime import date
+
+from app.db.local_backend import LocalBackend
+from app.services.dashboard_service import DashboardService
+
+
+def _task(scheduled_date, status="pending", organization_id=1) -> dict:
+    return {
+        "organization_id": organization_id,
+        "field_id": 1,
+        "task_type": "防除",
+        "status": status,
+        "scheduled_date": scheduled_date,
+    }
+
+
+def test_due_today_and_overdue_boundaries():
+    backend = LocalBackend(latency_ms=0)
+    backend.table("tasks").insert([
+        _task("2024-05-10T00:00:00"),                         # 今日の0時: 今日が期限
+        _task("2024-05-10T23:59:59", status="in_progress"),   # 今日の最後: 今日が期限
+        _task("2024-05-09T23:59:59"),                         # 昨日の最後: 期限切れ
+        _task("2024-05-11T00:00:00"),                         # 明日の0時: どちらでもない
+        _task("2024-05-10T08:00:00", status="completed"),     # 完了済みは数えない
+        _task("2024-05-01T08:00:00", status="completed"),
+        _task(None),                                          # 予定日なし
+        _task("2024-05-01T08:00:00", organization_id=2),      # 他の組織
+    ]).execute()
+
+    summary = asyncio.run(DashboardService(supabase=backend).get_summary(1, today=date(2024, 5, 10)))
+
+    assert summary["tasks_due_today"] == 2
+    assert summary["tasks_overdue"] == 1
+    assert summary["tasks_by_status"] == {"pending": 4, "in_progress": 1, "completed": 2}
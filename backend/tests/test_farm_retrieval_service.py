@@ -0,0 +1,30 @@
+import asyncio
+
+from app.core.events import publish_change
+from app.db.local_backend import LocalBackend
+from app.services.farm_retrieval_service import FarmRetrievalService
+
+
+def test_changes_during_build_are_applied_after_build():
+    backend = LocalBackend(latency_ms=0)
+    backend.table("fields").insert([
+        {"id": 1, "organization_id": 7, "name": "北の圃場", "area": 1.0, "coordinates": "[]"},
+        {"id": 2, "organization_id": 7, "name": "南の圃場", "area": 2.0, "coordinates": "[]"},
+    ]).execute()
+    FarmRetrievalService.reset()
+    service = FarmRetrievalService(supabase=backend)
+
+    def build_with_change(organization_id):
+        index = FarmRetrievalService._build_index(service, organization_id)
+        # 読み取り済みの行が構築中（公開前）に変更された場合
+        publish_change(organization_id, "fields", 1, "updated", {"id": 1, "organization_id": organization_id, "name": "改名後の圃場"})
+        return index
+
+    service._build_index = build_with_change
+    try:
+        results = asyncio.run(service.search(7, "改名後", top_k=1))
+        assert [(record.entity, record.entity_id) for record in results] == [("fields", 1)]
+        assert "改名後の圃場" in results[0].text
+        assert FarmRetrievalService._pending == {}
+    finally:
+        FarmRetrievalService.reset()
@@ -0,0 +1,53 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.api.responses import FastJSONResponse
+from app.models.chat import ChatMessagePreview
+from app.utils import json_utils
+from app.utils.json_utils import dumps, loads
+
+_VALUE = {
+    "date": date(2024, 5, 10),
+    "datetime": datetime(2024, 5, 10, 8, 30),
+    "amount": Decimal("1.5"),
+    "tags": ("有機", "ハウス"),
+    1: "整数のキー",
+    "message": ChatMessagePreview(id=1, content="質問", is_from_ai=False, created_at=datetime(2024, 5, 10)),
+}
+_EXPECTED = {
+    "date": "2024-05-10",
+    "datetime": "2024-05-10T08:30:00",
+    "amount": 1.5,
+    "tags": ["有機", "ハウス"],
+    "1": "整数のキー",
+    "message": {"id": 1, "content": "質問", "is_from_ai": False, "created_at": "2024-05-10T00:00:00"},
+}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_is_the_same_with_and_without_orjson(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(json_utils, "orjson", None)
+    elif json_utils.orjson is None:
+        pytest.skip("orjsonがインストールされていません")
+
+    encoded = dumps(_VALUE)
+
+    assert loads(encoded) == _EXPECTED
+    # 空白を含まず、日本語はエスケープしない
+    assert b", " not in encoded
+    assert "整数のキー".encode("utf-8") in encoded
+
+
+def test_dumps_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_fast_json_response_renders_with_dumps():
+    response = FastJSONResponse({"date": date(2024, 5, 10), "name": "北圃場"})
+
+    assert response.body == '{"date":"2024-05-10","name":"北圃場"}'.encode("utf-8")
+    assert response.headers["content-type"] == "application/json"
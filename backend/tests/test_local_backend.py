@@ -0,0 +1,64 @@
+import pytest
+
+from app.db.local_backend import LocalBackend, LocalBackendError
+
+
+@pytest.fixture
+def backend():
+    backend = LocalBackend(latency_ms=0)
+    backend.table("resources").insert([
+        {"id": 1, "organization_id": 1, "name": "化成肥料", "quantity": 10},
+        {"id": 2, "organization_id": 1, "name": "有機肥料", "quantity": None},
+        {"id": 3, "organization_id": 1, "name": "100%_液肥", "quantity": 5},
+        {"id": 4, "organization_id": 2, "name": "化成肥料", "quantity": 7},
+    ]).execute()
+    return backend
+
+
+def _ids(query) -> list:
+    return [row["id"] for row in query.execute().data]
+
+
+def test_filters(backend):
+    def resources():
+        return backend.table("resources").select("id")
+
+    assert _ids(resources().eq("organization_id", 1).order("id")) == [1, 2, 3]
+    assert _ids(resources().in_("id", [1, 4, 99]).order("id")) == [1, 4]
+    assert _ids(resources().gte("quantity", 5).lt("quantity", 10).order("id")) == [3, 4]
+    assert _ids(resources().is_("quantity", "null")) == [2]
+    assert _ids(resources().not_.is_("quantity", "null").order("id")) == [1, 3, 4]
+    assert _ids(resources().ilike("name", "%肥料").order("id")) == [1, 2, 4]
+    # エスケープした%と_は文字として一致する
+    assert _ids(resources().like("name", "100\\%\\_%")) == [3]
+    assert _ids(resources().like("name", "1\\_0%")) == []
+
+
+def test_order_range_and_count(backend):
+    # PostgreSQLと同じく、NULLは昇順では最後、降順では最初に並ぶ
+    assert _ids(backend.table("resources").select("id").order("quantity")) == [3, 4, 1, 2]
+    assert _ids(backend.table("resources").select("id").order("quantity", desc=True)) == [2, 1, 4, 3]
+
+    response = backend.table("resources").select("id", count="exact").eq("organization_id", 1).order("id").range(1, 2).execute()
+    assert [row["id"] for row in response.data] == [2, 3]
+    assert response.count == 3
+
+
+def test_writes(backend):
+    created = backend.table("resources").insert({"organization_id": 1, "name": "殺虫剤"}).execute().data[0]
+    assert created["id"] == 5
+
+    with pytest.raises(LocalBackendError):
+        backend.table("resources").insert({"id": 1, "organization_id": 1, "name": "重複"}).execute()
+
+    updated = backend.table("resources").update({"quantity": 0}).eq("name", "化成肥料").execute().data
+    assert sorted(row["id"] for row in updated) == [1, 4]
+
+    backend.table("resources").upsert({"id": 1, "organization_id": 1, "name": "上書き"}, ignore_duplicates=True).execute()
+    backend.table("resources").upsert({"id": 2, "organization_id": 1, "name": "上書き"}).execute()
+    names = {row["id"]: row["name"] for row in backend.table("resources").select("id, name").execute().data}
+    assert (names[1], names[2]) == ("化成肥料", "上書き")
+
+    deleted = backend.table("resources").delete().eq("organization_id", 2).execute().data
+    assert [row["id"] for row in deleted] == [4]
+    assert backend.table("resources").delete().eq("id", 99).execute().data == []
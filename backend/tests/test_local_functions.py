@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+from app.db.local_backend import LocalBackend
+
+
+def _record(backend, session_id: int, message_id: int, created_at: datetime, preview: str) -> None:
+    backend.rpc("record_chat_message", {
+        "p_session_id": session_id,
+        "p_message_id": message_id,
+        "p_preview": preview,
+        "p_is_from_ai": False,
+        "p_created_at": created_at.isoformat(),
+    }).execute()
+
+
+def test_record_chat_message_counts_and_keeps_latest_message():
+    backend = LocalBackend(latency_ms=0)
+    now = datetime.utcnow()
+    session = backend.table("chat_sessions").insert({
+        "organization_id": 1, "title": "テスト", "created_at": now.isoformat(), "updated_at": now.isoformat(),
+    }).execute().data[0]
+
+    _record(backend, session["id"], 11, now + timedelta(seconds=2), "新しいメッセージ")
+    # 後から届いた古いメッセージは件数だけを加算し、最新メッセージの列は上書きしない
+    _record(backend, session["id"], 10, now + timedelta(seconds=1), "古いメッセージ")
+
+    row = backend.table("chat_sessions").select("*").eq("id", session["id"]).execute().data[0]
+    assert row["message_count"] == 2
+    assert row["last_message_id"] == 11
+    assert row["last_message_preview"] == "新しいメッセージ"
+    assert row["updated_at"] == (now + timedelta(seconds=2)).isoformat()
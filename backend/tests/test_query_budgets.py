@@ -0,0 +1,33 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks import harness, query_budgets
+from app.services import service_cache
+
+
+@pytest.fixture(scope="module")
+def budget_results():
+    # キャッシュがあるとクエリ数の増加が隠れるため、python -m benchmarks.query_budgets と同じく無効にする
+    caches = list(service_cache._caches.values())
+    enabled = [cache.enabled for cache in caches]
+    for cache in caches:
+        cache.enabled = False
+    try:
+        args = SimpleNamespace(small=0.01, large=0.05, seed=42, route=None)
+        results = asyncio.run(query_budgets.run(args))
+    finally:
+        for cache, value in zip(caches, enabled):
+            cache.enabled = value
+    return {(result.case.method, result.case.label): result for result in results}
+
+
+@pytest.mark.parametrize("case", harness.ROUTE_CASES, ids=lambda case: f"{case.method} {case.label}")
+def test_route_stays_within_query_budget(budget_results, case):
+    result = budget_results[(case.method, case.label)]
+    assert result.ok, "\n".join(result.describe())
+
+
+def test_every_route_has_a_case():
+    assert harness.uncovered_routes(harness.load_app()) == []
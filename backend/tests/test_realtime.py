@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.core.realtime import Subscription, UnixSocketBroker
+
+
+def test_subscription_rejects_a_string_filter():
+    async def main():
+        subscription = Subscription(1, entities=["tasks"])
+        with pytest.raises(ValueError):
+            subscription.set_filters("tasks", None)
+        with pytest.raises(ValueError):
+            subscription.set_filters(["tasks"], [1])
+        # 不正な指定では購読条件を変更しない
+        assert subscription.entities == {"tasks"}
+        assert subscription.actions is None
+
+    asyncio.run(main())
+
+
+def test_unix_broker_forwards_changes_without_the_record(tmp_path):
+    async def main():
+        receiver = UnixSocketBroker(str(tmp_path))
+        await receiver.start()
+        subscription = Subscription(1)
+        receiver.subscribe(subscription)
+
+        sender = UnixSocketBroker(str(tmp_path))
+        sender.path = str(tmp_path / "worker-sender.sock")
+        sender.publish({
+            "type": "change",
+            "organization_id": 1,
+            "entity": "tasks",
+            "id": 5,
+            "action": "updated",
+            "record": {"id": 5, "notes": "x" * 500_000},
+        })
+
+        message = await asyncio.wait_for(subscription.queue.get(), timeout=5)
+        receiver.unsubscribe(subscription)
+        receiver._transport.close()
+        return message
+
+    assert asyncio.run(main()) == {
+        "type": "change",
+        "organization_id": 1,
+        "entity": "tasks",
+        "id": 5,
+        "action": "updated",
+    }
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def _wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("条件を満たしませんでした")
+        time.sleep(0.001)
+
+
+def _follow_in_thread(flight: SingleFlight, key, func):
+    # run_in_threadと同じく、ワーカースレッドの別イベントループから呼び出す
+    executor = ThreadPoolExecutor(max_workers=1)
+    return executor, executor.submit(lambda: asyncio.run(flight.do(key, func)))
+
+
+def test_followers_on_other_loops_share_the_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    async def leader_func():
+        calls.append("leader")
+        while not release.is_set():
+            await asyncio.sleep(0.001)
+        return "結果"
+
+    async def follower_func():
+        calls.append("follower")
+        return "別の結果"
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", leader_func))
+        await asyncio.sleep(0)
+        executor, follower = _follow_in_thread(flight, "key", follower_func)
+        await asyncio.to_thread(_wait_until, lambda: flight.shared == 1)
+        release.set()
+        assert await leader == "結果"
+        assert await asyncio.wrap_future(follower) == "結果"
+        executor.shutdown()
+
+    asyncio.run(main())
+    assert calls == ["leader"]
+
+
+def test_leader_cancellation_lets_a_follower_execute():
+    flight = SingleFlight()
+    calls = []
+
+    async def leader_func():
+        calls.append("leader")
+        await asyncio.sleep(60)
+
+    async def follower_func():
+        calls.append("follower")
+        return "再実行の結果"
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", leader_func))
+        await asyncio.sleep(0)
+        executor, follower = _follow_in_thread(flight, "key", follower_func)
+        await asyncio.to_thread(_wait_until, lambda: flight.shared == 1)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        # 合流していた呼び出しにはキャンセルを伝えず、新たなリーダーとして実行する
+        assert await asyncio.wrap_future(follower) == "再実行の結果"
+        executor.shutdown()
+
+    asyncio.run(main())
+    assert calls == ["leader", "follower"]
+    assert flight.stats()["size"] == 0
+
+
+def test_follower_cancellation_does_not_affect_the_leader():
+    flight = SingleFlight()
+
+    async def main():
+        done = asyncio.Event()
+
+        async def leader_func():
+            await done.wait()
+            return "結果"
+
+        leader = asyncio.create_task(flight.do("key", leader_func))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", leader_func))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+
+        done.set()
+        assert await leader == "結果"
+
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.db.local_backend import LocalBackend
+from app.services.sync_service import SyncService
+
+
+def _log(backend, organization_id: int, entity_id: int, age: timedelta, row_id: Optional[int] = None) -> int:
+    row = {
+        "organization_id": organization_id,
+        "entity": "tasks",
+        "entity_id": entity_id,
+        "action": "deleted",
+        "changed_at": (datetime.now(timezone.utc) - age).isoformat(),
+    }
+    if row_id is not None:
+        row["id"] = row_id
+    return backend.table("change_log").insert(row).execute().data[0]["id"]
+
+
+def _changes(service: SyncService, since: str) -> dict:
+    return asyncio.run(service.get_changes(1, since))
+
+
+def test_recent_changes_are_returned_but_not_passed_by_the_token():
+    backend = LocalBackend(latency_ms=0)
+    service = SyncService(supabase=backend)
+    old_id = _log(backend, 1, 10, timedelta(minutes=5))
+    _log(backend, 1, 12, timedelta(seconds=0), row_id=old_id + 2)
+
+    result = _changes(service, "0")
+    assert sorted(result["changes"]["tasks"]["deleted"]) == [10, 12]
+    assert result["next_token"] == str(old_id)
+
+    # 小さいIDの変更が後からコミットされても次回の同期で取得できる
+    _log(backend, 1, 11, timedelta(seconds=0), row_id=old_id + 1)
+    result = _changes(service, result["next_token"])
+    assert sorted(result["changes"]["tasks"]["deleted"]) == [11, 12]
+    assert result["reset"] is False
+
+
+def test_tokens_older_than_retention_are_reset():
+    backend = LocalBackend(latency_ms=0)
+    service = SyncService(supabase=backend)
+    first = _log(backend, 1, 10, timedelta(days=40))
+    _log(backend, 1, 11, timedelta(days=35))
+    latest = _log(backend, 1, 12, timedelta(days=1))
+
+    assert service.prune_change_log(days=30) == 2
+    result = _changes(service, str(first))
+    assert result["reset"] is True
+    assert result["next_token"] == str(latest)
+
+    result = _changes(service, str(latest - 1))
+    assert result["reset"] is False
@@ -0,0 +1,40 @@
+from app.db.local_backend import LocalBackend
+from app.db.synthetic import SyntheticDataGenerator, SyntheticScale, load_dataset
+
+_SCALE = SyntheticScale(
+    fields=5, crops=3, planting_plans=4, workflow_instances=20, tasks=10,
+    resources=3, chat_sessions=2, chat_messages=6,
+)
+
+
+def _generator(organization_id: int) -> SyntheticDataGenerator:
+    return SyntheticDataGenerator(
+        _SCALE, organization_id=organization_id,
+        id_offset=SyntheticDataGenerator.default_id_offset(organization_id),
+    )
+
+
+def _rows(backend, table: str):
+    return backend.table(table).select("*").execute().data
+
+
+def test_organizations_load_next_to_existing_data():
+    backend = LocalBackend(latency_ms=0)
+    backend.table("organizations").insert({"id": 1, "name": "既存の農場"}).execute()
+    backend.table("fields").insert({"organization_id": 1, "name": "既存の圃場", "coordinates": "[]", "area": 1.0}).execute()
+
+    load_dataset(backend, _generator(1))
+    load_dataset(backend, _generator(2))
+
+    organizations = {row["id"]: row["name"] for row in _rows(backend, "organizations")}
+    assert organizations == {1: "既存の農場", 2: "合成農場2"}
+    assert len(_rows(backend, "fields")) == 1 + 2 * _SCALE.fields
+
+    # 参照先は同じ組織の合成データを指す
+    field_ids = {row["id"]: row["organization_id"] for row in _rows(backend, "fields")}
+    for task in _rows(backend, "tasks"):
+        assert field_ids[task["field_id"]] == task["organization_id"]
+
+    # 投入後のinsertは投入済みのidと衝突しない
+    created = backend.table("fields").insert({"organization_id": 1, "name": "新規", "coordinates": "[]", "area": 1.0}).execute()
+    assert created.data[0]["id"] > max(field_ids)
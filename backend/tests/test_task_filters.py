@@ -0,0 +1,62 @@
+import pytest
+
+from app.core.config import settings
+
+API = settings.API_V1_STR
+_TIMESTAMPS = {"created_at": "2024-05-01T00:00:00", "updated_at": "2024-05-01T00:00:00"}
+
+
+@pytest.fixture
+def tasks(local_backend):
+    local_backend.table("fields").insert([
+        {"id": field_id, "organization_id": 1, "name": f"圃場{field_id}", "coordinates": "[]", "area": 1.0, **_TIMESTAMPS}
+        for field_id in (1, 2)
+    ]).execute()
+    local_backend.table("tasks").insert([
+        {"organization_id": 1, "task_type": "防除", "notes": None, **_TIMESTAMPS, **row}
+        for row in [
+            {"id": 1, "field_id": 1, "status": "pending", "scheduled_date": "2024-05-10T08:00:00", "notes": "北側の防除"},
+            {"id": 2, "field_id": 2, "status": "completed", "scheduled_date": "2024-05-09T08:00:00"},
+            {"id": 3, "field_id": 1, "status": "in_progress", "scheduled_date": "2024-05-12T23:59:59", "notes": "100%_散布"},
+            {"id": 4, "field_id": 2, "status": "pending", "scheduled_date": "2024-05-13T00:00:00", "notes": "南側の除草"},
+            # 他の組織の作業は含まれない
+            {"id": 5, "organization_id": 2, "field_id": 1, "status": "pending", "scheduled_date": "2024-05-11T08:00:00"},
+        ]
+    ]).execute()
+
+
+def _ids(client, **params) -> list:
+    response = client.get(f"{API}/tasks/", params=params)
+    assert response.status_code == 200, response.text
+    return [task["id"] for task in response.json()]
+
+
+@pytest.mark.parametrize("params, expected", [
+    ({}, [2, 1, 3, 4]),
+    ({"status": ["pending", "in_progress"]}, [1, 3, 4]),
+    ({"field_id": 2}, [2, 4]),
+    ({"status": "pending", "field_id": 1}, [1]),
+    # 終了日はその日の終わりまで含む
+    ({"scheduled_from": "2024-05-10", "scheduled_to": "2024-05-12"}, [1, 3]),
+    ({"q": "側の"}, [1, 4]),
+    # %と_は文字として扱う
+    ({"q": "100%_"}, [3]),
+    ({"q": "0%"}, [3]),
+    ({"q": "%"}, [3]),
+    ({"sort": "scheduled_date", "desc": "true"}, [4, 3, 1, 2]),
+    ({"sort": "status"}, [2, 3, 1, 4]),
+])
+def test_task_filters_and_sort(client, tasks, params, expected):
+    ids = _ids(client, **params)
+    if params.get("sort") == "status":
+        # 同じ状態の中の順序は規定しない
+        assert [ids[0], ids[1], sorted(ids[2:])] == [expected[0], expected[1], sorted(expected[2:])]
+    else:
+        assert ids == expected
+
+
+def test_unknown_sort_column_is_rejected(client, tasks):
+    response = client.get(f"{API}/tasks/", params={"sort": "notes"})
+
+    assert response.status_code == 400
+    assert "scheduled_date" in response.json()["detail"]
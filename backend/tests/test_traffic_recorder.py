@@ -0,0 +1,38 @@
+import json
+
+from app.middleware.traffic_recorder import REDACTED, STRING_KEY, TrafficRecorder, restore, sanitize
+
+
+def test_sanitize_keeps_choice_values_and_hides_free_text():
+    assert sanitize({
+        "sort": "scheduled_date",
+        "status": ["pending", "in_progress"],
+        "notes": "圃場の北側で害虫を確認",
+        "field_id": "42",
+    }) == {
+        "sort": "scheduled_date",
+        "status": ["pending", "in_progress"],
+        "notes": {STRING_KEY: 11},
+        "field_id": "42",
+    }
+
+
+def test_sanitize_hides_phone_numbers():
+    assert sanitize({"phone": "0312345678", "contact_tel": "09012345678"}) == {
+        "phone": REDACTED,
+        "contact_tel": REDACTED,
+    }
+    # キー名から分からない場合も、電話番号らしい数字列は残さない
+    assert sanitize({"notes": "09012345678"}) == {"notes": {STRING_KEY: 11}}
+    assert restore({"phone": REDACTED}) == {"phone": "000-0000-0000"}
+
+
+def test_recorder_writes_in_the_background(tmp_path):
+    path = tmp_path / "traffic" / "requests.jsonl"
+    recorder = TrafficRecorder(str(path))
+    for index in range(3):
+        recorder.write({"started_at": index})
+    recorder.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["started_at"] for line in lines] == [0, 1, 2]